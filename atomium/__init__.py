@@ -1,6 +1,7 @@
 from .files import xyz_data_from_file, xyz_from_file
 from .files import pdb_data_from_file, fetch_data
 from .files import pdb_from_file, fetch
+from .files import PdbWriter
 
 __author__ = "Sam Ireland"
 __version__ = "0.9.0"
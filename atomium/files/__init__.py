@@ -1,3 +1,4 @@
 from .utilities import xyz_data_from_file, xyz_from_file
 from .utilities import pdb_data_from_file, fetch_data
 from .utilities import pdb_from_file, fetch
+from .pdbwriter import PdbWriter
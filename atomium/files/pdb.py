@@ -2,12 +2,16 @@
 
 import datetime
 from ..structures.models import Model
+from ..structures.molecules import rmsd_matrix, rmsf, mean_structure
 
 class Pdb:
-    """A Pdb is used to represent a fully processed PDB file."""
+    """A Pdb is used to represent a fully processed PDB file.
+
+    If its models only differ in their coordinates, it can hold them as a
+    :py:class:`.Trajectory` instead - one model with many frames."""
 
     def __init__(self):
-        self._models = []
+        self._models, self._trajectory = [], None
         self._code, self._deposition_date = None, None
         self._title = None
         self._resolution = None
@@ -19,7 +23,7 @@ class Pdb:
 
 
     def __repr__(self):
-        num = len(self._models)
+        num = len(self._trajectory or self._models)
         return "<Pdb {}({} model{})>".format(
          self._code + " " if self._code else "", num, "" if num == 1 else "s"
         )
@@ -27,13 +31,24 @@ class Pdb:
 
     @property
     def models(self):
-        """Returns the :py:class:`.Model` objects that the Pdb contains.
+        """Returns the :py:class:`.Model` objects that the Pdb contains. If the
+        Pdb has a :py:attr:`trajectory`, this is just the trajectory's model.
 
         :rtype: ``tuple``"""
 
         return tuple(self._models)
 
 
+    @property
+    def trajectory(self):
+        """Returns the :py:class:`.Trajectory` which holds the Pdb's models as
+        frames of a single model, or ``None`` if the models are separate.
+
+        :rtype: ``Trajectory``"""
+
+        return self._trajectory
+
+
     @property
     def model(self):
         """Returns the first :py:class:`.Model` that the Pdb file contains."""
@@ -203,6 +218,60 @@ class Pdb:
         self._classification = classification
 
 
+    def rmsd_matrix(self, superimpose=True, labels=False, processes=None):
+        """Calculates the RMSD between every pair of the Pdb's models, such as
+        those of an NMR ensemble. See :py:func:`.rmsd_matrix`.
+
+        :param bool superimpose: If ``True`` (the default), each pair of\
+        models will be superimposed before their RMSD is calculated.
+        :param bool labels: if ``True``, atoms will be paired by chain ID,\
+        residue ID and name. This has no effect on a trajectory.
+        :param int processes: If given, the calculation will be shared out\
+        between this many processes.
+        :rtype: ``numpy.ndarray``"""
+
+        if self._trajectory is not None:
+            return self._trajectory.rmsd_matrix(superimpose, processes)
+        return rmsd_matrix(
+         self._models, superimpose=superimpose, labels=labels,
+         processes=processes
+        )
+
+
+    def rmsf(self, superimpose=True, labels=False):
+        """Calculates the Root Mean Square Fluctuation of every atom across the
+        Pdb's models. See :py:func:`.rmsf`.
+
+        :param bool superimpose: If ``True`` (the default), the models will be\
+        superimposed onto the first model first.
+        :param bool labels: if ``True``, atoms will be paired by chain ID,\
+        residue ID and name. This has no effect on a trajectory.
+        :returns: the RMSF of each atom, keyed by atom ID.
+        :rtype: ``dict``"""
+
+        if self._trajectory is not None:
+            return self._trajectory.rmsf(superimpose)
+        return rmsf(self._models, superimpose=superimpose, labels=labels)
+
+
+    def mean_model(self, superimpose=True, labels=False):
+        """Creates a new :py:class:`.Model` whose atoms are at the mean
+        positions of their equivalents across the Pdb's models. See
+        :py:func:`.mean_structure`.
+
+        :param bool superimpose: If ``True`` (the default), the models will be\
+        superimposed onto the first model first.
+        :param bool labels: if ``True``, atoms will be paired by chain ID,\
+        residue ID and name. This has no effect on a trajectory.
+        :rtype: ``Model``"""
+
+        if self._trajectory is not None:
+            return self._trajectory.mean_model(superimpose)
+        return mean_structure(
+         self._models, superimpose=superimpose, labels=labels
+        )
+
+
     def to_file_string(self):
         """Returns the file text that represents this Pdb.
 
@@ -215,9 +284,14 @@ class Pdb:
 
 
     def save(self, path):
-        """Saves the Pdb as a .pdb file.
+        """Saves the Pdb as a .pdb file. Records are written to the file a chunk
+        at a time as they are made, rather than being built into one string
+        first. If the path ends in .gz, .bz2 or .xz, they are compressed as
+        they are written.
 
         :param str path: The path to save to."""
 
-        from ..files.utilities import string_to_file
-        string_to_file(self.to_file_string(), path)
+        from ..files.pdb2pdbfile import pdb_to_pdb_file
+        from ..files.utilities import open_file
+        with open_file(path, "w") as f:
+            pdb_to_pdb_file(self, f)
@@ -1,28 +1,38 @@
 """This module handles the conversion of Pdb objects to PDB data
 dictionaries."""
 
+import numpy as np
 from .pdbstring2pdbdict import atoms_to_chains, atoms_to_residues
+from ..structures.arrays import locate_atoms
 
 def pdb_to_pdb_dict(pdb):
-    """Converts a :py:class:`.Pdb` to a data ``dict``
+    """Converts a :py:class:`.Pdb` to a data ``dict``. If the Pdb has a
+    :py:class:`.Trajectory`, each frame becomes a model.
+
+    The connections are worked out once, from the first model, rather than
+    once per model.
 
     :param Pdb pdb: The Pdb to save..
     :rtype: ``dict``"""
 
-    pdb_dicts = [structure_to_pdb_dict(model) for model in pdb._models]
-    pdb_dict = pdb_dicts[0]
-    for d in pdb_dicts[1:]:
-        pdb_dict["models"].append(d["models"][0])
-    pdb_dict["deposition_date"] = pdb._deposition_date
-    pdb_dict["code"] = pdb._code
-    pdb_dict["title"] = pdb._title
-    pdb_dict["resolution"] = pdb._resolution
-    pdb_dict["rfactor"] = pdb._rfactor
-    pdb_dict["organism"] = pdb._organism
-    pdb_dict["expression_system"] = pdb._expression_system
-    pdb_dict["technique"] = pdb._technique
-    pdb_dict["classification"] = pdb._classification
-    return pdb_dict
+    trajectory = pdb._trajectory
+    if trajectory is not None:
+        models = trajectory_to_model_dicts(trajectory)
+        first = trajectory.model
+    else:
+        models = [structure_to_model_dict(model) for model in pdb._models]
+        first = pdb._models[0] if pdb._models else None
+    return {
+     "models": models,
+     "connections": structure_to_connections(first) if (
+      first is not None
+     ) else [],
+     "deposition_date": pdb._deposition_date, "code": pdb._code,
+     "title": pdb._title, "resolution": pdb._resolution,
+     "rfactor": pdb._rfactor, "organism": pdb._organism,
+     "expression_system": pdb._expression_system,
+     "technique": pdb._technique, "classification": pdb._classification
+    }
 
 
 def structure_to_pdb_dict(structure):
@@ -31,16 +41,7 @@ def structure_to_pdb_dict(structure):
     :param AtomicStructure structure: the structure to convert.
     :rtype: ``dict``"""
 
-    atoms, heteroatoms = [], []
-    structure_atoms = sorted(
-     structure.atoms(), key=lambda a: a.id
-    )
-    for atom in structure_atoms:
-        list_ = heteroatoms if atom.chain is None else atoms
-        list_.append(atom_to_atom_dict(atom))
-    chains = atoms_to_chains(atoms)
-    molecules = atoms_to_residues(heteroatoms)
-    model = {"chains": chains, "molecules": molecules}
+    model = structure_to_model_dict(structure)
     connections = structure_to_connections(structure)
     return {
      "models": [model], "connections": connections,
@@ -50,12 +51,124 @@ def structure_to_pdb_dict(structure):
     }
 
 
-def atom_to_atom_dict(atom):
+def structure_to_model_dict(structure):
+    """Converts the atoms of an :py:class:`.AtomicStructure` to a model
+    ``dict``, with its atoms in ID order.
+
+    :param AtomicStructure structure: the structure to convert.
+    :rtype: ``dict``"""
+
+    atoms = sorted(structure.atoms(), key=lambda a: a.id)
+    residues = {}
+    return atom_dicts_to_model_dict(
+     [atom_to_atom_dict(atom, residues) for atom in atoms],
+     [atom.chain is None for atom in atoms]
+    )
+
+
+def trajectory_to_model_dicts(trajectory):
+    """Converts every frame of a :py:class:`.Trajectory` to a model ``dict``.
+    The trajectory's atoms are only sorted, converted to atom ``dict`` objects
+    and grouped into chains and molecules once - each frame then just gives
+    copies of those new coordinates, read straight from the frames array. No
+    frame is selected, so the model's atoms do not move.
+
+    :param Trajectory trajectory: the trajectory to convert.
+    :raises ValueError: if the model's atoms have changed.
+    :rtype: ``list``"""
+
+    trajectory._check_topology()
+    atoms = sorted(trajectory.model.atoms(), key=lambda a: a.id)
+    residues = {}
+    atom_dicts = [atom_to_atom_dict(atom, residues) for atom in atoms]
+    model = atom_dicts_to_model_dict(
+     atom_dicts, [atom.chain is None for atom in atoms]
+    )
+    arrays, rows = locate_atoms(atoms)
+    models = []
+    for frame in trajectory.frames:
+        coordinates = np.asarray(frame, dtype=float)[rows].tolist() if (
+         atoms
+        ) else []
+        models.append(copy_model_dict(model, {id(d): dict(d, x=x, y=y, z=z)
+         for d, (x, y, z) in zip(atom_dicts, coordinates)}))
+    return models
+
+
+def atom_dicts_to_model_dict(atom_dicts, hetero):
+    """Groups some atom ``dict`` objects into the chains and molecules of a
+    model ``dict``.
+
+    :param list atom_dicts: The atom ``dict`` objects, in ID order.
+    :param list hetero: Whether each atom is outside of any chain.
+    :rtype: ``dict``"""
+
+    atoms, heteroatoms = [], []
+    for atom_dict, outside in zip(atom_dicts, hetero):
+        (heteroatoms if outside else atoms).append(atom_dict)
+    return {
+     "chains": atoms_to_chains(atoms),
+     "molecules": atoms_to_residues(heteroatoms)
+    }
+
+
+def copy_model_dict(model_dict, atom_dicts):
+    """Copies a model ``dict``, with its chains, residues and molecules, but
+    with different atom ``dict`` objects in place of the ones it has.
+
+    :param dict model_dict: The model ``dict`` to copy.
+    :param dict atom_dicts: The new atom ``dict`` objects, keyed by the\
+    ``id`` of the atom ``dict`` each replaces.
+    :rtype: ``dict``"""
+
+    def copy_residue(residue):
+        return dict(residue, atoms=[atom_dicts[id(a)] for a in residue["atoms"]])
+
+    return {
+     "chains": [dict(chain, residues=[
+      copy_residue(residue) for residue in chain["residues"]
+     ]) for chain in model_dict["chains"]],
+     "molecules": [
+      copy_residue(molecule) for molecule in model_dict["molecules"]
+     ]
+    }
+
+
+def atom_to_atom_dict(atom, residues=None):
     """Converts an :py:class:`.Atom` to an atom ``dict``
 
     :param Atom atom: the atom to convert.
+    :param dict residues: if given, the residue fields of the ``dict`` will\
+    be looked up here by residue or molecule, and stored here if they're not\
+    there yet, so that they are only worked out once per residue.
     :rtype: ``dict``"""
 
+    if residues is None:
+        fields = atom_to_residue_fields(atom)
+    else:
+        parent = atom.residue or atom.molecule
+        fields = residues.get(parent)
+        if fields is None:
+            fields = residues[parent] = atom_to_residue_fields(atom)
+    id_, residue_name, chain_id, residue_id, insert_code = fields
+    return {
+     "atom_id": atom.id, "atom_name": atom.name, "alt_loc": None,
+     "residue_name": residue_name, "full_id": id_,
+     "chain_id": chain_id, "residue_id": residue_id, "insert_code": insert_code,
+     "x": atom.x, "y": atom.y, "z": atom.z,
+     "occupancy": 1.0,
+     "element": atom.element, "charge": atom.charge,
+     "temp_factor": atom.bfactor if atom.bfactor else None,
+    }
+
+
+def atom_to_residue_fields(atom):
+    """Works out the full residue ID, residue name, chain ID, residue number
+    and insertion code of an atom's ``dict``, from its residue or molecule.
+
+    :param Atom atom: the atom to use.
+    :rtype: ``tuple``"""
+
     id_, residue_name, chain_id, residue_id, insert_code = "", "", "", "", ""
     if atom.residue:
         id_ = atom.residue.id
@@ -68,15 +181,7 @@ def atom_to_atom_dict(atom):
         residue_name = atom.molecule.name
         chain_id = id_[0] if id_ and id_[0].isalpha() else None
         residue_id = int("".join([c for c in id_ if c.isdigit()]))
-    return {
-     "atom_id": atom.id, "atom_name": atom.name, "alt_loc": None,
-     "residue_name": residue_name, "full_id": id_,
-     "chain_id": chain_id, "residue_id": residue_id, "insert_code": insert_code,
-     "x": atom.x, "y": atom.y, "z": atom.z,
-     "occupancy": 1.0,
-     "element": atom.element, "charge": atom.charge,
-     "temp_factor": atom.bfactor if atom.bfactor else None,
-    }
+    return (id_, residue_name, chain_id, residue_id, insert_code)
 
 
 def structure_to_connections(structure):
@@ -86,6 +191,15 @@ def structure_to_connections(structure):
     :param AtomicStructure structure: The structure to use.
     :rtype: ``list``"""
 
+    from ..structures import Model
+    if isinstance(structure, Model):
+        graph = structure.bond_graph()
+        atoms = graph.atoms
+        return sorted([{
+         "atom": atom.id,
+         "bond_to": sorted([atoms[r].id for r in graph.neighbours(row).tolist()])
+        } for row, atom in enumerate(atoms) if not atom.residue
+        ], key=lambda k: k["atom"])
     connections = []
     for atom in structure.atoms():
         if not atom.residue:
@@ -0,0 +1,227 @@
+"""This module handles writing Pdb objects, and other structures, straight to
+.pdb files without building data dictionaries first."""
+
+import numpy as np
+from .pdb2pdbdict import structure_to_connections
+from .pdbdict2pdbstring import pack_annotation, pack_connections
+from ..structures.arrays import locate_atoms, get_coordinates
+
+CHUNK_SIZE = 4096
+ATOM_LINE = "%s%5s %-4s %s   %8.3f%8.3f%8.3f  1.00%6s          %2s%-2s"
+RESIDUE_COLUMNS = "%-3s %-1s%4s%-1s"
+
+def pdb_to_pdb_file(pdb, f):
+    """Writes a :py:class:`.Pdb` to an open file. If the Pdb has a
+    :py:class:`.Trajectory`, each frame is written as a model.
+
+    :param Pdb pdb: The Pdb to write.
+    :param f: The file object to write to."""
+
+    lines = []
+    pack_annotation(lines, pdb_annotation(pdb))
+    written = write_records(lines, f)
+    trajectory = pdb._trajectory
+    if trajectory is not None:
+        frame = trajectory.frame
+        models = iter(trajectory)
+    else:
+        models = iter(pdb._models)
+    multi = len(trajectory or pdb._models) > 1
+    model = None
+    for index, model in enumerate(models, start=1):
+        written = write_records(
+         structure_records(model, multi=index if multi else 0), f, written
+        )
+        if index == 1: connections = structure_to_connections(model)
+    if trajectory is not None and frame is not None: trajectory.select(frame)
+    if model is not None:
+        write_records(connection_records(connections), f, written)
+
+
+def structure_to_pdb_file(structure, f, description=None):
+    """Writes an :py:class:`.AtomicStructure` to an open file as a single
+    model.
+
+    :param AtomicStructure structure: The structure to write.
+    :param f: The file object to write to.
+    :param str description: A structure description to put in the file."""
+
+    lines = []
+    pack_annotation(lines, pdb_annotation(None, title=description))
+    written = write_records(lines, f)
+    written = write_records(structure_records(structure), f, written)
+    write_records(
+     connection_records(structure_to_connections(structure)), f, written
+    )
+
+
+def pdb_annotation(pdb, title=None):
+    """Gets the non-structural values of a :py:class:`.Pdb` in the form that
+    :py:func:`.pack_annotation` takes. If no Pdb is given, every value is
+    ``None`` except the title.
+
+    :param Pdb pdb: The Pdb to use.
+    :param str title: The title to use if there is no Pdb.
+    :rtype: ``dict``"""
+
+    keys = (
+     "deposition_date", "code", "title", "resolution", "rfactor", "organism",
+     "expression_system", "technique", "classification"
+    )
+    annotation = {
+     key: getattr(pdb, "_" + key) if pdb is not None else None for key in keys
+    }
+    if pdb is None: annotation["title"] = title
+    return annotation
+
+
+def write_records(records, f, separate=False, chunk_size=CHUNK_SIZE):
+    """Writes records to an open file, a chunk at a time, with newlines between
+    them but not after the last - as :py:func:`.lines_to_string` would join
+    them.
+
+    :param records: An iterable of record strings.
+    :param f: The file object to write to.
+    :param bool separate: if ``True``, records have already been written to\
+    the file, and a newline will be put before the first record.
+    :param int chunk_size: The number of records to write at once.
+    :returns: ``True`` if anything has now been written to the file.
+    :rtype: ``bool``"""
+
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            f.write(("\n" if separate else "") + "\n".join(chunk))
+            chunk, separate = [], True
+    if chunk:
+        f.write(("\n" if separate else "") + "\n".join(chunk))
+        separate = True
+    return separate
+
+
+def structure_records(structure, multi=0, chunk_size=CHUNK_SIZE):
+    """Generates the ATOM and HETATM records of a structure, in the same order
+    that :py:func:`.pdb_dict_to_pdb_string` puts them - chain atoms grouped by
+    chain and then residue, followed by everything else grouped by molecule.
+    The atom records are generated in blocks of up to ``chunk_size`` lines
+    (see :py:func:`atom_lines`).
+
+    :param AtomicStructure structure: The structure to use.
+    :param int multi: If greater than zero, the records will be wrapped in\
+    MODEL and ENDMDL records with this model number.
+    :param int chunk_size: The number of atoms to format at once.
+    :rtype: ``str``"""
+
+    if multi > 0: yield "MODEL        {}".format(multi).ljust(80)
+    groups, fields = structure_groups(structure)
+    residues = {parent: RESIDUE_COLUMNS % (
+     values[1] or "", values[2], values[3] or "", values[4]
+    ) for parent, values in fields.items()}
+    atoms, records = [], []
+    for group, hetero in groups:
+        atoms += group
+        records += ["HETATM" if hetero else "ATOM  "] * len(group)
+    for start in range(0, len(atoms), chunk_size):
+        yield atom_lines(
+         atoms[start:start + chunk_size], records[start:start + chunk_size],
+         residues
+        )
+    if multi > 0: yield "ENDMDL".ljust(80)
+
+
+def structure_groups(structure):
+    """Sorts a structure's atoms by ID, and then groups them by the ID of the
+    residue or molecule they will be written as part of. Each group is given
+    as a list of atoms and whether they are HETATM records. The residue fields
+    of the records (see :py:func:`residue_fields`) are worked out once per
+    residue or molecule, and are given too, keyed by residue or molecule.
+
+    :param AtomicStructure structure: The structure to use.
+    :rtype: ``tuple``"""
+
+    chains, molecules, fields = {}, {}, {}
+    for atom in sorted(structure.atoms(), key=lambda a: a._id):
+        parent = atom._residue or atom._molecule
+        if parent not in fields: fields[parent] = residue_fields(atom)
+        full_id = fields[parent][0]
+        if atom._chain is None:
+            molecules.setdefault(full_id, []).append(atom)
+        else:
+            chain = chains.setdefault(fields[parent][2], {})
+            chain.setdefault(full_id, []).append(atom)
+    groups = []
+    for chain_id in sorted(chains):
+        groups += [(atoms, False) for atoms in chains[chain_id].values()]
+    groups += [(atoms, True) for atoms in molecules.values()]
+    return groups, fields
+
+
+def residue_fields(atom):
+    """Works out the residue ID, residue name, chain ID, residue number and
+    insertion code that an atom's record should have, from its residue or
+    molecule. These are the same for every atom of a residue, and so only
+    need to be worked out once per residue.
+
+    :param Atom atom: The atom to use.
+    :rtype: ``tuple``"""
+
+    id_, residue_name, chain_id, residue_id, insert_code = "", "", "", "", ""
+    residue, molecule = atom._residue, atom._molecule
+    if residue:
+        id_, residue_name = residue._id, residue._name
+        chain_id = atom._chain._id if atom._chain is not None else ""
+        residue_id = int("".join([c for c in id_ if c.isdigit()]))
+        insert_code = id_[-1] if id_ and id_[-1].isalpha() else ""
+    elif molecule:
+        id_, residue_name = molecule._id, molecule._name
+        chain_id = id_[0] if id_ and id_[0].isalpha() else ""
+        residue_id = int("".join([c for c in id_ if c.isdigit()]))
+    return (id_, residue_name, chain_id, residue_id, insert_code)
+
+
+def atom_lines(atoms, records, residues):
+    """Creates the ATOM or HETATM records of some atoms, with the same layout
+    as :py:func:`.atom_dict_to_atom_line`.
+
+    Rather than each line being formatted on its own, the values are gathered
+    a column at a time - the coordinates are read from the atoms' arrays in a
+    single operation where they share some - and then every line is made at
+    once from a repeated fixed-width template.
+
+    :param list atoms: The atoms to use.
+    :param list records: The record name of each atom, padded to six\
+    characters.
+    :param dict residues: The residue name, chain ID, residue number and\
+    insertion code columns of the records, already formatted, keyed by\
+    residue or molecule.
+    :returns: The records, separated by newlines.
+    :rtype: ``str``"""
+
+    if not atoms: return ""
+    columns = np.empty((len(atoms), 10), dtype=object)
+    columns[:, 0] = records
+    columns[:, 1] = [atom._id for atom in atoms]
+    names = [atom._name or "" for atom in atoms]
+    columns[:, 2] = [" " + name if len(name) < 4 else name for name in names]
+    columns[:, 3] = [residues[atom._residue or atom._molecule] for atom in atoms]
+    columns[:, 4:7] = get_coordinates(atoms, *locate_atoms(atoms))
+    columns[:, 7] = [atom._bfactor or "" for atom in atoms]
+    columns[:, 8] = [atom._element or "" for atom in atoms]
+    columns[:, 9] = [
+     str(atom._charge)[::-1] if atom._charge else "" for atom in atoms
+    ]
+    template = "\n".join([ATOM_LINE] * len(atoms))
+    return template % tuple(columns.ravel().tolist())
+
+
+def connection_records(connections):
+    """Returns the CONECT records of some connections.
+
+    :param list connections: The connection ``dict`` objects to use (see\
+    :py:func:`.structure_to_connections`).
+    :rtype: ``str``"""
+
+    lines = []
+    pack_connections(lines, {"connections": connections})
+    return lines
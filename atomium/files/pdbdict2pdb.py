@@ -1,14 +1,22 @@
 """This module handles the conversion of PDB data dictionaries to Pdb
 objects."""
 
+import numpy as np
 from .pdb import Pdb
-from ..structures import Model, Chain, Residue, Molecule, Atom
+from ..structures import Model, Chain, Residue, Molecule, Atom, Trajectory
 from ..structures.reference import bonds
 
-def pdb_dict_to_pdb(pdb_dict):
+def pdb_dict_to_pdb(pdb_dict, trajectory=False, frames_path=None):
     """Converts a data ``dict`` to a :py:class:`.Pdb`
 
     :param dict pdb_dict: The data dictionary to load.
+    :param bool trajectory: if ``True``, only the first model will be built,\
+    and the models will be stored as frames of a :py:class:`.Trajectory`.
+    :param str frames_path: if given, the trajectory's frames will be written\
+    to a .npy file here and memory-mapped from it, rather than held in\
+    memory. This implies ``trajectory``.
+    :raises ValueError: if a trajectory is requested but the models do not\
+    all have the same atoms.
     :rtype: :py:class:`.Pdb`"""
 
     pdb = Pdb()
@@ -21,12 +29,80 @@ def pdb_dict_to_pdb(pdb_dict):
     pdb._technique = pdb_dict["technique"]
     pdb._classification = pdb_dict["classification"]
     pdb._rfactor = pdb_dict["rfactor"]
-    pdb._models = [model_dict_to_model(
-     d, pdb_dict["connections"]
-    ) for d in pdb_dict["models"]]
+    if (trajectory or frames_path) and pdb_dict["models"]:
+        pdb._trajectory = model_dicts_to_trajectory(
+         pdb_dict["models"], pdb_dict["connections"], path=frames_path
+        )
+        pdb._models = [pdb._trajectory.select(0)]
+    else:
+        pdb._models = [model_dict_to_model(
+         d, pdb_dict["connections"]
+        ) for d in pdb_dict["models"]]
     return pdb
 
 
+def model_dicts_to_trajectory(model_dicts, connections, path=None):
+    """Converts a list of model ``dict`` objects to a :py:class:`.Trajectory`.
+    The first model is used for the topology, and every model's coordinates
+    become a frame.
+
+    :param list model_dicts: The model dictionaries to load.
+    :param list connections: The connections list from a data dictionary.
+    :param str path: if given, the frames will be written to a .npy file here\
+    one at a time, and the trajectory will memory-map them from it.
+    :raises ValueError: if the models do not all have the same atoms - the\
+    same atom IDs, with the same element and name for each.
+    :rtype: :py:class:`.Trajectory`"""
+
+    model = model_dict_to_model(model_dicts[0], connections)
+    ids = [atom.id for atom in model.arrays.atoms]
+    shape = (len(model_dicts), len(ids), 3)
+    if path is None:
+        frames = np.empty(shape)
+    else:
+        frames = np.lib.format.open_memmap(path, mode="w+", shape=shape)
+    topology = model_dict_to_topology(model_dicts[0])
+    for index, model_dict in enumerate(model_dicts):
+        if index and model_dict_to_topology(model_dict) != topology:
+            raise ValueError(
+             "Model {} does not have the same atoms as model 1".format(index + 1)
+            )
+        locations = model_dict_to_locations(model_dict)
+        frames[index] = [locations[id_] for id_ in ids]
+    if path is not None:
+        frames.flush()
+        del frames
+        frames = np.load(path, mmap_mode="r")
+    return Trajectory(model, frames)
+
+
+def model_dict_to_locations(model_dict):
+    """Gets the location of every atom in a model ``dict``, keyed by atom ID.
+
+    :param dict model_dict: The model dictionary to read.
+    :rtype: ``dict``"""
+
+    residues = [
+     residue for chain in model_dict["chains"] for residue in chain["residues"]
+    ] + model_dict["molecules"]
+    return {atom["atom_id"]: (atom["x"], atom["y"], atom["z"])
+     for residue in residues for atom in residue["atoms"]}
+
+
+def model_dict_to_topology(model_dict):
+    """Gets the element and name of every atom in a model ``dict``, keyed by
+    atom ID.
+
+    :param dict model_dict: The model dictionary to read.
+    :rtype: ``dict``"""
+
+    residues = [
+     residue for chain in model_dict["chains"] for residue in chain["residues"]
+    ] + model_dict["molecules"]
+    return {atom["atom_id"]: (atom["element"], atom["atom_name"])
+     for residue in residues for atom in residue["atoms"]}
+
+
 def model_dict_to_model(model_dict, connections):
     """Converts a model ``dict`` to a :py:class:`.Model`
 
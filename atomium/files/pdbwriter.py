@@ -0,0 +1,146 @@
+"""Contains the PdbWriter class, for writing .pdb files a model at a time."""
+
+from .pdb2pdbdict import structure_to_connections
+from .pdb2pdbfile import pdb_annotation, write_records, structure_records
+from .pdb2pdbfile import connection_records
+from .pdbdict2pdbstring import pack_annotation
+from .utilities import open_file
+
+class PdbWriter:
+    """A PdbWriter writes a .pdb file one model at a time, so that ensembles
+    and sampled conformations can be saved as they are made, without every
+    model having to exist at once. It is best used as a context manager::
+
+        with PdbWriter("ensemble.pdb.gz") as writer:
+            for model in models:
+                writer.push(model)
+
+    The header is written when the writer is made, each model is written when
+    it is pushed, and the CONECT records of the first model are written when
+    the writer is closed. A model's records are formatted as soon as it is
+    pushed, so the model can be changed or discarded straight away. If the
+    ``with`` block raises an exception, the file is closed without the held
+    back model or the CONECT records, rather than being made to look
+    complete.
+
+    If only one model is pushed, it is written without MODEL and ENDMDL
+    records, just as :py:meth:`.Pdb.save` would write it - so the first
+    model's records are held until a second arrives or the writer closes.
+
+    :param path: The path to write to, or an open text file object.
+    :param Pdb pdb: if given, the header will be taken from this Pdb.
+    :param str title: if no Pdb is given, a title to put in the header.
+    :param str compression: if a path is given, the file can be compressed\
+    on the fly with ``"gzip"``, ``"bz2"`` or ``"xz"``. If not given, this is\
+    worked out from the path's extension, so a path ending in .gz will be\
+    compressed with gzip.
+    :raises ValueError: if the compression format is not known.
+    :raises ValueError: if a compression format is given with an open file."""
+
+    def __init__(self, path, pdb=None, title=None, compression=None):
+        self._opened = not hasattr(path, "write")
+        if not self._opened and compression is not None:
+            raise ValueError(
+             "Compression can only be used when a path is given"
+            )
+        self._file = open_file(path, "w", compression) if (
+         self._opened
+        ) else path
+        self._models, self._pending, self._connections = 0, None, None
+        self._closed = False
+        lines = []
+        pack_annotation(lines, pdb_annotation(pdb, title=title))
+        self._written = write_records(lines, self._file)
+
+
+    def __repr__(self):
+        return "<PdbWriter ({} model{}{})>".format(
+         self._models, "" if self._models == 1 else "s",
+         ", closed" if self._closed else ""
+        )
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+    @property
+    def models(self):
+        """Returns the number of models pushed so far.
+
+        :rtype: ``int``"""
+
+        return self._models
+
+
+    @property
+    def closed(self):
+        """Returns ``True`` if the writer has been closed.
+
+        :rtype: ``bool``"""
+
+        return self._closed
+
+
+    def push(self, structure):
+        """Writes a structure to the file as the next model. The CONECT
+        records of the file come from the first structure pushed.
+
+        :param AtomicStructure structure: The structure to write.
+        :raises ValueError: if the writer has been closed."""
+
+        if self._closed:
+            raise ValueError("Can't push to a closed {}".format(self))
+        self._models += 1
+        if self._models == 1:
+            self._pending = list(structure_records(structure))
+            self._connections = structure_to_connections(structure)
+            return
+        if self._pending is not None:
+            self._written = write_records([
+             "MODEL        1".ljust(80), *self._pending, "ENDMDL".ljust(80)
+            ], self._file, self._written)
+            self._pending = None
+        self._written = write_records(
+         structure_records(structure, multi=self._models),
+         self._file, self._written
+        )
+
+
+    def close(self):
+        """Writes any model still waiting to be written and the CONECT
+        records, and closes the file if the writer opened it. Closing a
+        writer which is already closed does nothing."""
+
+        if self._closed: return
+        self._closed = True
+        try:
+            if self._pending is not None:
+                self._written = write_records(
+                 self._pending, self._file, self._written
+                )
+                self._pending = None
+            if self._connections is not None:
+                write_records(
+                 connection_records(self._connections),
+                 self._file, self._written
+                )
+        finally:
+            if self._opened: self._file.close()
+
+
+    def _discard(self):
+        """Closes the writer without writing anything more - the model being
+        held back and the CONECT records are dropped - and closes the file if
+        the writer opened it."""
+
+        if self._closed: return
+        self._closed, self._pending = True, None
+        if self._opened: self._file.close()
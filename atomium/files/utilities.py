@@ -1,11 +1,18 @@
 """This module contains various utility functions for dealing with files."""
 
+import os
+import bz2
+import gzip
+import lzma
 from requests import get
 from .pdbstring2pdbdict import pdb_string_to_pdb_dict
 from .pdbdict2pdb import pdb_dict_to_pdb
 from .xyzstring2xyzdict import xyz_string_to_xyz_dict
 from .xyzdict2xyz import xyz_dict_to_xyz
 
+COMPRESSORS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+EXTENSIONS = {"gz": "gzip", "bz2": "bz2", "xz": "xz"}
+
 def string_from_file(path):
     """Opens a file from the given path and returns the contents as a string.
 
@@ -75,27 +82,39 @@ def fetch_data(code, **kwargs):
         return pdb_string_to_pdb_dict(filestring)
 
 
-def pdb_from_file(path):
+def pdb_from_file(path, trajectory=False, frames_path=None):
     """Opens a .pdb file at the specified path and creates a :py:class:`.Pdb`
     from it.
 
     :param str path: The path to open.
+    :param bool trajectory: if ``True``, the models will be stored as frames\
+    of a single model (see :py:class:`.Trajectory`).
+    :param str frames_path: if given, the frames will be stored in a .npy file\
+    here and memory-mapped, rather than held in memory.
     :rtype: ``Pdb``"""
 
     pdb_dict = pdb_data_from_file(path)
-    return pdb_dict_to_pdb(pdb_dict)
+    return pdb_dict_to_pdb(
+     pdb_dict, trajectory=trajectory, frames_path=frames_path
+    )
 
 
-def fetch(code, **kwargs):
+def fetch(code, trajectory=False, frames_path=None, **kwargs):
     """Gets a :py:class:`.Pdb` from the RCSB web services.
 
     :param str code: The PDB code to fetch.
+    :param bool trajectory: if ``True``, the models will be stored as frames\
+    of a single model (see :py:class:`.Trajectory`).
+    :param str frames_path: if given, the frames will be stored in a .npy file\
+    here and memory-mapped, rather than held in memory.
     :param bool pdbe: If ``True``, the PDB will instead be fetched from PDBe.
     :rtype: ``PdbFile``"""
 
     pdb_dict = fetch_data(code, **kwargs)
     if pdb_dict is not None:
-        return pdb_dict_to_pdb(pdb_dict)
+        return pdb_dict_to_pdb(
+         pdb_dict, trajectory=trajectory, frames_path=frames_path
+        )
 
 
 def xyz_data_from_file(path):
@@ -130,10 +149,42 @@ def lines_to_string(lines):
 
 
 def string_to_file(string, path):
-    """Saves a string to a given path as a file.
+    """Saves a string to a given path as a file. If the path ends in .gz, .bz2
+    or .xz the file will be compressed as it is written.
 
     :param str string: The string to save.
     :param str path: The file to save it in."""
 
-    with open(path, "w") as f:
+    with open_file(path, "w") as f:
         f.write(string)
+
+
+def path_compression(path):
+    """Works out the compression format implied by the extension of a path -
+    ``"gzip"`` for .gz, ``"bz2"`` for .bz2 and ``"xz"`` for .xz - or ``None``
+    if the extension isn't one of these.
+
+    :param str path: The path to look at.
+    :rtype: ``str``"""
+
+    return EXTENSIONS.get(os.path.splitext(path)[1][1:].lower())
+
+
+def open_file(path, mode="r", compression=None):
+    """Opens a file in text mode. If it is compressed, it will be compressed
+    or decompressed as it is written or read, without the whole of it ever
+    being held in memory.
+
+    :param str path: The path of the file.
+    :param str mode: The mode to open it in - ``"r"``, ``"w"`` or ``"a"``.
+    :param str compression: ``"gzip"``, ``"bz2"`` or ``"xz"``. If not given,\
+    it will be worked out from the path's extension (see\
+    :py:func:`path_compression`).
+    :raises ValueError: if the compression format is not known.
+    :returns: An open file object."""
+
+    if compression is None: compression = path_compression(path)
+    if compression is None: return open(path, mode)
+    if compression not in COMPRESSORS:
+        raise ValueError("Unknown compression format: {}".format(compression))
+    return COMPRESSORS[compression](path, mode + "t")
@@ -56,7 +56,8 @@ class Xyz:
 
 
     def save(self, path):
-        """Saves the Xyz as a .xyz file.
+        """Saves the Xyz as a .xyz file. If the path ends in .gz, .bz2 or .xz,
+        the file is compressed as it is written.
 
         :param str path: The path to save to."""
 
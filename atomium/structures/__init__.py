@@ -1,4 +1,5 @@
 from .models import Model, Complex
+from .trajectories import Trajectory
 from .chains import Chain
-from .molecules import Residue, Molecule
+from .molecules import Residue, Molecule, rmsd_matrix, rmsf, mean_structure
 from .atoms import Atom
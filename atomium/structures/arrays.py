@@ -0,0 +1,306 @@
+"""This module contains the array storage used for the atomic values of the
+atoms in a model."""
+
+import numpy as np
+from .atoms import Atom, PERIODIC_TABLE, METALS
+
+ELEMENT_SYMBOLS = list(PERIODIC_TABLE)
+ELEMENT_CODES = {symbol: code for code, symbol in enumerate(ELEMENT_SYMBOLS)}
+ELEMENT_MASSES = np.array([PERIODIC_TABLE[s] for s in ELEMENT_SYMBOLS])
+
+def element_code(element):
+    """Returns the integer code used to represent an element symbol in atom
+    arrays. Symbols which are not on the Periodic Table are given new codes
+    (with a mass of 0) the first time they are seen.
+
+    The lookup is case-insensitive.
+
+    :param str element: The element symbol.
+    :rtype: ``int``"""
+
+    global ELEMENT_MASSES
+    element = element.upper()
+    code = ELEMENT_CODES.get(element)
+    if code is None:
+        code = ELEMENT_CODES[element] = len(ELEMENT_SYMBOLS)
+        ELEMENT_SYMBOLS.append(element)
+        ELEMENT_MASSES = np.append(ELEMENT_MASSES, 0)
+    return code
+
+
+METAL_CODES = np.array(sorted(element_code(metal) for metal in METALS))
+
+class AtomArrays:
+    """Contiguous storage for the coordinates, B-factors, charges and element
+    codes of a collection of atoms. Every :py:class:`.Model` owns one of these,
+    and while an :py:class:`.Atom` is in a model its coordinates live in a row
+    of that model's arrays rather than on the atom itself.
+
+    Rows are kept packed - when an atom is removed, the last row is moved into
+    its place.
+
+    :param int capacity: The number of rows to allocate up front."""
+
+    _COLUMNS = ("_coordinates", "_bfactors", "_charges", "_elements")
+
+    def __init__(self, capacity=16):
+        self._coordinates = np.zeros((capacity, 3))
+        self._bfactors = np.zeros(capacity)
+        self._charges = np.zeros(capacity)
+        self._elements = np.zeros(capacity, dtype=int)
+        self._atoms, self._rows = [], {}
+        self._version, self._topology = 0, 0
+
+
+    def __repr__(self):
+        return "<AtomArrays ({} atoms)>".format(len(self._atoms))
+
+
+    def __len__(self):
+        return len(self._atoms)
+
+
+    def __contains__(self, atom):
+        return atom in self._rows
+
+
+    @property
+    def atoms(self):
+        """The atoms stored in the arrays, in row order.
+
+        :rtype: ``tuple``"""
+
+        return tuple(self._atoms)
+
+
+    @property
+    def coordinates(self):
+        """An (N, 3) view of the atoms' coordinates. Writing to it moves the
+        atoms, but you should call :py:meth:`touch` afterwards.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._coordinates[:len(self._atoms)]
+
+
+    @property
+    def bfactors(self):
+        """A view of the atoms' B-factors.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._bfactors[:len(self._atoms)]
+
+
+    @property
+    def charges(self):
+        """A view of the atoms' charges.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._charges[:len(self._atoms)]
+
+
+    @property
+    def elements(self):
+        """A view of the atoms' integer element codes.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._elements[:len(self._atoms)]
+
+
+    @property
+    def masses(self):
+        """The atoms' masses, looked up from their element codes.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return ELEMENT_MASSES[self.elements]
+
+
+    @property
+    def version(self):
+        """A counter which increases every time the stored values change.
+
+        :rtype: ``int``"""
+
+        return self._version
+
+
+    @property
+    def topology(self):
+        """A counter which increases every time atoms are added or removed, or
+        bonds between the atoms are made or broken.
+
+        :rtype: ``int``"""
+
+        return self._topology
+
+
+    def element_mask(self, element=None, hydrogen=True, metal=True):
+        """Returns a boolean array saying which rows pass some element-based
+        criteria, worked out from the element codes alone.
+
+        :param str element: if given, only atoms of this element will pass.\
+        The lookup is case-insensitive.
+        :param bool hydrogen: If ``False``, hydrogen atoms will not pass.
+        :param bool metal: If ``False``, metal atoms will not pass.
+        :rtype: ``numpy.ndarray``"""
+
+        codes = self.elements
+        mask = np.ones(len(codes), dtype=bool)
+        if element:
+            mask &= codes == ELEMENT_CODES.get(element.upper(), -1)
+        if not hydrogen: mask &= codes != ELEMENT_CODES["H"]
+        if not metal: mask &= ~np.isin(codes, METAL_CODES)
+        return mask
+
+
+    def touch(self):
+        """Records that the stored values have been changed directly."""
+
+        self._version += 1
+
+
+    def row(self, atom):
+        """Returns the row that an atom is stored in, or ``None`` if it isn't
+        stored here.
+
+        :param Atom atom: The atom to look up.
+        :rtype: ``int``"""
+
+        return self._rows.get(atom)
+
+
+    def add(self, atom):
+        """Stores an atom's values in a new row and points the atom at it. If
+        the atom is stored in some other arrays, it is removed from those.
+
+        :param Atom atom: The atom to store."""
+
+        if atom in self._rows: return
+        if len(self._atoms) == len(self._coordinates): self._grow()
+        row = len(self._atoms)
+        self._atoms.append(atom)
+        self._rows[atom] = row
+        atom._attach(self, row)
+        self._version += 1
+        self._topology += 1
+        Atom._placement_version += 1
+
+
+    def extend(self, atoms):
+        """Stores the values of many atoms at once, filling each column in a
+        single operation, and points the atoms at their new rows. Atoms which
+        are already stored here are skipped, and atoms stored in some other
+        arrays are removed from those.
+
+        :param atoms: The atoms to store."""
+
+        atoms = [atom for atom in dict.fromkeys(atoms) if atom not in self._rows]
+        if not atoms: return
+        for atom in atoms:
+            if atom._arrays is not None: atom._arrays.remove(atom)
+        start, end = len(self._atoms), len(self._atoms) + len(atoms)
+        if end > len(self._coordinates): self._grow(end)
+        self._coordinates[start:end, 0] = [atom._free_x for atom in atoms]
+        self._coordinates[start:end, 1] = [atom._free_y for atom in atoms]
+        self._coordinates[start:end, 2] = [atom._free_z for atom in atoms]
+        self._bfactors[start:end] = [atom._bfactor for atom in atoms]
+        self._charges[start:end] = [atom._charge for atom in atoms]
+        symbols = [atom._element_symbol for atom in atoms]
+        codes = {symbol: element_code(symbol) for symbol in set(symbols)}
+        self._elements[start:end] = [codes[symbol] for symbol in symbols]
+        self._atoms.extend(atoms)
+        for row, atom in enumerate(atoms, start):
+            self._rows[atom] = row
+            atom._attach(self, row, values=False)
+        self._version += 1
+        self._topology += 1
+        Atom._placement_version += 1
+
+
+    def remove(self, atom):
+        """Removes an atom from the arrays, handing its values back to the atom
+        itself. Nothing happens if the atom isn't stored here.
+
+        :param Atom atom: The atom to remove."""
+
+        row = self._rows.pop(atom, None)
+        if row is None: return
+        atom._detach()
+        last = self._atoms.pop()
+        if last is not atom:
+            end = len(self._atoms)
+            for name in self._COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[end]
+            self._atoms[row] = last
+            self._rows[last] = row
+            last._index = row
+        self._version += 1
+        self._topology += 1
+        Atom._placement_version += 1
+
+
+    def _grow(self, minimum=0):
+        capacity = max(16, len(self._coordinates) * 2, minimum)
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+
+
+def locate_atoms(atoms):
+    """Finds the single :py:class:`AtomArrays` that all of the atoms given are
+    stored in, along with each atom's row there.
+
+    :param list atoms: The atoms to look for.
+    :returns: (``AtomArrays``, ``numpy.ndarray``) or ``(None, None)`` if the\
+    atoms are not all stored in the same arrays."""
+
+    if not atoms: return None, None
+    arrays = atoms[0]._arrays
+    if arrays is None: return None, None
+    rows = np.empty(len(atoms), dtype=int)
+    for index, atom in enumerate(atoms):
+        if atom._arrays is not arrays: return None, None
+        rows[index] = atom._index
+    return arrays, rows
+
+
+def get_coordinates(atoms, arrays=None, rows=None):
+    """Returns the coordinates of some atoms as a new (N, 3) array. If the
+    atoms' arrays and rows are known already (see :py:func:`locate_atoms`)
+    they are read from there in one operation.
+
+    :param list atoms: The atoms to get the coordinates of.
+    :param AtomArrays arrays: The arrays the atoms are stored in.
+    :param rows: The rows of the atoms within those arrays.
+    :rtype: ``numpy.ndarray``"""
+
+    if arrays is not None:
+        return np.array(arrays._coordinates[rows])
+    return np.array(
+     [atom.location for atom in atoms], dtype=float
+    ).reshape(len(atoms), 3)
+
+
+def set_coordinates(atoms, coordinates, arrays=None, rows=None):
+    """Moves some atoms to the coordinates given, in one operation if the
+    atoms' arrays and rows are known.
+
+    :param list atoms: The atoms to move.
+    :param numpy.ndarray coordinates: An (N, 3) array of new coordinates.
+    :param AtomArrays arrays: The arrays the atoms are stored in.
+    :param rows: The rows of the atoms within those arrays."""
+
+    if arrays is not None:
+        arrays._coordinates[rows] = coordinates
+        arrays._version += 1
+    else:
+        for atom, (x, y, z) in zip(atoms, np.asarray(coordinates).tolist()):
+            atom._x, atom._y, atom._z = x, y, z
@@ -1,7 +1,40 @@
 """This module contains the classes for atoms and their bonds."""
 
 import math
-import numpy as np
+from .geometry import AXES, rotation_matrix
+from .views import SetView
+
+def compile_atom_query(id=None, name=None, element=None, hydrogen=True,
+                       het=True, metal=True, residue_name=None):
+    """Turns the criteria that atoms can be queried by into a single function
+    which checks all of them in one go.
+
+    :param int id: if given, only atoms with this ID will pass.
+    :param str name: if given, only atoms with this name will pass.
+    :param str element: if given, only atoms of this element will pass.
+    :param bool hydrogen: If ``False``, hydrogen atoms will not pass.
+    :param bool het: If ``False``, non-chain atoms will not pass.
+    :param bool metal: If ``False``, metal atoms will not pass.
+    :param str residue_name: if given, only atoms in a residue with this name\
+    will pass.
+    :returns: ``function`` or ``None`` if no criteria are given."""
+
+    checks = []
+    if id: checks.append(lambda a: a._id == id)
+    if name: checks.append(lambda a: a._name == name)
+    if element:
+        element = element.upper()
+        checks.append(lambda a: a._upper_element == element)
+    if not hydrogen: checks.append(lambda a: a._upper_element != "H")
+    if not het: checks.append(lambda a: a._residue is not None)
+    if not metal: checks.append(lambda a: a._upper_element not in METALS)
+    if residue_name: checks.append(
+     lambda a: a._residue is not None and a._residue._name == residue_name
+    )
+    if not checks: return None
+    if len(checks) == 1: return checks[0]
+    return lambda a: all(check(a) for check in checks)
+
 
 def atom_query(func):
     """Decorator which can be applied to any function which returns atoms. It
@@ -10,30 +43,75 @@ def atom_query(func):
     :param function func: The function to enhance.
     :rtype: ``function``"""
 
-    def new(*args, id=None, name=None,
-     element=None, hydrogen=True, het=True, metal=True, **kwargs):
+    def new(*args, id=None, name=None, element=None, hydrogen=True, het=True,
+     metal=True, residue_name=None, **kwargs):
         atoms = func(*args, **kwargs)
-        if id:
-            atoms = set(filter(lambda a: a._id == id, atoms))
-        if name:
-            atoms = set(filter(lambda a: a._name == name, atoms))
-        if element:
-            atoms = set(filter(
-             lambda a: a._element.lower() == element.lower(), atoms
-            ))
-        if not hydrogen:
-            atoms = set(filter(lambda a: a._element.lower() != "h", atoms))
-        if not het:
-            atoms = set(filter(lambda a: a._residue is not None, atoms))
-        if not metal:
-            atoms = set(filter(lambda a: a._element.upper() not in METALS, atoms))
-        return atoms
+        check = compile_atom_query(
+         id, name, element, hydrogen, het, metal, residue_name
+        )
+        if check is None: return atoms
+        return set(filter(check, atoms))
     new.__name__ = func.__name__
     new.__doc__ = func.__doc__
     return new
 
 
 
+class ElementSymbol:
+    """A descriptor for an :py:class:`.Atom` object's element. An upper case
+    copy of the symbol is kept alongside it so that lookups don't need to
+    normalise case, and if the atom is in a :py:class:`.Model` the element
+    code in that model's :py:class:`.AtomArrays` is kept up to date. Changing
+    an atom's element updates the atom indexes of the structures it is in."""
+
+    def __get__(self, atom, owner):
+        if atom is None: return self
+        return atom.__dict__["_element_symbol"]
+
+
+    def __set__(self, atom, value):
+        parents = None
+        if "_element_symbol" in atom.__dict__: parents = atom._unlabel()
+        atom.__dict__["_element_symbol"] = value
+        atom.__dict__["_upper_element"] = value.upper()
+        if parents is not None: atom._relabel(parents)
+        if atom._arrays is not None:
+            from .arrays import element_code
+            atom._arrays._elements[atom._index] = element_code(value)
+            atom._arrays._version += 1
+        else:
+            Atom._free_version += 1
+
+
+
+class StoredCoordinate:
+    """A descriptor for one of an :py:class:`.Atom` object's coordinates. While
+    the atom is part of a :py:class:`.Model` the value lives in a row of that
+    model's :py:class:`.AtomArrays`, and otherwise on the atom itself.
+
+    :param int axis: The column of the coordinate (0, 1 or 2)."""
+
+    def __init__(self, axis):
+        self._axis = axis
+        self._key = "_free_" + "xyz"[axis]
+
+
+    def __get__(self, atom, owner):
+        if atom is None: return self
+        if atom._arrays is None: return atom.__dict__[self._key]
+        return float(atom._arrays._coordinates[atom._index, self._axis])
+
+
+    def __set__(self, atom, value):
+        if atom._arrays is None:
+            atom.__dict__[self._key] = value
+            Atom._free_version += 1
+        else:
+            atom._arrays._coordinates[atom._index, self._axis] = value
+            atom._arrays._version += 1
+
+
+
 class Atom:
     """Represents an atom in three dimensional space. Every atom has an element
     and a set of Cartesian coordinates.
@@ -55,6 +133,10 @@ class Atom:
     :raises TypeError: if the charge is not numeric.
     :raises TypeError: if the bfactor is not numeric."""
 
+    _x, _y, _z = StoredCoordinate(0), StoredCoordinate(1), StoredCoordinate(2)
+    _element = ElementSymbol()
+    _label_version, _free_version, _placement_version = 0, 0, 0
+
     def __init__(self, element, x=0, y=0, z=0, id=0, name=None, charge=0,
                  bfactor=0):
         if not isinstance(element, str):
@@ -69,10 +151,9 @@ class Atom:
             raise TypeError("charge '{}' is not numeric".format(charge))
         if not isinstance(bfactor, (float, int)):
             raise TypeError("bfactor '{}' is not numeric".format(bfactor))
-        self._element = element
-        self._x = x
-        self._y = y
-        self._z = z
+        self._arrays, self._index = None, None
+        self._element_symbol, self._upper_element = element, element.upper()
+        self._free_x, self._free_y, self._free_z = x, y, z
         self._id = id
         self._name = name
         self._charge = charge
@@ -183,7 +264,9 @@ class Atom:
     def name(self, name):
         if not isinstance(name, str):
             raise TypeError("Name '{}' is not str".format(name))
+        parents = self._unlabel()
         self._name = name
+        self._relabel(parents)
 
 
     @property
@@ -201,6 +284,9 @@ class Atom:
         if not isinstance(bfactor, (float, int)):
             raise TypeError("bfactor '{}' is not numeric".format(bfactor))
         self._bfactor = bfactor
+        if self._arrays is not None:
+            self._arrays._bfactors[self._index] = bfactor
+            self._arrays._version += 1
 
 
     @property
@@ -218,6 +304,11 @@ class Atom:
         if not isinstance(charge, (float, int)):
             raise TypeError("charge '{}' is not numeric".format(charge))
         self._charge = charge
+        if self._arrays is not None:
+            self._arrays._charges[self._index] = charge
+            self._arrays._version += 1
+        else:
+            Atom._free_version += 1
 
 
     @property
@@ -226,9 +317,76 @@ class Atom:
 
         :rtype: ``tuple``"""
 
+        if self._arrays is not None:
+            return tuple(self._arrays._coordinates[self._index].tolist())
         return (self._x, self._y, self._z)
 
 
+    def _unlabel(self):
+        """Takes the atom out of the atom indexes of the structures which keep
+        track of it, before one of its labels (its element, name or residue)
+        changes. Those structures are returned, and should be passed to
+        :py:meth:`_relabel` once the change has been made.
+
+        :rtype: ``list``"""
+
+        parents, values = [], self.__dict__
+        for attribute in PARENT_ATTRIBUTES:
+            parent = values[attribute]
+            if parent is not None and parent._tracked \
+             and parent._parent_attribute == attribute:
+                parents.append(parent)
+                if parent._indexes is not None:
+                    parent._index_atom(self, remove=True)
+        return parents
+
+
+    def _relabel(self, parents):
+        """Puts the atom back into the atom indexes of some structures after
+        one of its labels has changed, and marks their labels as changed.
+        Structures which don't keep track of their atoms will rebuild their
+        indexes the next time they are needed.
+
+        :param list parents: The structures given by :py:meth:`_unlabel`."""
+
+        Atom._label_version += 1
+        for parent in parents:
+            parent._labels += 1
+            if parent._indexes is not None: parent._index_atom(self)
+
+
+    def _attach(self, arrays, index, values=True):
+        """Moves the atom's values into a row of some :py:class:`.AtomArrays`,
+        removing it from any arrays it was in before. This should only be
+        called by :py:meth:`.AtomArrays.add` and :py:meth:`.AtomArrays.extend`.
+
+        :param AtomArrays arrays: The arrays to move into.
+        :param int index: The row of the arrays to use.
+        :param bool values: If ``False``, the arrays have been given the atom's\
+        values already, and the atom is just pointed at its row."""
+
+        if values:
+            from .arrays import element_code
+            if self._arrays is not None: self._arrays.remove(self)
+            arrays._coordinates[index] = self.location
+            arrays._bfactors[index] = self._bfactor
+            arrays._charges[index] = self._charge
+            arrays._elements[index] = element_code(self._element)
+        for key in ("_free_x", "_free_y", "_free_z"): del self.__dict__[key]
+        self._arrays, self._index = arrays, index
+
+
+    def _detach(self):
+        """Moves the atom's coordinates out of the :py:class:`.AtomArrays` row
+        they are in and back onto the atom. This should only be called by
+        :py:meth:`.AtomArrays.remove`."""
+
+        if self._arrays is not None:
+            x, y, z = self.location
+            self._arrays, self._index = None, None
+            self._x, self._y, self._z = x, y, z
+
+
     def trim(self, places):
         """Rounds the coordinate values to a given number of decimal places.
         Useful for removing floating point rounding errors after transformation.
@@ -279,34 +437,25 @@ class Atom:
         angle around a given axis.
 
         :param float angle: Angle in radians.
-        :param str axis: The axis to rotate around. Can be `x`, `y` or `z`."""
-
-        axis = [1 if i == ["x", "y", "z"].index(axis) else 0 for i in range(3)]
-        axis = np.asarray(axis)
-        axis = axis / math.sqrt(np.dot(axis, axis))
-        a = math.cos(angle / 2)
-        b, c, d = -axis * math.sin(angle / 2)
-        aa, bb, cc, dd = a * a, b * b, c * c, d * d
-        bc, ad, ac, ab, bd, cd = b * c, a * d, a * c, a * b, b * d, c * d
-        return np.array([
-         [aa + bb - cc - dd, 2 * (bc + ad), 2 * (bd - ac)],
-         [2 * (bc - ad), aa + cc - bb - dd, 2 * (cd + ab)],
-         [2 * (bd + ac), 2 * (cd - ab), aa + dd - bb - cc]
-        ])
+        :param axis: The axis to rotate around. Can be `x`, `y` or `z`, or any\
+        (x, y, z) vector."""
+
+        return rotation_matrix(angle, axis)
 
 
     def rotate(self, angle, axis, degrees=False, trim=12):
         """Rotates an atom in 3D space.
 
         :param float angle: Angle in radians.
-        :param str axis: The axis to rotate around. Can be `x`, `y` or `z`.
+        :param axis: The axis to rotate around. Can be `x`, `y` or `z`, or any\
+        (x, y, z) vector.
         :param bool degrees: if ``True`` the angle will be interpreted as\
         degrees.
         :param int trim: The amount of rounding to do to the atom's coordinates\
         after translating - the default is 12 decimal places but this can be\
         set to ``None`` if no rounding is to be done."""
 
-        if axis not in ("x", "y", "z"):
+        if isinstance(axis, str) and axis not in AXES:
             raise ValueError("{} is not a valid axis".format(axis))
         angle = math.radians(angle) if degrees else angle
         matrix = self.generate_rotation_matrix(angle, axis)
@@ -325,7 +474,7 @@ class Atom:
 
         :rtype: ``float``"""
 
-        return PERIODIC_TABLE.get(self._element.upper(), 0)
+        return PERIODIC_TABLE.get(self._upper_element, 0)
 
 
     def distance_to(self, other):
@@ -403,11 +552,11 @@ class Atom:
     @property
     def bonds(self):
         """The atomic :py:class:`.Bond` objects that the atom is associated
-        with.
+        with, as a read-only view (see :py:class:`.SetView`).
 
-        :rtype: ``set``"""
+        :rtype: ``SetView``"""
 
-        return set(self._bonds)
+        return SetView(self._bonds)
 
 
     @atom_query
@@ -423,6 +572,8 @@ class Atom:
         :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
         :param bool het: If ``False``, non-chain atoms will be excluded.
         :param bool metal: If ``False``, metal atoms will be excluded.
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be returned.
         :rtype: ``set``"""
 
         atoms = set()
@@ -435,8 +586,9 @@ class Atom:
         """Bonds the atom to some other atom by creating a :py:class:`.Bond`
         between them."""
 
-        if other not in self.bonded_atoms():
-            Bond(self, other)
+        for bond in self._bonds:
+            if other in bond._atoms: return
+        Bond(self, other)
 
 
     def unbond_from(self, other):
@@ -498,6 +650,8 @@ class Atom:
         :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
         :param bool het: If ``False``, non-chain atoms will be excluded.
         :param bool metal: If ``False``, metal atoms will be excluded.
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be returned.
         :rtype: ``set``"""
 
         if self._model:
@@ -522,6 +676,8 @@ class Bond:
     :raises TypeError: if non :py:class:`.Atom` objects are given.
     :raises ValueError: if the two atoms are the same atom."""
 
+    _version = 0
+
     def __init__(self, atom1, atom2):
         if not isinstance(atom1, Atom):
             raise TypeError("bond atom {} is not an atom".format(atom1))
@@ -530,7 +686,10 @@ class Bond:
         if atom1 is atom2:
             raise ValueError("Cannot bond atom {} to itself".format(atom1))
         self._atoms = set((atom1, atom2))
-        atom1._bonds.add(self), atom2._bonds.add(self)
+        for atom in (atom1, atom2):
+            atom._bonds.add(self)
+            if atom._arrays is not None: atom._arrays._topology += 1
+        Bond._version += 1
 
 
     def __repr__(self):
@@ -541,7 +700,9 @@ class Bond:
     @atom_query
     def atoms(self):
         """Returns the two :py:class:`.Atom` objects that the bond connects.
-        They are given as an unordered set.
+        They are given as a read-only view of an unordered set (see
+        :py:class:`.SetView`) - if criteria are given, a new ``set`` of the
+        matching atoms is returned instead.
 
         :param int id: if given, only atoms whose ID matches this will be\
         returned.
@@ -552,9 +713,11 @@ class Bond:
         :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
         :param bool het: If ``False``, non-chain atoms will be excluded.
         :param bool metal: If ``False``, metal atoms will be excluded.
-        :rtype: ``set``"""
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be returned.
+        :rtype: ``SetView``"""
 
-        return set(self._atoms)
+        return SetView(self._atoms)
 
 
     @property
@@ -576,11 +739,14 @@ class Bond:
         do have other variables pointing to the bond though, the object will
         remain in memory."""
 
-        atom1, atom2 = self._atoms
-        atom1._bonds.remove(self)
-        atom2._bonds.remove(self)
+        for atom in self._atoms:
+            atom._bonds.remove(self)
+            if atom._arrays is not None: atom._arrays._topology += 1
+        Bond._version += 1
+
 
 
+PARENT_ATTRIBUTES = ("_model", "_complex", "_chain", "_molecule", "_residue")
 
 PERIODIC_TABLE = {
  "H": 1.0079, "HE": 4.0026, "LI": 6.941, "BE": 9.0122, "B": 10.811,
@@ -606,7 +772,7 @@ PERIODIC_TABLE = {
  "BH": 264, "SG": 266, "MT": 268, "RG": 272, "HS": 277
 }
 
-METALS = [
+METALS = frozenset([
  "LI", "BE", "NA", "MG", "AL", "K", "CA", "SC", "TI", "V", "CR", "MN", "FE",
  "CO", "NI", "CU", "ZN", "HA", "RB", "SR", "Y", "ZR", "NB", "MO", "TC", "RU",
  "RH", "PD", "AG", "CD", "IN", "SN", "CS", "BA", "LA", "CE", "PR", "ND", "PM",
@@ -614,4 +780,4 @@ METALS = [
  "RE", "OS", "IR", "PT", "AU", "HG", "TL", "PB", "BI", "PO", "FR", "RA", "AC",
  "TH", "PA", "U", "NP", "PU", "AM", "CM", "BK", "CF", "ES", "FM", "MD", "NO",
  "LR", "RF", "DB", "SG", "BH", "HS", "MT", "DS", "RG", "CN", "UUT", "FL", "LV"
-]
+])
@@ -16,6 +16,8 @@ class ResidueSequence:
     this class, because it requires the :py:meth:`~.AtomicStructure.atoms`
     method."""
 
+    _residue_order = None
+
     @staticmethod
     def verify(sequence):
         """A static method for checking that the residues in a sequence are all
@@ -70,17 +72,63 @@ class ResidueSequence:
 
         :param str residue_id: Filter by residue ID.
         :param str name: Filter by name.
+        :raises SequenceConnectivityError: if the residues are not all on one\
+        sequence of links.
         :rtype: ``tuple``"""
 
-        all_res = AtomicStructure.residues(self, *args, **kwargs)
-        if len(all_res) == 0: return tuple()
-        initial_res = list(all_res)[0]
-        full_sequence = [initial_res]
-        while full_sequence[-1].next:
-            full_sequence.append(full_sequence[-1].next)
-        while full_sequence[0].previous:
-            full_sequence.insert(0, full_sequence[0].previous)
-        return tuple(sorted(all_res, key=lambda k: full_sequence.index(k)))
+        ordered = self._ordered_residues()
+        if not args and not kwargs: return ordered
+        matches = AtomicStructure.residues(self, *args, **kwargs)
+        return tuple(residue for residue in ordered if residue in matches)
+
+
+    def _ordered_residues(self):
+        """Returns the structure's residues ordered by their connectivity. The
+        order is worked out by walking the residue links once, and is then
+        reused until the structure's atoms, the residues' atoms, or any residue
+        links change.
+
+        :raises SequenceConnectivityError: if the residues are not all on one\
+        sequence of links, or the links form a loop.
+        :rtype: ``tuple``"""
+
+        stamp = (self._label_stamp(), Residue._link_version)
+        if self._residue_order is not None and self._residue_order[0] == stamp:
+            return self._residue_order[1]
+        residues = AtomicStructure.residues(self)
+        ordered, visited = [], set()
+        if residues:
+            residue = next(iter(residues))
+            while residue.previous:
+                visited.add(residue)
+                residue = residue.previous
+                if residue in visited: self._raise_cycle(residue)
+            visited = set()
+            while residue:
+                if residue in visited: self._raise_cycle(residue)
+                visited.add(residue)
+                if residue in residues: ordered.append(residue)
+                residue = residue.next
+            if len(ordered) != len(residues):
+                raise SequenceConnectivityError(
+                 "{} are not connected to the rest of the sequence".format(
+                  residues - set(ordered)
+                 )
+                )
+        self._residue_order = (stamp, tuple(ordered))
+        return self._residue_order[1]
+
+
+    @staticmethod
+    def _raise_cycle(residue):
+        """Raises the error for residue links which loop back on themselves.
+
+        :param Residue residue: A residue on the loop.
+        :raises SequenceConnectivityError: always."""
+
+        raise SequenceConnectivityError(
+         "The residue links through {} form a loop".format(residue)
+        )
 
 
 
@@ -99,11 +147,12 @@ class Chain(ResidueSequence, Molecule):
     :raises TypeError: if non-atoms or AtomicStructures are given.
     :raises TypeError: if the chain_id is not str."""
 
+    _parent_attribute, _labelling = "_chain", True
+
     def __init__(self, *atoms, **kwargs):
         Molecule.__init__(self, *atoms, **kwargs)
         ResidueSequence.verify(self)
-        for atom in self._atoms:
-            atom._chain = self
+        self._claim(self._atoms, relabel=True)
 
 
     def __repr__(self):
@@ -1,7 +1,8 @@
 """This module contains custom atomium exceptions."""
 
-class SequenceConnectivityError(Exception):
+class SequenceConnectivityError(ValueError):
     """The error raised when a chain or other polymer isn't connected together
-    in the way that is should be."""
+    in the way that is should be. It is a ``ValueError``, so code which
+    catches that will catch this too."""
 
     pass
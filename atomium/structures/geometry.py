@@ -0,0 +1,385 @@
+"""This module contains functions for doing geometry on arrays of
+coordinates."""
+
+import math
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+
+AXES = {"x": (1, 0, 0), "y": (0, 1, 0), "z": (0, 0, 1)}
+
+def rotation_matrix(angle, axis):
+    """Generates a 3 x 3 matrix that rotates points by a given angle around an
+    axis passing through the origin.
+
+    :param float angle: Angle in radians.
+    :param axis: The axis to rotate around. Can be `x`, `y` or `z`, or any\
+    (x, y, z) vector.
+    :raises ValueError: if an invalid axis is given.
+    :rtype: ``numpy.ndarray``"""
+
+    if isinstance(axis, str):
+        if axis not in AXES:
+            raise ValueError("{} is not a valid axis".format(axis))
+        axis = AXES[axis]
+    axis = np.asarray(axis, dtype=float)
+    length = math.sqrt(np.dot(axis, axis))
+    if axis.shape != (3,) or length == 0:
+        raise ValueError("{} is not a valid axis".format(axis))
+    axis = axis / length
+    a = math.cos(angle / 2)
+    b, c, d = -axis * math.sin(angle / 2)
+    aa, bb, cc, dd = a * a, b * b, c * c, d * d
+    bc, ad, ac, ab, bd, cd = b * c, a * d, a * c, a * b, b * d, c * d
+    return np.array([
+     [aa + bb - cc - dd, 2 * (bc + ad), 2 * (bd - ac)],
+     [2 * (bc - ad), aa + cc - bb - dd, 2 * (cd + ab)],
+     [2 * (bd + ac), 2 * (cd - ab), aa + dd - bb - cc]
+    ])
+
+
+def quaternion_matrix(quaternion):
+    """Converts a rotation quaternion to a 3 x 3 rotation matrix. The
+    quaternion does not need to be normalised.
+
+    :param quaternion: The (w, x, y, z) quaternion.
+    :raises ValueError: if the quaternion is not four non-zero numbers.
+    :rtype: ``numpy.ndarray``"""
+
+    quaternion = np.asarray(quaternion, dtype=float)
+    if quaternion.shape != (4,) or not quaternion.any():
+        raise ValueError("{} is not a valid quaternion".format(quaternion))
+    w, x, y, z = quaternion / math.sqrt(np.dot(quaternion, quaternion))
+    return np.array([
+     [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+     [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+     [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]
+    ])
+
+
+def matrix_about_point(matrix, point):
+    """Takes a 3 x 3 matrix that acts about the origin and returns the 4 x 4
+    matrix that does the same thing about some other point.
+
+    :param matrix: The 3 x 3 matrix.
+    :param point: The (x, y, z) point to act about.
+    :rtype: ``numpy.ndarray``"""
+
+    point = np.asarray(point, dtype=float)
+    affine = np.identity(4)
+    affine[:3, :3] = matrix
+    affine[:3, 3] = point - np.dot(matrix, point)
+    return affine
+
+
+def transform_coordinates(coordinates, matrix):
+    """Applies a 3 x 3 linear matrix or a 4 x 4 affine matrix to an (N, 3)
+    array of coordinates, returning a new array.
+
+    :param numpy.ndarray coordinates: The coordinates to transform.
+    :param matrix: The 3 x 3 or 4 x 4 matrix.
+    :raises ValueError: if the matrix is not 3 x 3 or 4 x 4.
+    :rtype: ``numpy.ndarray``"""
+
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.shape == (3, 3):
+        return np.dot(coordinates, matrix.T)
+    if matrix.shape == (4, 4):
+        return np.dot(coordinates, matrix[:3, :3].T) + matrix[:3, 3]
+    raise ValueError("Matrix of shape {} is not 3x3 or 4x4".format(
+     matrix.shape
+    ))
+
+
+def kabsch_matrix(coordinates, other):
+    """Uses the Kabsch algorithm to find the 3 x 3 rotation matrix which best
+    superimposes one set of centred (N, 3) coordinates onto another - the one
+    which minimises the RMSD between them. Stacks of coordinates of shape
+    (..., N, 3) can also be given, in which case a stack of matrices is
+    returned.
+
+    :param numpy.ndarray coordinates: The coordinates to rotate.
+    :param numpy.ndarray other: The coordinates to rotate onto.
+    :rtype: ``numpy.ndarray``"""
+
+    covariance = np.einsum("...ni,...nj->...ij", coordinates, other)
+    u, s, vt = np.linalg.svd(covariance)
+    flip = np.linalg.det(u) * np.linalg.det(vt) < 0
+    u[..., :, 2] = np.where(flip[..., None], -u[..., :, 2], u[..., :, 2])
+    return np.swapaxes(np.matmul(u, vt), -1, -2)
+
+
+def superimpose(coordinates, other, centre=None, other_centre=None):
+    """Superimposes one set of (N, 3) coordinates onto another, returning new
+    coordinates. The first coordinates are moved so that their centre is on
+    the other's centre, and then rotated about it so as to minimise the RMSD.
+    Neither array is modified. Stacks of coordinates of shape (..., N, 3) can
+    also be given.
+
+    :param numpy.ndarray coordinates: The coordinates to move.
+    :param numpy.ndarray other: The coordinates to move onto.
+    :param centre: The centre of the first coordinates. If not given, their\
+    mean position is used.
+    :param other_centre: The centre of the other coordinates. If not given,\
+    their mean position is used.
+    :rtype: ``numpy.ndarray``"""
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    other = np.asarray(other, dtype=float)
+    if centre is None: centre = coordinates.mean(axis=-2)
+    if other_centre is None: other_centre = other.mean(axis=-2)
+    centre = np.expand_dims(np.asarray(centre, dtype=float), -2)
+    other_centre = np.expand_dims(np.asarray(other_centre, dtype=float), -2)
+    P, Q = coordinates - centre, other - other_centre
+    matrix = kabsch_matrix(P, Q)
+    return np.matmul(P, np.swapaxes(matrix, -1, -2)) + other_centre
+
+
+def superposition_matrix(coordinates, other, centre=None, other_centre=None):
+    """Finds the 4 x 4 affine matrix which superimposes one set of (N, 3)
+    coordinates onto another, in the same way as :py:func:`superimpose`. This
+    can then be applied to other coordinates which should move with them.
+
+    :param numpy.ndarray coordinates: The coordinates to move.
+    :param numpy.ndarray other: The coordinates to move onto.
+    :param centre: The centre of the first coordinates. If not given, their\
+    mean position is used.
+    :param other_centre: The centre of the other coordinates. If not given,\
+    their mean position is used.
+    :rtype: ``numpy.ndarray``"""
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    other = np.asarray(other, dtype=float)
+    if centre is None: centre = coordinates.mean(axis=0)
+    if other_centre is None: other_centre = other.mean(axis=0)
+    centre = np.asarray(centre, dtype=float)
+    other_centre = np.asarray(other_centre, dtype=float)
+    matrix = kabsch_matrix(coordinates - centre, other - other_centre)
+    affine = np.identity(4)
+    affine[:3, :3] = matrix
+    affine[:3, 3] = other_centre - np.dot(matrix, centre)
+    return affine
+
+
+def rmsd(coordinates, other):
+    """Calculates the Root Mean Square Deviation between two sets of (N, 3)
+    coordinates, as they are. Stacks of coordinates of shape (..., N, 3) can
+    also be given, in which case an array of RMSDs is returned.
+
+    :param numpy.ndarray coordinates: The first coordinates.
+    :param numpy.ndarray other: The second coordinates.
+    :rtype: ``float``"""
+
+    deviations = np.asarray(coordinates, dtype=float) - other
+    return np.sqrt((deviations ** 2).sum(axis=(-1, -2)) / deviations.shape[-2])
+
+
+def pairwise_rmsd(coordinates, superimpose=True, centres=None,
+                  processes=None, chunk_size=None):
+    """Calculates the RMSD between every pair of structures in an (M, N, 3)
+    stack of coordinates, where each structure's N atoms are in the same
+    order. Each row of the matrix is calculated in one NumPy operation (or one
+    per chunk), and only half the matrix is calculated as it is symmetric. The
+    diagonal is always zero.
+
+    The stack can be a memory-mapped array, in which case only one structure
+    and one chunk are read into memory at a time by each process.
+
+    :param numpy.ndarray coordinates: The stack of coordinates.
+    :param bool superimpose: If ``True`` (the default), each pair will be\
+    superimposed before their RMSD is calculated.
+    :param numpy.ndarray centres: The (M, 3) centres to superimpose about. If\
+    not given, each structure's mean position is used.
+    :param int processes: If given, the rows will be shared out between this\
+    many processes.
+    :param int chunk_size: If given, each row will be calculated this many\
+    structures at a time.
+    :rtype: ``numpy.ndarray``"""
+
+    if not isinstance(coordinates, np.memmap):
+        coordinates = np.asarray(coordinates, dtype=float)
+    if centres is None:
+        centres = np.array([structure.mean(axis=0) for structure in coordinates])
+    centres = np.asarray(centres, dtype=float)
+    count = len(coordinates)
+    if processes and count > 1:
+        calculate = partial(
+         _rmsd_rows, _shareable(coordinates), centres, superimpose, chunk_size
+        )
+        chunks = [range(start, count, processes) for start in range(processes)]
+        with ProcessPoolExecutor(processes) as executor:
+            rows = [row for chunk in executor.map(calculate, chunks)
+             for row in chunk]
+    else:
+        rows = _rmsd_rows(
+         coordinates, centres, superimpose, chunk_size, range(count)
+        )
+    matrix = np.zeros((count, count))
+    for index, values in rows:
+        matrix[index, index + 1:] = values
+        matrix[index + 1:, index] = values
+    return matrix
+
+
+def _shareable(coordinates):
+    """Gets an array ready to be sent to other processes. Arrays which are
+    memory-mapped to the whole of a file are replaced with the details needed
+    to map the file again, rather than being copied.
+
+    :param numpy.ndarray coordinates: The array to send.
+    :rtype: ``numpy.ndarray`` or ``tuple``"""
+
+    if isinstance(coordinates, np.memmap) and isinstance(
+     coordinates.base, mmap.mmap
+    ) and coordinates.filename and coordinates.flags.c_contiguous:
+        return (
+         coordinates.filename, coordinates.dtype,
+         coordinates.offset, coordinates.shape
+        )
+    return np.asarray(coordinates, dtype=float)
+
+
+def _rmsd_rows(coordinates, centres, superimposing, chunk_size, indices):
+    """Calculates some rows of an RMSD matrix - the RMSDs between each given
+    structure and every structure after it in the stack.
+
+    :param numpy.ndarray coordinates: The (M, N, 3) stack of coordinates, or\
+    the filename, dtype, offset and shape of a file to map them from.
+    :param numpy.ndarray centres: The (M, 3) centres to superimpose about.
+    :param bool superimposing: Whether to superimpose each pair first.
+    :param int chunk_size: How many structures to compare at once.
+    :param indices: The indices of the rows to calculate.
+    :rtype: ``list``"""
+
+    if isinstance(coordinates, tuple):
+        filename, dtype, offset, shape = coordinates
+        coordinates = np.memmap(
+         filename, dtype=dtype, mode="r", offset=offset, shape=shape
+        )
+    count, rows = len(coordinates), []
+    step = chunk_size or count
+    for index in indices:
+        structure = np.asarray(coordinates[index], dtype=float)
+        values = []
+        for start in range(index + 1, count, step):
+            others = np.asarray(coordinates[start:start + step], dtype=float)
+            if superimposing:
+                others = superimpose(
+                 others, structure, centres[start:start + step], centres[index]
+                )
+            values.append(rmsd(others, structure))
+        rows.append((index, np.concatenate(values) if values else []))
+    return rows
+
+
+def distance_matrix(coordinates, other=None, dtype=np.float32, block_size=1024,
+                    out=None):
+    """Calculates the distance between every point in one (N, 3) array of
+    coordinates and every point in another (M, 3) array, or between every pair
+    of points in a single array. The matrix is filled in square blocks so that
+    only a block's worth of intermediate values is held in memory at once.
+
+    :param numpy.ndarray coordinates: The first coordinates.
+    :param numpy.ndarray other: The second coordinates. If not given the\
+    first coordinates are compared with themselves.
+    :param dtype: The data type of the matrix.
+    :param int block_size: The number of rows and columns per block.
+    :param numpy.ndarray out: An existing (N, M) array (such as a memory-mapped\
+    one) to write into.
+    :raises ValueError: if the block size is not positive.
+    :raises ValueError: if the output array is the wrong shape.
+    :rtype: ``numpy.ndarray``"""
+
+    if block_size < 1:
+        raise ValueError("{} is not a valid block size".format(block_size))
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    symmetric = other is None
+    other = coordinates if symmetric else np.asarray(
+     other, dtype=float
+    ).reshape(-1, 3)
+    shape = (len(coordinates), len(other))
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError("Output of shape {} should be {}".format(
+         out.shape, shape
+        ))
+    for start in range(0, shape[0], block_size):
+        block = coordinates[start:start + block_size, None]
+        end = start + len(block)
+        for other_start in range(start if symmetric else 0, shape[1], block_size):
+            other_block = other[None, other_start:other_start + block_size]
+            other_end = other_start + other_block.shape[1]
+            distances = np.sqrt(((block - other_block) ** 2).sum(axis=2))
+            out[start:end, other_start:other_end] = distances
+            if symmetric and other_start != start:
+                out[other_start:other_end, start:end] = distances.T
+    return out
+
+
+def grid_axes(coordinates, size=1, margin=0):
+    """Works out the points along each axis of a grid which encloses some
+    coordinates. The points are multiples of the grid spacing, and zero is
+    always one of them.
+
+    :param numpy.ndarray coordinates: The (N, 3) coordinates to enclose.
+    :param size: The spacing between grid points.
+    :param margin: How far to extend the grid beyond the coordinates.
+    :rtype: ``tuple``"""
+
+    coordinates = np.asarray(coordinates).reshape(-1, 3)
+    minimums = coordinates.min(axis=0) - margin
+    maximums = coordinates.max(axis=0) + margin
+    return tuple(np.arange(
+     min(0, math.floor(low / size)), max(0, math.ceil(high / size)) + 1
+    ) * size for low, high in zip(minimums.tolist(), maximums.tolist()))
+
+
+def grid_points(axes):
+    """Turns the points along each axis of a grid into an (N, 3) array of
+    every grid point, with the x value changing slowest and z fastest.
+
+    :param tuple axes: The three arrays of axis values.
+    :rtype: ``numpy.ndarray``"""
+
+    return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def voxelize(coordinates, axes, size, radius, density=False):
+    """Marks the points of a regular grid which are within a given distance
+    of any of some coordinates. Every coordinate is splatted onto the nearby
+    grid points in one operation per neighbouring grid offset.
+
+    :param numpy.ndarray coordinates: The (N, 3) coordinates to splat.
+    :param tuple axes: The three arrays of axis values, as produced by\
+    :py:func:`grid_axes`.
+    :param size: The spacing between grid points.
+    :param radius: The distance from a coordinate at which a point is covered.
+    :param bool density: If ``True``, each point will hold the number of\
+    coordinates covering it rather than just whether it is covered.
+    :rtype: ``numpy.ndarray``"""
+
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    shape = tuple(len(axis) for axis in axes)
+    voxels = np.zeros(shape, dtype=np.float32 if density else bool)
+    if not len(coordinates): return voxels
+    origin = np.array([axis[0] for axis in axes], dtype=float)
+    bases = np.floor((coordinates - origin) / size).astype(int)
+    reach = int(math.ceil(radius / size))
+    steps = np.arange(-reach, reach + 2)
+    for offset in np.stack(np.meshgrid(
+     steps, steps, steps, indexing="ij"
+    ), axis=-1).reshape(-1, 3):
+        indices = bases + offset
+        inside = ((indices >= 0) & (indices < shape)).all(axis=1)
+        points = origin + indices * size
+        inside &= np.sqrt(
+         ((points - coordinates) ** 2).sum(axis=1)
+        ) <= radius
+        x, y, z = indices[inside].T
+        if density:
+            np.add.at(voxels, (x, y, z), 1)
+        else:
+            voxels[x, y, z] = True
+    return voxels
@@ -0,0 +1,193 @@
+"""This module contains the compressed bond graph used to query the bonds of a
+whole model at once."""
+
+from collections import deque
+import numpy as np
+
+class BondGraph:
+    """An undirected graph of the bonds between some atoms, stored in
+    compressed sparse row (CSR) form - the neighbours of the atom at row ``i``
+    are ``indices[indptr[i]:indptr[i + 1]]``.
+
+    Atoms are referred to by integer row, and :py:attr:`atoms` maps rows back
+    to :py:class:`.Atom` objects. Graphs are snapshots - they do not change if
+    bonds are later made or broken.
+
+    :param atoms: The atoms that make up the nodes of the graph, in row order.
+    :param pairs: An (M, 2) array-like of the rows of bonded atoms. Each bond\
+    should appear once, in either order.
+    :raises ValueError: if a pair refers to a row that doesn't exist."""
+
+    def __init__(self, atoms, pairs):
+        self._atoms = tuple(atoms)
+        size = len(self._atoms)
+        pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+        if pairs.size and (pairs.min() < 0 or pairs.max() >= size):
+            raise ValueError("Bond pairs refer to rows outside the graph")
+        sources = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        targets = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        order = np.lexsort((targets, sources))
+        self._indices = targets[order]
+        self._indptr = np.zeros(size + 1, dtype=int)
+        np.cumsum(np.bincount(sources, minlength=size), out=self._indptr[1:])
+
+
+    def __repr__(self):
+        return "<BondGraph ({} atoms, {} bonds)>".format(
+         len(self._atoms), self.bond_count
+        )
+
+
+    def __len__(self):
+        return len(self._atoms)
+
+
+    @staticmethod
+    def from_atoms(atoms):
+        """Creates a graph from the :py:class:`.Bond` objects of some atoms.
+        Bonds to atoms not in the collection given are ignored.
+
+        :param atoms: The atoms to use, in row order.
+        :rtype: ``BondGraph``"""
+
+        atoms = tuple(atoms)
+        rows = {atom: row for row, atom in enumerate(atoms)}
+        pairs = []
+        for row, atom in enumerate(atoms):
+            for bond in atom._bonds:
+                for other in bond._atoms:
+                    other_row = rows.get(other)
+                    if other_row is not None and other_row > row:
+                        pairs.append((row, other_row))
+        return BondGraph(atoms, pairs)
+
+
+    @property
+    def atoms(self):
+        """The :py:class:`.Atom` objects of the graph, in row order.
+
+        :rtype: ``tuple``"""
+
+        return self._atoms
+
+
+    @property
+    def indptr(self):
+        """The CSR row pointer array, of length N + 1.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._indptr
+
+
+    @property
+    def indices(self):
+        """The CSR column array - every atom's neighbour rows, concatenated.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._indices
+
+
+    @property
+    def degrees(self):
+        """The number of bonds each atom has.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return np.diff(self._indptr)
+
+
+    @property
+    def bond_count(self):
+        """The number of bonds in the graph.
+
+        :rtype: ``int``"""
+
+        return len(self._indices) // 2
+
+
+    def neighbours(self, row):
+        """Returns the rows of the atoms bonded to the atom at the row given.
+
+        :param int row: The atom's row.
+        :rtype: ``numpy.ndarray``"""
+
+        return self._indices[self._indptr[row]:self._indptr[row + 1]]
+
+
+    def pairs(self):
+        """Returns every bond in the graph as a pair of rows, lowest row first,
+        ordered by first row then second row.
+
+        :rtype: ``numpy.ndarray``"""
+
+        sources = np.repeat(np.arange(len(self._atoms)), self.degrees)
+        mask = sources < self._indices
+        return np.column_stack((sources[mask], self._indices[mask]))
+
+
+    def components(self):
+        """Labels each atom with the connected component (bonded fragment) it
+        belongs to. Labels start at 0 and are numbered in order of each
+        component's lowest row.
+
+        :rtype: ``numpy.ndarray``"""
+
+        parents = list(range(len(self._atoms)))
+        def find(row):
+            while parents[row] != row:
+                parents[row] = parents[parents[row]]
+                row = parents[row]
+            return row
+        for first, second in self.pairs().tolist():
+            first, second = find(first), find(second)
+            if first != second:
+                parents[max(first, second)] = min(first, second)
+        roots = np.array([find(row) for row in range(len(parents))], dtype=int)
+        return np.unique(roots, return_inverse=True)[1].reshape(-1)
+
+
+    def hop_distances(self, start):
+        """Returns the number of bonds on the shortest path from one atom to
+        every other atom, or -1 where there is no path.
+
+        :param int start: The row of the atom to start from.
+        :rtype: ``numpy.ndarray``"""
+
+        distances = np.full(len(self._atoms), -1, dtype=int)
+        distances[start] = 0
+        queue = deque([start])
+        indptr, indices = self._indptr, self._indices
+        while queue:
+            row = queue.popleft()
+            for other in indices[indptr[row]:indptr[row + 1]].tolist():
+                if distances[other] < 0:
+                    distances[other] = distances[row] + 1
+                    queue.append(other)
+        return distances
+
+
+    def shortest_path(self, start, end):
+        """Returns the rows of the atoms on the shortest bonded path between two
+        atoms, including both ends, or ``None`` if they aren't connected.
+
+        :param int start: The row of the first atom.
+        :param int end: The row of the last atom.
+        :rtype: ``list``"""
+
+        previous = {start: None}
+        queue = deque([start])
+        indptr, indices = self._indptr, self._indices
+        while queue:
+            row = queue.popleft()
+            if row == end:
+                path = []
+                while row is not None:
+                    path.append(row)
+                    row = previous[row]
+                return path[::-1]
+            for other in indices[indptr[row]:indptr[row + 1]].tolist():
+                if other not in previous:
+                    previous[other] = row
+                    queue.append(other)
@@ -1,6 +1,10 @@
 """This module contains the Model class and its interfaces."""
 
+import numpy as np
 from .atoms import Atom
+from .arrays import AtomArrays
+from .graphs import BondGraph
+from .spatial import CellList
 from .molecules import AtomicStructure, Molecule, Residue
 from .chains import Chain
 
@@ -10,14 +14,246 @@ class Model(AtomicStructure):
     Represents molecular systems. These are essentially the isolated universes
     in which the other structures live.
 
+    A model stores the coordinates, B-factors, charges and elements of its
+    atoms in contiguous arrays (see :py:class:`.AtomArrays`), so that operations
+    on the whole model can be done in single NumPy operations.
+
     :param \*atoms: The atoms that make up the model. These can also be\
     :py:class:`.AtomicStructure` objects, in which case the atoms of that\
     structure will be used in its place."""
 
+    _parent_attribute, _tracked, _registering = "_model", True, True
+
     def __init__(self, *atoms):
         AtomicStructure.__init__(self, *atoms)
-        for atom in self._atoms:
-            atom._model = self
+        self._arrays = AtomArrays(capacity=len(self._atoms))
+        self._bond_graph, self._spatial_index = None, None
+        self._claim(self._atoms)
+        self._arrays.extend(self._atoms)
+
+
+    @property
+    def arrays(self):
+        """The :py:class:`.AtomArrays` which store the values of the model's
+        atoms.
+
+        :rtype: ``AtomArrays``"""
+
+        return self._arrays
+
+
+    def bond_graph(self):
+        """Returns a :py:class:`.BondGraph` of the bonds between the model's
+        atoms, whose rows match those of the model's :py:attr:`arrays`. The
+        graph is built once and then reused until atoms are added or removed,
+        or bonds are made or broken.
+
+        :rtype: ``BondGraph``"""
+
+        topology = self._arrays.topology
+        if self._bond_graph is None or self._bond_graph[0] != topology:
+            graph = BondGraph.from_atoms(self._arrays._atoms)
+            self._bond_graph = (topology, graph)
+        return self._bond_graph[1]
+
+
+    def add(self, structure):
+        """Adds an atomic structure to the model - its atoms will be
+        incorporated, and their values stored in the model's arrays in one
+        go.
+
+        :param AtomicStructure structure: The structure to add.
+        :raises TypeError: if the structure is not an AtomicStructure."""
+
+        if not isinstance(structure, AtomicStructure):
+            raise TypeError("{} is not an atomic structure".format(structure))
+        atoms = [atom for atom in structure._atoms if atom not in self._atoms]
+        for atom in atoms:
+            self._id_atoms.setdefault(atom._id, set()).add(atom)
+        self._claim(structure._atoms)
+        if atoms:
+            self._version += 1
+            if self._indexes is not None and self._indexes_current():
+                for atom in atoms: self._index_atom(atom)
+            else:
+                self._indexes = None
+            self._atoms.update(atoms)
+            self._register(atoms)
+        self._arrays.extend(atoms)
+
+
+    def add_atom(self, atom):
+        """Adds an :py:class:`.Atom` to the model, storing its values in the
+        model's arrays.
+
+        :param Atom atom: The atom to add.
+        :raises TypeError: if the atom given is not an Atom."""
+
+        AtomicStructure.add_atom(self, atom)
+        self._arrays.add(atom)
+
+
+    def remove_atom(self, atom):
+        """Removes an :py:class:`.Atom` from the model, handing its values back
+        to the atom itself.
+
+        :param Atom atom: The atom to remove."""
+
+        AtomicStructure.remove_atom(self, atom)
+        self._arrays.remove(atom)
+
+
+    def spatial_index(self):
+        """Returns a :py:class:`.CellList` of the model's atom coordinates,
+        whose rows are the rows of the model's :py:attr:`arrays`. It is only
+        built when first needed, and is rebuilt if the atoms move or atoms are
+        added or removed.
+
+        :rtype: ``CellList``"""
+
+        if self._spatial_index is None \
+         or self._spatial_index[0] != self._arrays.version:
+            self._spatial_index = (
+             self._arrays.version, CellList(self._arrays.coordinates)
+            )
+        return self._spatial_index[1]
+
+
+    def _sphere_atoms(self, centre, radius):
+        if len(self._arrays) != len(self._atoms):
+            return AtomicStructure._sphere_atoms(self, centre, radius)
+        rows = self.spatial_index().query_sphere(centre, radius)
+        atoms = self._arrays._atoms
+        return [atoms[row] for row in rows.tolist()]
+
+
+    def neighbour_pairs(self, cutoff, *args, atoms=False, chunk_size=4096,
+                        **kwargs):
+        """Finds every pair of atoms in the model which are within a cutoff
+        distance of each other, using the model's :py:meth:`spatial_index`.
+        Each pair is given once, and any atom query criteria given (element,
+        hydrogen etc.) must be met by both atoms.
+
+        By default pairs are given as rows of the model's :py:attr:`arrays`,
+        lowest row first and ordered by first row then second row.
+
+        :param float cutoff: The distance cutoff (inclusive).
+        :param bool atoms: If ``True``, pairs are given as :py:class:`.Atom`\
+        tuples rather than rows.
+        :param int chunk_size: The number of atoms to search around at once,\
+        which limits the memory used.
+        :param int id: if given, only atoms whose ID matches this will be\
+        used.
+        :param str name: if given, only atoms whose name matches this will be\
+        used.
+        :param str element: if given, only atoms whose element matches this\
+        will be used.
+        :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
+        :param bool het: If ``False``, non-chain atoms will be excluded.
+        :param bool metal: If ``False``, metal atoms will be excluded.
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be used.
+        :returns: an (M, 2) array of rows (or a list of atom pairs) and an\
+        array of the M distances.
+        :rtype: ``tuple``"""
+
+        arrays = self._arrays
+        if args or kwargs:
+            rows = np.array(sorted(
+             atom._index for atom in self.atoms(*args, **kwargs)
+            ), dtype=int)
+        else:
+            rows = np.arange(len(arrays))
+        selected = np.zeros(len(arrays), dtype=bool)
+        selected[rows] = True
+        index = self.spatial_index()
+        pairs, distances = [np.zeros((0, 2), dtype=int)], [np.zeros(0)]
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            centres, found, lengths = index.neighbours(
+             arrays.coordinates[chunk], cutoff
+            )
+            firsts = chunk[centres]
+            keep = (found > firsts) & selected[found]
+            pairs.append(np.column_stack((firsts[keep], found[keep])))
+            distances.append(lengths[keep])
+        pairs, distances = np.concatenate(pairs), np.concatenate(distances)
+        if atoms:
+            atom_list = arrays._atoms
+            pairs = [(atom_list[i], atom_list[j]) for i, j in pairs.tolist()]
+        return pairs, distances
+
+
+    def sites(self, cutoff=4, water=False, main_chain=False, carbon=True):
+        """Returns the :py:class:`.Site` of every ligand in the model - every
+        :py:class:`.Molecule` which isn't a residue, chain or water. The
+        neighbours of all the ligands are found in one search.
+
+        :param float cutoff: determines the distance cutoff to use. The default\
+        is 4.
+        :param bool water: If ``True``, water molecules will be\
+        obtained as well as residues.
+        :param bool main_chain: If ``True`` main chain atoms will be considered\
+        when determining binding residues.
+        :param bool carbon: If ``False`` carbon atoms will not be considered.
+        :rtype: ``set``"""
+
+        ligands = list(self.molecules(generic=True, water=False))
+        groups = [ligand.atoms(hydrogen=False) for ligand in ligands]
+        return set(ligand._site_from_nearby(
+         atoms, nearby, water, main_chain, carbon
+        ) for ligand, atoms, nearby in zip(
+         ligands, groups, self._neighbourhoods(groups, cutoff)
+        ))
+
+
+    def _neighbourhoods(self, groups, cutoff):
+        """Takes some groups of atoms and, for each group, finds the model's
+        non-hydrogen atoms which are within a cutoff distance of any atom in
+        the group other than itself.
+
+        :param list groups: The collections of atoms to search around.
+        :param float cutoff: The distance cutoff.
+        :rtype: ``list``"""
+
+        if len(self._arrays) != len(self._atoms):
+            return [set().union(*[
+             atom.nearby_atoms(cutoff, hydrogen=False) for atom in group
+            ]) for group in groups]
+        arrays, labels, rows = self._arrays, [], []
+        for label, group in enumerate(groups):
+            for atom in group:
+                if atom._arrays is arrays:
+                    labels.append(label)
+                    rows.append(atom._index)
+        labels, rows = np.array(labels, dtype=int), np.array(rows, dtype=int)
+        centres, found, _ = self.spatial_index().neighbours(
+         arrays.coordinates[rows], cutoff
+        )
+        keep = (found != rows[centres]) \
+         & arrays.element_mask(hydrogen=False)[found]
+        neighbourhoods = [set() for group in groups]
+        atoms = arrays._atoms
+        for label, row in zip(
+         labels[centres[keep]].tolist(), found[keep].tolist()
+        ):
+            neighbourhoods[label].add(atoms[row])
+        return neighbourhoods
+
+
+    def _atom_rows(self):
+        if len(self._arrays) == len(self._atoms):
+            return self._arrays._atoms, self._arrays, slice(
+             0, len(self._atoms)
+            )
+        return AtomicStructure._atom_rows(self)
+
+
+    def _element_candidates(self, element, hydrogen, metal):
+        if len(self._arrays) != len(self._atoms): return None
+        mask = self._arrays.element_mask(element, hydrogen, metal)
+        atoms = self._arrays._atoms
+        return [atoms[row] for row in np.flatnonzero(mask).tolist()]
 
 
 
@@ -30,6 +266,8 @@ class Complex(AtomicStructure):
     :py:class:`.AtomicStructure` objects, in which case the atoms of that\
     structure will be used in its place."""
 
+    _parent_attribute, _tracked = "_complex", True
+
     def __init__(self, *atoms, id=None, name=None):
         AtomicStructure.__init__(self, *atoms)
         if id is not None and not isinstance(id, str):
@@ -38,8 +276,7 @@ class Complex(AtomicStructure):
             raise TypeError("Complex name {} is not a string".format(name))
         self._id = id
         self._name = name
-        for atom in self._atoms:
-            atom._complex = self
+        self._claim(self._atoms)
 
 
     @property
@@ -64,4 +301,5 @@ class Complex(AtomicStructure):
     def name(self, name):
         if not isinstance(name, str):
             raise TypeError("Complex name '{}' is not str".format(name))
+        self._rename(name)
         self._name = name
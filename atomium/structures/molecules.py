@@ -5,9 +5,21 @@ from collections import Counter
 from itertools import combinations
 from functools import reduce
 import operator
+import weakref
 import numpy as np
-import rmsd
-from .atoms import Atom, atom_query
+from .atoms import Atom, Bond, atom_query, compile_atom_query
+from .arrays import locate_atoms, get_coordinates, set_coordinates
+from .geometry import rotation_matrix, quaternion_matrix, matrix_about_point
+from .geometry import transform_coordinates, distance_matrix, grid_axes
+from .geometry import grid_points, voxelize, rmsd, pairwise_rmsd
+from .geometry import superimpose as superimpose_coordinates
+from .geometry import superposition_matrix
+from .spatial import sphere_mask
+from .registries import StructureRegistry
+from .views import SetView
+
+INDEX_THRESHOLD = 32
+EMPTY = frozenset()
 
 class AtomicStructure:
     """Represents structures made of :py:class:`.Atom` objects, which tends to
@@ -16,13 +28,27 @@ class AtomicStructure:
     specific entities.
 
     AtomicStructures are containers of their atoms, and support the ``in``
-    keyword.
+    keyword. Queries by atom ID, element, name or residue name are answered
+    from indexes, which are kept up to date as atoms are added and removed.
+    Structures with only a few atoms, such as residues, just check every atom
+    instead.
+    Structures which their atoms point back to (models, complexes, chains,
+    molecules and residues) also have their indexes updated when an atom's
+    labels change - other structures rebuild theirs after any label change.
+    Models also keep registries of the residues, chains, molecules and
+    complexes that their atoms belong to, so that these can be listed without
+    checking every atom.
 
     :param \*atoms: The :py:class:`.Atom` objects that make up the structure.\
     These can also be AtomicStructures themsevles, in which case the atoms of\
     that structure will be used in its place.
     :raises TypeError: if non-atoms or AtomicStructures are given."""
 
+    _indexes, _version, _rows_cache, _property_cache = None, 0, None, None
+    _pairings, _labels, _registries = None, 0, None
+    _parent_attribute, _tracked, _labelling = None, False, False
+    _registering = False
+
     def __init__(self, *atoms):
         self._atoms = set()
         for atom in atoms:
@@ -47,11 +73,16 @@ class AtomicStructure:
         return member in self._atoms
 
 
-    @atom_query
-    def atoms(self):
+    def atoms(self, id=None, name=None, element=None, hydrogen=True, het=True,
+              metal=True, residue_name=None):
         """Returns the :py:class:`.Atom` objects in the structure. You can
         filter these by element if you wish.
 
+        If no criteria are given, or only an ID, a read-only view of the
+        structure's own atoms is returned without copying them (see
+        :py:class:`.SetView`) - use its ``copy`` method if you need a set you
+        can change. Otherwise a new ``set`` of the matching atoms is returned.
+
         :param int id: if given, only atoms whose ID matches this will be\
         returned.
         :param str name: if given, only atoms whose name matches this will be\
@@ -61,9 +92,194 @@ class AtomicStructure:
         :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
         :param bool het: If ``False``, non-chain atoms will be excluded.
         :param bool metal: If ``False``, metal atoms will be excluded.
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be returned.
+        :rtype: ``SetView``"""
+
+        atoms = self._atoms
+        if id:
+            atoms = self._id_atoms.get(id, EMPTY)
+        elif (element or name or residue_name) \
+         and len(atoms) > INDEX_THRESHOLD:
+            atoms = self._indexed_atoms(element, name, residue_name)
+        elif not hydrogen or not metal:
+            candidates = self._element_candidates(element, hydrogen, metal)
+            if candidates is not None:
+                atoms, hydrogen, metal = candidates, True, True
+        check = compile_atom_query(
+         None, name, element, hydrogen, het, metal, residue_name
+        )
+        if check is not None: return set(filter(check, atoms))
+        if atoms is self._atoms or id: return SetView(atoms)
+        return set(atoms)
+
+
+    def _atom_indexes(self):
+        """Returns the structure's element, name and residue name indexes,
+        building them first if they don't exist or are out of date.
+
+        :rtype: ``tuple``"""
+
+        if self._indexes is None or not self._indexes_current():
+            self._indexes = (Atom._label_version, {}, {}, {})
+            for atom in self._atoms: self._index_atom(atom)
+        return self._indexes
+
+
+    def _indexes_current(self):
+        """Checks whether the structure's atom indexes can still be used.
+        Structures which their atoms point back to are told when an atom's
+        labels change, and so their indexes are always current. Other
+        structures' indexes are out of date if atom names, elements or residues
+        have changed anywhere since they were built.
+
+        :rtype: ``bool``"""
+
+        return self._tracked or self._indexes[0] == Atom._label_version
+
+
+    def _label_stamp(self):
+        """Returns a value which changes whenever the labels of the structure's
+        atoms - their names, elements, residues and chains - might have
+        changed.
+
+        :rtype: ``tuple``"""
+
+        if self._tracked: return (self._version, id(self), self._labels)
+        return (self._version, None, Atom._label_version)
+
+
+    def _claim(self, atoms, attribute=None, relabel=False):
+        """Points some atoms back at the structure. If an atom pointed to
+        another structure of the same kind, that structure no longer finds out
+        when the atom's labels change, and so stops trusting its indexes.
+
+        :param atoms: The atoms to claim.
+        :param str attribute: The atom attribute to use, if not the\
+        structure's own.
+        :param bool relabel: if ``True``, the structure is one of the atoms'\
+        labels, and the other structures keeping track of them are told."""
+
+        attribute = attribute or self._parent_attribute or \
+         "_" + self.__class__.__name__.lower()
+        relabelled = []
+        for atom in atoms:
+            if relabel:
+                parents = atom._unlabel()
+                if parents: relabelled.append((atom, parents))
+            values = atom.__dict__
+            previous = values.get(attribute)
+            if previous is not self:
+                if previous is not None \
+                 and previous._parent_attribute == attribute:
+                    previous._tracked = False
+                model = values.get("_model")
+                if model is not None and model._registries is not None:
+                    registry = model._registries.get(attribute)
+                    if registry is not None: registry.move(previous, self)
+            values[attribute] = self
+        if relabel: Atom._label_version += 1
+        for atom, parents in relabelled: atom._relabel(parents)
+
+
+    def _registry(self, attribute):
+        """Returns the structure's registry of one kind of structure that its
+        atoms belong to, creating it first if needed. Only structures which
+        their atoms point back to can keep registries, as they are told when
+        their atoms' residues, chains, molecules and complexes change - for
+        other structures ``None`` is returned.
+
+        :param str attribute: The atom attribute the registry is of, such as\
+        ``"_residue"``.
+        :rtype: ``StructureRegistry``"""
+
+        if not self._registering or not self._tracked:
+            self._registries = None
+            return None
+        if self._registries is None: self._registries = {}
+        registry = self._registries.get(attribute)
+        if registry is None:
+            registry = StructureRegistry(
+             [atom.__dict__[attribute] for atom in self._atoms]
+            )
+            self._registries[attribute] = registry
+        return registry
+
+
+    def _register(self, atoms, remove=False):
+        """Adds the structures that some atoms belong to to the structure's
+        registries, or removes them, as the atoms join or leave.
+
+        :param atoms: The atoms joining or leaving.
+        :param bool remove: if ``True``, the atoms are leaving."""
+
+        if self._registries is None: return
+        for attribute, registry in self._registries.items():
+            update = registry.remove if remove else registry.add
+            for atom in atoms: update(atom.__dict__[attribute])
+
+
+    def _rename(self, name):
+        """Tells the registries of the models that the structure's atoms are in
+        that the structure is about to be renamed.
+
+        :param str name: The structure's new name."""
+
+        models = set(atom.__dict__.get("_model") for atom in self._atoms)
+        for model in models:
+            if model is not None and model._registries is not None:
+                for registry in model._registries.values():
+                    registry.rename(self, name)
+
+
+    def _index_atom(self, atom, remove=False):
+        """Adds an atom to the structure's indexes, or removes it from them.
+
+        :param Atom atom: The atom to index.
+        :param bool remove: if ``True``, the atom will be removed instead."""
+
+        residue = atom._residue
+        keys = (atom._upper_element, atom._name,
+         residue._name if residue is not None else None)
+        for index, key in zip(self._indexes[1:], keys):
+            if remove:
+                atoms = index.get(key)
+                if atoms is not None:
+                    atoms.discard(atom)
+                    if not atoms: del index[key]
+            else:
+                index.setdefault(key, set()).add(atom)
+
+
+    def _indexed_atoms(self, element, name, residue_name):
+        """Uses the structure's indexes to get the atoms that could match the
+        element, name and residue name given - the smallest of the matching
+        index entries is returned.
+
+        :param str element: The element to look up.
+        :param str name: The atom name to look up.
+        :param str residue_name: The residue name to look up.
         :rtype: ``set``"""
 
-        return set(self._atoms)
+        indexes = self._atom_indexes()
+        keys = (element.upper() if element else None, name, residue_name)
+        candidates = [
+         index.get(key, ()) for index, key in zip(indexes[1:], keys) if key
+        ]
+        return min(candidates, key=len)
+
+
+    def _element_candidates(self, element, hydrogen, metal):
+        """Returns the atoms that pass some element-based criteria, if there is
+        a faster way of finding them than checking every atom. Otherwise
+        ``None`` is returned.
+
+        :param str element: if given, only atoms of this element will pass.
+        :param bool hydrogen: If ``False``, hydrogen atoms will not pass.
+        :param bool metal: If ``False``, metal atoms will not pass.
+        :rtype: ``list``"""
+
+        return None
 
 
     def atom(self, *args, **kwargs):
@@ -82,6 +298,8 @@ class AtomicStructure:
         :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
         :param bool het: If ``False``, non-chain atoms will be excluded.
         :param bool metal: If ``False``, metal atoms will be excluded.
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be returned.
         :rtype: ``Atom``"""
 
         if "id" in kwargs:
@@ -103,12 +321,22 @@ class AtomicStructure:
 
         if not isinstance(atom, Atom):
             raise TypeError("Can only add atoms, not '{}'".format(atom))
+        parents = atom._unlabel() if self._labelling else None
         if atom.id in self._id_atoms:
             self._id_atoms[atom.id].add(atom)
         else:
             self._id_atoms[atom.id] = {atom}
-        atom.__dict__["_" + self.__class__.__name__.lower()] = self
+        self._claim((atom,))
+        if atom not in self._atoms:
+            self._version += 1
+            self._register((atom,))
+        if self._indexes is not None and atom not in self._atoms:
+            if self._indexes_current():
+                self._index_atom(atom)
+            else:
+                self._indexes = None
         self._atoms.add(atom)
+        if parents is not None: atom._relabel(parents)
 
 
     def remove_atom(self, atom):
@@ -116,12 +344,29 @@ class AtomicStructure:
 
         :param Atom atom: The atom to remove."""
 
-        try:
-            self._id_atoms[atom.id].remove(atom)
-            if not self._id_atoms[atom.id]: del self._id_atoms[atom.id]
-            atom.__dict__["_" + self.__class__.__name__.lower()] = None
-            self._atoms.remove(atom)
-        except KeyError: pass
+        if atom not in self._atoms: return
+        parents = atom._unlabel() if self._labelling else None
+        self._id_atoms[atom.id].remove(atom)
+        if not self._id_atoms[atom.id]: del self._id_atoms[atom.id]
+        if self._indexes is not None:
+            if self._indexes_current():
+                self._index_atom(atom, remove=True)
+            else:
+                self._indexes = None
+        self._register((atom,), remove=True)
+        attribute = self._parent_attribute or \
+         "_" + self.__class__.__name__.lower()
+        values = atom.__dict__
+        previous, model = values.get(attribute), values.get("_model")
+        if previous is not None and previous is not model \
+         and model is not None and model._registries is not None:
+            registry = model._registries.get(attribute)
+            if registry is not None: registry.remove(previous)
+        values[attribute] = None
+        self._atoms.remove(atom)
+        self._version += 1
+        if parents is not None:
+            atom._relabel([parent for parent in parents if parent is not self])
 
 
     def pairwise_atoms(self, *args, **kwargs):
@@ -170,6 +415,8 @@ class AtomicStructure:
         :param str name: Filter by name.
         :rtype: ``Residue``"""
 
+        registry = self._registry("_residue")
+        if registry is not None: return registry.structures(id, name)
         res = set()
         for atom in self._atoms: res.add(atom.residue)
         try: res.remove(None)
@@ -201,12 +448,17 @@ class AtomicStructure:
         :param bool water: if ``False``, water molecules will be excluded.
         :rtype: ``Molecule``"""
 
-        molecules = set()
-        for atom in self._atoms: molecules.add(atom.molecule)
-        try: molecules.remove(None)
-        except KeyError: pass
-        if id: molecules = set(filter(lambda r: r.id == id, molecules))
-        if name: molecules = set(filter(lambda r: r.name == name, molecules))
+        registry = self._registry("_molecule")
+        if registry is not None:
+            molecules = registry.structures(id, name)
+        else:
+            molecules = set()
+            for atom in self._atoms: molecules.add(atom.molecule)
+            try: molecules.remove(None)
+            except KeyError: pass
+            if id: molecules = set(filter(lambda r: r.id == id, molecules))
+            if name:
+                molecules = set(filter(lambda r: r.name == name, molecules))
         if generic:
             from .chains import Chain
             molecules = set(filter(
@@ -241,6 +493,8 @@ class AtomicStructure:
         :param str name: Filter by name.
         :rtype: ``Chain``"""
 
+        registry = self._registry("_chain")
+        if registry is not None: return registry.structures(id, name)
         chains = set()
         for atom in self._atoms:
             chains.add(atom.chain)
@@ -274,6 +528,8 @@ class AtomicStructure:
         :param str name: Filter by name.
         :rtype: ``Complex``"""
 
+        registry = self._registry("_complex")
+        if registry is not None: return registry.structures(id, name)
         complexes = set()
         for atom in self._atoms:
             complexes.add(atom.complex)
@@ -299,6 +555,63 @@ class AtomicStructure:
         for complex in complexes: return complex
 
 
+    def _atom_rows(self):
+        """Returns the structure's atoms in a fixed order, along with the
+        :py:class:`.AtomArrays` that they are all stored in and their rows
+        there. If they aren't all stored in the same arrays, ``None`` is given
+        for both.
+
+        The result is reused until atoms are added to or removed from the
+        structure, or its atoms' rows change, or atoms move into or out of
+        any arrays while the structure's atoms aren't all in one.
+
+        :rtype: ``tuple``"""
+
+        cached = self._rows_cache
+        if cached is not None and cached[0] == self._version:
+            atoms, arrays, rows, stamp, attached = cached[1:]
+            if arrays is None and stamp == Atom._placement_version \
+             or arrays is not None and arrays._topology == stamp:
+                return atoms, arrays, rows
+        atoms = list(self._atoms)
+        arrays, rows = locate_atoms(atoms)
+        self._rows_cache = (
+         self._version, atoms, arrays, rows,
+         arrays._topology if arrays is not None else Atom._placement_version,
+         any(atom._arrays is not None for atom in atoms)
+        )
+        return atoms, arrays, rows
+
+
+    def _value_stamp(self):
+        """Returns a value which changes whenever the structure's atoms change
+        or any of their values change, or ``None`` if this can't be tracked
+        (because the atoms are split between several models).
+
+        :rtype: ``tuple``"""
+
+        atoms, arrays, rows = self._atom_rows()
+        if arrays is not None: return (self._version, id(arrays), arrays._version)
+        if self._rows_cache[5]: return None
+        return (self._version, None, Atom._free_version)
+
+
+    def _cached(self, name, calculate):
+        """Returns a derived value of the structure, calculating it only if the
+        structure has changed since it was last calculated.
+
+        :param str name: The name the value is cached under.
+        :param function calculate: Calculates the value from scratch."""
+
+        stamp = self._value_stamp()
+        if stamp is None: return calculate()
+        if self._property_cache is None or self._property_cache[0] != stamp:
+            self._property_cache = (stamp, {})
+        values = self._property_cache[1]
+        if name not in values: values[name] = calculate()
+        return values[name]
+
+
     def trim(self, places):
         """Rounds the coordinate values to a given number of decimal places.
         Useful for removing floating point rounding errors after transformation.
@@ -306,11 +619,13 @@ class AtomicStructure:
         :param int places: The number of places to round the coordinates to. If\
         ``None``, no rounding will be done."""
 
-        for atom in self.atoms():
-            atom.trim(places)
+        if places is not None:
+            atoms, arrays, rows = self._atom_rows()
+            coordinates = get_coordinates(atoms, arrays, rows)
+            set_coordinates(atoms, coordinates.round(places), arrays, rows)
 
 
-    def translate(self, *args, **kwargs):
+    def translate(self, dx=0, dy=0, dz=0, trim=12):
         """Translates the structure through space, updating all atom
         coordinates accordingly.
 
@@ -321,30 +636,68 @@ class AtomicStructure:
         after translating - the default is 12 decimal places but this can be\
         set to ``None`` if no rounding is to be done."""
 
-        for atom in self._atoms:
-            atom.translate(*args, **kwargs)
+        try:
+            dx, dy, dz = dx
+        except TypeError: pass
+        atoms, arrays, rows = self._atom_rows()
+        coordinates = get_coordinates(atoms, arrays, rows) + (dx, dy, dz)
+        if trim is not None: coordinates = coordinates.round(trim)
+        set_coordinates(atoms, coordinates, arrays, rows)
+
+
+    def transform(self, matrix, trim=None):
+        """Applies a transformation matrix to every atom in the structure at
+        once. A 3 x 3 matrix is applied about the origin, and a 4 x 4 affine
+        matrix can combine this with a translation.
+
+        :param matrix: The 3 x 3 or 4 x 4 matrix to apply.
+        :param int trim: The number of decimal places to round the new\
+        coordinates to. By default no rounding is done.
+        :raises ValueError: if the matrix is not 3 x 3 or 4 x 4."""
+
+        atoms, arrays, rows = self._atom_rows()
+        coordinates = transform_coordinates(
+         get_coordinates(atoms, arrays, rows), matrix
+        )
+        if trim is not None: coordinates = coordinates.round(trim)
+        set_coordinates(atoms, coordinates, arrays, rows)
 
 
-    def rotate(self, angle, axis, degrees=False, trim=12):
+    def rotate(self, angle, axis, degrees=False, trim=12, point=None):
         """Rotates the structure about an axis, updating all atom coordinates
         accordingly.
 
         :param Number angle: The angle in radians.
-        :param str axis: The axis to rotate around. Can only be 'x', 'y' or 'z'.
+        :param axis: The axis to rotate around. Can be 'x', 'y' or 'z', or any\
+        (x, y, z) vector.
         :param bool degrees: if ``True`` the angle will be interpreted as\
         degrees.
         :param int trim: The amount of rounding to do to the atom's coordinates\
         after translating - the default is 12 decimal places but this can be\
-        set to ``None`` if no rounding is to be done."""
+        set to ``None`` if no rounding is to be done.
+        :param point: The (x, y, z) point the axis passes through - by default\
+        the origin.
+        :raises ValueError: if an invalid axis is given."""
 
-        if axis not in ("x", "y", "z"):
-            raise ValueError("{} is not a valid axis".format(axis))
         angle = math.radians(angle) if degrees else angle
-        matrix = Atom.generate_rotation_matrix(None, angle, axis)
-        atoms = list(self._atoms)
-        for atom, vector in zip(atoms, [atom.location for atom in atoms]):
-            atom._x, atom._y, atom._z = matrix.dot(vector)
-        self.trim(trim)
+        matrix = rotation_matrix(angle, axis)
+        if point is not None: matrix = matrix_about_point(matrix, point)
+        self.transform(matrix, trim=trim)
+
+
+    def rotate_by_quaternion(self, quaternion, point=None, trim=None):
+        """Rotates the structure by the rotation a quaternion represents.
+
+        :param quaternion: The (w, x, y, z) quaternion. It will be normalised.
+        :param point: The (x, y, z) point to rotate about - by default the\
+        origin.
+        :param int trim: The number of decimal places to round the new\
+        coordinates to. By default no rounding is done.
+        :raises ValueError: if the quaternion is invalid."""
+
+        matrix = quaternion_matrix(quaternion)
+        if point is not None: matrix = matrix_about_point(matrix, point)
+        self.transform(matrix, trim=trim)
 
 
     @property
@@ -353,7 +706,10 @@ class AtomicStructure:
 
         :rtype: ``float``"""
 
-        return round(sum([atom.mass for atom in self._atoms]), 12)
+        def calculate():
+            atoms, arrays, rows = self._atom_rows()
+            return round(float(self._masses(atoms, arrays, rows).sum()), 12)
+        return self._cached("mass", calculate)
 
 
     @property
@@ -363,7 +719,12 @@ class AtomicStructure:
 
         :rtype: ``float``"""
 
-        return round(sum([atom.charge for atom in self._atoms]), 12)
+        def calculate():
+            atoms, arrays, rows = self._atom_rows()
+            if arrays is not None:
+                return round(float(arrays._charges[rows].sum()), 12)
+            return round(sum([atom.charge for atom in atoms]), 12)
+        return self._cached("charge", calculate)
 
 
     @property
@@ -372,7 +733,23 @@ class AtomicStructure:
 
         :rtype: ``Counter``"""
 
-        return Counter([atom.element for atom in self._atoms])
+        return Counter(self._cached(
+         "formula", lambda: Counter([atom.element for atom in self._atoms])
+        ))
+
+
+    def _masses(self, atoms, arrays=None, rows=None):
+        """Returns the masses of some atoms as an array, reading them from the
+        atoms' arrays if possible.
+
+        :param list atoms: The atoms to get the masses of.
+        :param AtomArrays arrays: The arrays the atoms are stored in.
+        :param rows: The rows of the atoms within those arrays.
+        :rtype: ``numpy.ndarray``"""
+
+        if arrays is not None:
+            return arrays.masses[rows]
+        return np.array([atom.mass for atom in atoms], dtype=float)
 
 
     @property
@@ -382,11 +759,12 @@ class AtomicStructure:
 
         :returns: (x, y, z) ``tuple``"""
 
-        mass = self.mass
-        average_x = sum([atom.x * atom.mass for atom in self._atoms]) / mass
-        average_y = sum([atom.y * atom.mass for atom in self._atoms]) / mass
-        average_z = sum([atom.z * atom.mass for atom in self._atoms]) / mass
-        return (average_x, average_y, average_z)
+        def calculate():
+            atoms, arrays, rows = self._atom_rows()
+            masses = self._masses(atoms, arrays, rows)
+            coordinates = get_coordinates(atoms, arrays, rows)
+            return tuple((masses.dot(coordinates) / masses.sum()).tolist())
+        return self._cached("center_of_mass", calculate)
 
 
     @property
@@ -397,16 +775,15 @@ class AtomicStructure:
 
         :rtype: ``float``"""
 
-        center_of_mass = self.center_of_mass
-        atoms = self._atoms
-        square_deviation = sum(
-         [atom.distance_to(center_of_mass) ** 2 for atom in atoms]
-        )
-        mean_square_deviation = square_deviation / len(atoms)
-        return math.sqrt(mean_square_deviation)
+        def calculate():
+            center_of_mass = self.center_of_mass
+            atoms, arrays, rows = self._atom_rows()
+            deviations = get_coordinates(atoms, arrays, rows) - center_of_mass
+            return math.sqrt((deviations ** 2).sum() / len(atoms))
+        return self._cached("radius_of_gyration", calculate)
 
 
-    def pairing_with(self, structure):
+    def pairing_with(self, structure, labels=False):
         """Takes another structure with the same number of atoms as this one,
         and attempts to find the nearest equivalent of every atom in this
         structure, in that structure.
@@ -416,77 +793,194 @@ class AtomicStructure:
         used to ensure that even when allocation is essentially random, it is at
         least the same every time two structures are aligned.
 
+        Alternatively, atoms can be paired by their labels - their chain ID,
+        residue ID (or molecule ID, for atoms not in a residue) and name. In
+        this case the structures can have different numbers of atoms, and only
+        atoms whose labels are in both structures will be paired.
+
+        The pairing is remembered, and reused until either structure's atoms
+        change. Only weak references to the other structure and its atoms are
+        kept, so remembering a pairing doesn't keep the other structure alive.
+
         :param AtomicStructure structure: the structure to pair with.
+        :param bool labels: if ``True``, atoms will be paired by label.
         :raises TypeError: if the other structure is not an\
         :py:class:`.AtomicStructure`.
         :raises ValueError: if the other structure has a different number of\
-        atoms.
+        atoms (when not pairing by label).
         :rtype: ``dict``"""
 
         if not isinstance(structure, AtomicStructure):
             raise TypeError("{} is not an AtomicStructure".format(structure))
-        atoms, other_atoms = list(self._atoms), list(structure._atoms)
-        if len(atoms) != len(other_atoms):
-            raise ValueError("{} and {} have different numbers of atoms".format(
-             self, structure
-            ))
-        for l in atoms, other_atoms:
-            l.sort(key=lambda a: (
-             a.element, a.name, len(a.bonds), a.id, id(a)
-            ))
-        return {a1: a2 for a1, a2 in zip(atoms, other_atoms)}
+        stamp = (self._label_stamp(), structure._label_stamp(), Bond._version)
+        if self._pairings is None: self._pairings = weakref.WeakKeyDictionary()
+        cached = self._pairings.setdefault(structure, {}).get(labels)
+        if cached is not None and cached[0] == stamp:
+            others = [ref() for ref in cached[2]]
+            if None not in others: return dict(zip(cached[1], others))
+        if labels:
+            pairing = self._pairing_by_label(structure)
+        else:
+            atoms, other_atoms = list(self._atoms), list(structure._atoms)
+            if len(atoms) != len(other_atoms):
+                raise ValueError(
+                 "{} and {} have different numbers of atoms".format(
+                  self, structure
+                 )
+                )
+            for l in atoms, other_atoms: l.sort(key=_pairing_key)
+            pairing = {a1: a2 for a1, a2 in zip(atoms, other_atoms)}
+        others = tuple(weakref.ref(atom) for atom in pairing.values())
+        self._pairings[structure][labels] = (stamp, tuple(pairing), others)
+        return pairing
 
 
-    def superimpose_onto(self, other):
+    def _pairing_by_label(self, structure):
+        """Pairs this structure's atoms with those of another structure which
+        have the same chain ID, residue or molecule ID, and name. Each structure's atoms
+        are grouped by label in one pass, and if several atoms share a label
+        they are paired in the usual sorted order.
+
+        :param AtomicStructure structure: the structure to pair with.
+        :rtype: ``dict``"""
+
+        groups, other_groups = {}, {}
+        for atoms, grouped in (
+         (self._atoms, groups), (structure._atoms, other_groups)
+        ):
+            for atom in atoms:
+                grouped.setdefault(_atom_label(atom), []).append(atom)
+        pairing = {}
+        for label, atoms in groups.items():
+            other_atoms = other_groups.get(label)
+            if other_atoms is None: continue
+            if len(atoms) == 1 and len(other_atoms) == 1:
+                pairing[atoms[0]] = other_atoms[0]
+            else:
+                pairing.update(zip(
+                 sorted(atoms, key=_pairing_key),
+                 sorted(other_atoms, key=_pairing_key)
+                ))
+        return pairing
+
+
+    def superimpose_onto(self, other, labels=False):
         """Superimoses this structure onto another - it will be translated so
         that its center of mass matches the other structure's, then rotated so
         as to minimise the RMSD.
 
-        The other structure must have the same number of atoms.
+        The other structure must have the same number of atoms, unless atoms
+        are paired by label, in which case only the paired atoms are used to
+        work out how to move the structure.
 
         :param AtomicStructure other: The structure to superimpose onto. This\
-        structure does not move."""
-
-        center, other_center = self.center_of_mass, other.center_of_mass
-        self.translate(-center[0], -center[1], -center[2])
-        atoms, other_atoms = zip(*self.pairing_with(other).items())
-        P = np.array([[*atom.location] for atom in atoms])
-        Q = [(
-         a.x - other_center[0], a.y - other_center[1], a.z - other_center[2]
-        ) for a in other_atoms]
-        P = rmsd.kabsch_rotate(P, Q)
-        for atom, row in zip(atoms, P):
-            atom.move_to(*row)
-        self.translate(other_center[0], other_center[1], other_center[2])
-
-
-    def rmsd_with(self, structure, superimpose=False):
+        structure does not move.
+        :param bool labels: if ``True``, atoms will be paired by label (see\
+        :py:meth:`pairing_with`)."""
+
+        coordinates, other_coordinates, centre, other_centre = \
+         self._paired_coordinates(other, labels)
+        self.transform(superposition_matrix(
+         coordinates, other_coordinates, centre, other_centre
+        ), trim=12)
+
+
+    def rmsd_with(self, structure, superimpose=False, labels=False):
         """Calculates the Root Mean Square Deviation between this structure and
         another.
 
         You can get the RMSD either of the coordinates as they are, or of
-        superimposed coordinates.
+        superimposed coordinates. Superposition is done on copies of the
+        coordinates, so neither structure is moved.
 
         :param AtomicStructure structure: the structure to check against.
-        :param bool superimpose: if ``True``, the structure will be\
-        superimosed first (and then moved back).
+        :param bool superimpose: if ``True``, the RMSD will be of this\
+        structure's coordinates after being superimposed onto the other's.
+        :param bool labels: if ``True``, atoms will be paired by label and only\
+        the paired atoms compared (see :py:meth:`pairing_with`).
         :raises TypeError: if the other structure is not an\
         :py:class:`.AtomicStructure`.
         :raises ValueError: if the other structure has a different number of\
-        atoms.
+        atoms, or no atoms in common.
         :rtype: ``float``"""
 
-        pairing = self.pairing_with(structure)
+        coordinates, other_coordinates, centre, other_centre = \
+         self._paired_coordinates(structure, labels)
         if superimpose:
-            atoms = list(self._atoms)
-            locations = [atom.location for atom in atoms]
-            self.superimpose_onto(structure)
-        sd = sum(a1.distance_to(a2) ** 2 for a1, a2 in pairing.items())
-        if superimpose:
-            for atom, location in zip(atoms, locations):
-                atom.move_to(*location)
-        msd = sd / len(pairing)
-        return math.sqrt(msd)
+            coordinates = superimpose_coordinates(
+             coordinates, other_coordinates, centre, other_centre
+            ).round(12)
+        return float(rmsd(coordinates, other_coordinates))
+
+
+    def _paired_coordinates(self, other, labels):
+        """Pairs this structure's atoms with another structure's, and returns
+        the coordinates of each set of paired atoms, along with the center of
+        mass of each. When pairing by label, the centers of mass are of the
+        paired atoms only.
+
+        :param AtomicStructure other: The structure to pair with.
+        :param bool labels: if ``True``, atoms will be paired by label.
+        :rtype: ``tuple``"""
+
+        pairing = self.pairing_with(other, labels=labels)
+        atoms, other_atoms = list(pairing.keys()), list(pairing.values())
+        if not atoms:
+            raise ValueError("{} and {} have no atoms in common".format(
+             self, other
+            ))
+        coordinates = get_coordinates(atoms, *locate_atoms(atoms))
+        other_coordinates = get_coordinates(
+         other_atoms, *locate_atoms(other_atoms)
+        )
+        if labels:
+            masses = np.array([atom.mass for atom in atoms], dtype=float)
+            centre = np.dot(masses, coordinates) / masses.sum()
+            other_centre = np.dot(masses, other_coordinates) / masses.sum()
+        else:
+            centre, other_centre = self.center_of_mass, other.center_of_mass
+        return coordinates, other_coordinates, centre, other_centre
+
+
+    def distance_matrix(self, other=None, dtype=np.float32, block_size=1024,
+                        path=None):
+        """Calculates the distances between every pair of atoms in the
+        structure, or between every atom in the structure and every atom in
+        another structure. The matrix is calculated in blocks of NumPy
+        operations.
+
+        :param AtomicStructure other: The structure to measure to, if not this\
+        one.
+        :param dtype: The data type of the matrix - single precision by\
+        default.
+        :param int block_size: The number of rows and columns calculated at\
+        once, which limits the memory used.
+        :param str path: If given, the matrix will be written to a\
+        memory-mapped ``.npy`` file at this location rather than held in memory.
+        :returns: the atoms of the matrix rows as a ``list``, the atoms of its\
+        columns, and the matrix itself.
+        :rtype: ``tuple``"""
+
+        atoms, arrays, rows = self._atom_rows()
+        coordinates = get_coordinates(atoms, arrays, rows)
+        if other is None:
+            other_atoms, other_coordinates = atoms, None
+        else:
+            other_atoms, other_arrays, other_rows = other._atom_rows()
+            other_coordinates = get_coordinates(
+             other_atoms, other_arrays, other_rows
+            )
+        out = None
+        if path is not None:
+            out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(
+             len(atoms), len(other_atoms)
+            ))
+        matrix = distance_matrix(
+         coordinates, other_coordinates, dtype=dtype,
+         block_size=block_size, out=out
+        )
+        if path is not None: matrix.flush()
+        return list(atoms), list(other_atoms), matrix
 
 
     def copy(self):
@@ -513,21 +1007,54 @@ class AtomicStructure:
         coordinates. The default is 0.
         :rtype: ``tuple``"""
 
-        atom_locations = [atom.location for atom in self._atoms]
-        dimension_values = []
-        for dimension in range(3):
-            coordinates = [loc[dimension] for loc in atom_locations]
-            min_, max_ = min(coordinates) - margin, max(coordinates) + margin
-            values = [0]
-            while values[0] > min_: values.insert(0, values[0] - size)
-            while values[-1] < max_: values.append(values[-1] + size)
-            dimension_values.append(values)
-        for x in dimension_values[0]:
-            for y in dimension_values[1]:
-                for z in dimension_values[2]:
+        xs, ys, zs = [axis.tolist() for axis in self._grid_axes(size, margin)]
+        for x in xs:
+            for y in ys:
+                for z in zs:
                     yield (x, y, z)
 
 
+    def grid_points(self, size=1, margin=0):
+        """Returns the points of the same grid as :py:meth:`grid`, in the same
+        order, as a single (N, 3) array.
+
+        :param int size: The spacing between grid points. The default is 1.
+        :param int margin: How far to extend the grid beyond the structure\
+        coordinates. The default is 0.
+        :rtype: ``numpy.ndarray``"""
+
+        return grid_points(self._grid_axes(size, margin))
+
+
+    def voxelize(self, size=1, radius=1, margin=None, density=False):
+        """Models a grid around the structure (see :py:meth:`grid`) and works
+        out which of its points are within a given radius of an atom.
+
+        :param int size: The spacing between grid points. The default is 1.
+        :param radius: The distance from an atom at which a grid point counts\
+        as occupied. The default is 1.
+        :param margin: How far to extend the grid beyond the structure\
+        coordinates. By default this is the radius.
+        :param bool density: If ``True``, each point will hold the number of\
+        atoms occupying it rather than whether it is occupied.
+        :returns: the three arrays of x, y and z values along the grid's axes,\
+        and a 3D array of the grid points.
+        :rtype: ``tuple``"""
+
+        if margin is None: margin = radius
+        axes = self._grid_axes(size, margin)
+        atoms, arrays, rows = self._atom_rows()
+        voxels = voxelize(
+         get_coordinates(atoms, arrays, rows), axes, size, radius, density
+        )
+        return axes, voxels
+
+
+    def _grid_axes(self, size, margin):
+        atoms, arrays, rows = self._atom_rows()
+        return grid_axes(get_coordinates(atoms, arrays, rows), size, margin)
+
+
     @atom_query
     def atoms_in_sphere(self, x, y, z, radius):
         """Returns all the atoms in a given sphere within the structure.
@@ -545,6 +1072,8 @@ class AtomicStructure:
         :param bool hydrogen: If ``False``, hydrogen atoms will be excluded.
         :param bool het: If ``False``, non-chain atoms will be excluded.
         :param bool metal: If ``False``, metal atoms will be excluded.
+        :param str residue_name: if given, only atoms in a residue with this\
+        name will be returned.
         :raises TypeError: if the model is not an atomium model object.
         :raises TypeError: if the coordinates are not numeric.
         :raises TypeError: if the radius is not numeric.
@@ -557,10 +1086,21 @@ class AtomicStructure:
             raise TypeError("{} is not a valid radius".format(radius))
         if radius < 0:
             raise ValueError("{} is not a valid radius".format(radius))
-        atoms = filter(
-         lambda a: a.distance_to((x, y, z)) <= radius, self._atoms
-        )
-        return set(atoms)
+        return set(self._sphere_atoms((x, y, z), radius))
+
+
+    def _sphere_atoms(self, centre, radius):
+        """Returns the atoms of the structure that are within a given distance
+        of a point.
+
+        :param centre: The (x, y, z) centre of the sphere.
+        :param radius: The radius of the sphere.
+        :rtype: ``list``"""
+
+        atoms, arrays, rows = self._atom_rows()
+        coordinates = get_coordinates(atoms, arrays, rows)
+        mask = sphere_mask(coordinates, centre, radius)
+        return [atoms[row] for row in np.flatnonzero(mask).tolist()]
 
 
     def to_file_string(self, file_format, description=None):
@@ -590,16 +1130,26 @@ class AtomicStructure:
     def save(self, path, *args, **kwargs):
         """Saves the structure to file, in the format implied by the extension
         of the path you provide (i.e. giving a path ``/path/to/file.xyz`` will
-        save as .xyz etc.).
+        save as .xyz etc.). If the path ends in .gz, .bz2 or .xz as well
+        (``/path/to/file.pdb.gz``, say) the file will be compressed as it is
+        written.
 
         :param str path: The path to save to. The extension you provide here is\
         important as atomium will use that to determine what file format to\
         save as.
         :param str description: A structure description to put in the file."""
 
-        file_format = path.split(".")[-1].lower()
-        s = self.to_file_string(file_format, *args, **kwargs)
+        from ..files.utilities import open_file, path_compression
         from ..files.utilities import string_to_file
+        extensions = path.split(".")
+        if path_compression(path): extensions = extensions[:-1]
+        file_format = extensions[-1].lower()
+        if file_format == "pdb":
+            from ..files.pdb2pdbfile import structure_to_pdb_file
+            with open_file(path, "w") as f:
+                structure_to_pdb_file(self, f, *args, **kwargs)
+            return
+        s = self.to_file_string(file_format, *args, **kwargs)
         string_to_file(s, path)
 
 
@@ -619,6 +1169,8 @@ class Molecule(AtomicStructure):
     :raises TypeError: if non-atoms are given.
     :raises TypeError: if the ID or name is not str."""
 
+    _parent_attribute, _tracked, _labelling = "_molecule", True, True
+
     def __init__(self, *atoms, id=None, name=None):
         AtomicStructure.__init__(self, *atoms)
         if id is not None and not isinstance(id, str):
@@ -627,8 +1179,7 @@ class Molecule(AtomicStructure):
             raise TypeError("Molecule name {} is not a string".format(name))
         self._id = id
         self._name = name
-        for atom in self._atoms:
-            atom._molecule = self
+        self._claim(self._atoms, "_molecule", relabel=True)
 
 
     def __repr__(self):
@@ -663,7 +1214,14 @@ class Molecule(AtomicStructure):
     def name(self, name):
         if not isinstance(name, str):
             raise TypeError("Molecule name '{}' is not str".format(name))
+        relabelled = [
+         (atom, atom._unlabel()) for atom in self._atoms
+         if atom.residue is self
+        ]
+        self._rename(name)
         self._name = name
+        Atom._label_version += 1
+        for atom, parents in relabelled: atom._relabel(parents)
 
 
     @property
@@ -691,22 +1249,41 @@ class Molecule(AtomicStructure):
 
         :rtype: :py:class:`.Site`"""
 
+        from .models import Model
+        atoms, model = self.atoms(hydrogen=False), self.model
+        if isinstance(model, Model):
+            nearby = model._neighbourhoods([atoms], cutoff)[0]
+        else:
+            nearby = set()
+            for atom in atoms:
+                nearby.update(atom.nearby_atoms(cutoff, hydrogen=False))
+        return self._site_from_nearby(atoms, nearby, water, main_chain, carbon)
+
+
+    def _site_from_nearby(self, atoms, nearby, water, main_chain, carbon):
+        """Creates this molecule's :py:class:`.Site` from the heavy atoms found
+        near to it.
+
+        :param set atoms: The molecule's own heavy atoms.
+        :param set nearby: The heavy atoms near to them.
+        :param bool water: If ``True``, water molecules will be included.
+        :param bool main_chain: If ``True`` main chain atoms will be considered.
+        :param bool carbon: If ``False`` carbon atoms will not be considered.
+        :rtype: :py:class:`.Site`"""
+
         from .chains import Site
-        atoms, nearby = self.atoms(hydrogen=False), set()
-        for atom in atoms:
-            nearby.update(atom.nearby_atoms(cutoff, hydrogen=False))
-        if not main_chain:
-            nearby = [a for a in nearby if
-             a.name not in ["C", "CA", "O", "N"] or not a.residue]
-        if not carbon:
-            nearby = [a for a in nearby if a.element != "C"]
-        residues = [atom.residue for atom in nearby if atom not in atoms]
-        if water:
-            residues += [
-             atom.molecule for atom in nearby if atom not in atoms
-              and atom.molecule != None and atom.molecule.name == "HOH"
-             ]
-        residues = set([residue for residue in residues if residue])
+        residues = set()
+        for atom in nearby:
+            if atom in atoms: continue
+            residue = atom.residue
+            if not main_chain and residue \
+             and atom.name in ("C", "CA", "O", "N"): continue
+            if not carbon and atom.element == "C": continue
+            if residue: residues.add(residue)
+            if water:
+                molecule = atom.molecule
+                if molecule is not None and molecule.name == "HOH":
+                    residues.add(molecule)
         return Site(*residues, ligand=self)
 
 
@@ -727,11 +1304,12 @@ class Residue(Molecule):
     :raises TypeError: if non-atoms are given.
     :raises TypeError: if the ID or name is not str."""
 
+    _parent_attribute, _labelling, _link_version = "_residue", True, 0
+
     def __init__(self, *atoms, **kwargs):
         Molecule.__init__(self, *atoms, **kwargs)
         self._next, self._previous = None, None
-        for atom in self._atoms:
-            atom._residue = self
+        self._claim(self._atoms, relabel=True)
 
 
     @property
@@ -777,6 +1355,7 @@ class Residue(Molecule):
         else:
             self._next = residue
             residue._previous = self
+        Residue._link_version += 1
 
 
     @property
@@ -811,6 +1390,7 @@ class Residue(Molecule):
         else:
             self._previous = residue
             residue._next = self
+        Residue._link_version += 1
 
 
     @property
@@ -824,6 +1404,172 @@ class Residue(Molecule):
 
 
 
+def rmsd_matrix(structures, superimpose=True, labels=False, processes=None):
+    """Calculates the RMSD between every pair of some structures, such as the
+    models of an NMR ensemble or a set of docked poses. The structures must
+    have the same number of atoms, unless atoms are paired by label, in which
+    case only the atoms found in every structure are compared.
+
+    The atoms of every structure are paired with those of the first structure
+    once, and the coordinates are then stacked so that the RMSDs can be
+    calculated with array operations.
+
+    :param structures: The :py:class:`.AtomicStructure` objects to compare.
+    :param bool superimpose: If ``True`` (the default), each pair of\
+    structures will be superimposed (without moving them) before their RMSD\
+    is calculated.
+    :param bool labels: if ``True``, atoms will be paired by chain ID, residue\
+    ID and name (see :py:meth:`.AtomicStructure.pairing_with`).
+    :param int processes: If given, the calculation will be shared out\
+    between this many processes.
+    :raises TypeError: if any structure is not an\
+    :py:class:`.AtomicStructure`.
+    :raises ValueError: if the structures have different numbers of atoms,\
+    or no atoms in common.
+    :rtype: ``numpy.ndarray``"""
+
+    structures = list(structures)
+    if not structures: return np.zeros((0, 0))
+    atoms, stack, centres = _paired_stack(structures, labels)
+    return pairwise_rmsd(stack, superimpose, centres, processes)
+
+
+def rmsf(structures, superimpose=True, labels=False):
+    """Calculates the Root Mean Square Fluctuation of every atom across some
+    structures, such as the models of an NMR ensemble - how far, on average,
+    each atom is from its mean position.
+
+    Every structure is paired with the first structure once, and (by default)
+    superimposed onto it, without moving any atoms.
+
+    :param structures: The :py:class:`.AtomicStructure` objects to compare.
+    :param bool superimpose: If ``True`` (the default), the structures will be\
+    superimposed onto the first structure before the fluctuations are\
+    calculated.
+    :param bool labels: if ``True``, atoms will be paired by chain ID, residue\
+    ID and name, and only atoms found in every structure are used.
+    :raises TypeError: if any structure is not an\
+    :py:class:`.AtomicStructure`.
+    :raises ValueError: if the structures have different numbers of atoms,\
+    or no atoms in common.
+    :returns: the RMSF of each of the first structure's atoms, keyed by atom\
+    ID.
+    :rtype: ``dict``"""
+
+    structures = list(structures)
+    if not structures: return {}
+    atoms, stack, centres = _paired_stack(structures, labels)
+    if superimpose: stack = _superimposed_stack(stack, centres)
+    deviations = stack - stack.mean(axis=0)
+    fluctuations = np.sqrt((deviations ** 2).sum(axis=2).mean(axis=0))
+    return {atom.id: value for atom, value in zip(
+     atoms, fluctuations.tolist()
+    )}
+
+
+def mean_structure(structures, superimpose=True, labels=False):
+    """Creates a structure whose atoms are at the mean positions of their
+    equivalents in some structures, such as the models of an NMR ensemble.
+
+    The new structure is a copy of the first structure (see\
+    :py:meth:`.AtomicStructure.copy`), and the other structures are (by
+    default) superimposed onto it before averaging, without moving any atoms.
+
+    :param structures: The :py:class:`.AtomicStructure` objects to average.
+    :param bool superimpose: If ``True`` (the default), the structures will be\
+    superimposed onto the first structure before averaging.
+    :param bool labels: if ``True``, atoms will be paired by chain ID, residue\
+    ID and name. Atoms not found in every structure keep the first\
+    structure's coordinates.
+    :raises TypeError: if any structure is not an\
+    :py:class:`.AtomicStructure`.
+    :raises ValueError: if the structures have different numbers of atoms,\
+    or no atoms in common.
+    :rtype: ``AtomicStructure``"""
+
+    structures = list(structures)
+    if not structures: return None
+    atoms, stack, centres = _paired_stack(structures, labels)
+    if superimpose: stack = _superimposed_stack(stack, centres)
+    first = structures[0]
+    copies = {atom: atom.copy() for atom in first._atoms}
+    mean = first.__class__(*copies.values())
+    for attribute in ("_id", "_name"):
+        if hasattr(first, attribute):
+            setattr(mean, attribute, getattr(first, attribute))
+    atoms = [copies[atom] for atom in atoms]
+    set_coordinates(atoms, stack.mean(axis=0), *locate_atoms(atoms))
+    return mean
+
+
+def _paired_stack(structures, labels):
+    """Pairs the atoms of some structures with those of the first structure,
+    and stacks the coordinates of the atoms found in every structure.
+
+    :param list structures: The structures to stack.
+    :param bool labels: if ``True``, atoms will be paired by label.
+    :raises TypeError: if the first structure is not an\
+    :py:class:`.AtomicStructure`.
+    :raises ValueError: if the structures have no atoms in common.
+    :returns: the first structure's atoms, an (M, N, 3) array of their\
+    coordinates in each structure, and the (M, 3) centers of mass.
+    :rtype: ``tuple``"""
+
+    first = structures[0]
+    if not isinstance(first, AtomicStructure):
+        raise TypeError("{} is not an AtomicStructure".format(first))
+    pairings = [first.pairing_with(structure, labels=labels)
+     for structure in structures]
+    atoms = [atom for atom in pairings[0] if all(
+     atom in pairing for pairing in pairings
+    )]
+    if not atoms:
+        raise ValueError("The structures have no atoms in common")
+    stack = []
+    for pairing in pairings:
+        paired = [pairing[atom] for atom in atoms]
+        stack.append(get_coordinates(paired, *locate_atoms(paired)))
+    stack = np.stack(stack)
+    masses = np.array([atom.mass for atom in atoms], dtype=float)
+    return atoms, stack, np.dot(masses, stack) / masses.sum()
+
+
+def _superimposed_stack(stack, centres):
+    """Superimposes every set of coordinates in an (M, N, 3) stack onto the
+    first.
+
+    :param numpy.ndarray stack: The coordinates to superimpose.
+    :param numpy.ndarray centres: The (M, 3) centres to superimpose about.
+    :rtype: ``numpy.ndarray``"""
+
+    return superimpose_coordinates(stack, stack[0], centres, centres[0])
+
+
+def _pairing_key(atom):
+    """The key atoms are sorted by when pairing them with another structure's
+    atoms.
+
+    :param Atom atom: The atom to get the key for.
+    :rtype: ``tuple``"""
+
+    return (atom.element, atom.name, len(atom._bonds), atom.id, id(atom))
+
+
+def _atom_label(atom):
+    """The chain ID, residue ID and name of an atom, which identify it across
+    different structures. Atoms which aren't in a residue - waters, ligands
+    and ions - use the ID of their molecule instead.
+
+    :param Atom atom: The atom to get the label for.
+    :rtype: ``tuple``"""
+
+    parent, chain = atom._residue or atom._molecule, atom._chain
+    return (
+     chain._id if chain is not None else None,
+     parent._id if parent is not None else None,
+     atom._name
+    )
+
 RESIDUES = {
  "GLY": "glycine", "ALA": "alanine", "VAL": "valine", "LEU": "leucine",
  "ILE": "isoleucine", "MET": "methionine", "PHE": "phenylalanine",
@@ -0,0 +1,125 @@
+"""This module contains the registries which models use to find the structures
+their atoms belong to without checking every atom."""
+
+from collections import Counter
+
+class StructureRegistry:
+    """A count of how many of some atoms belong to each structure of one kind -
+    their residues, say, or their chains. Structures can be listed, or looked
+    up by ID or name, in time proportional to the number found.
+
+    Registries do not notice changes by themselves - whatever keeps one has to
+    tell it when atoms join or leave structures, and when structures are
+    renamed.
+
+    :param structures: The structure each atom belongs to, one per atom.\
+    ``None`` can be given for atoms which don't belong to one."""
+
+    def __init__(self, structures=()):
+        self._counts = Counter(structures)
+        self._counts.pop(None, None)
+        self._ids, self._names = {}, {}
+        for structure in self._counts: self._index(structure)
+
+
+    def __repr__(self):
+        return "<StructureRegistry ({} structures)>".format(len(self._counts))
+
+
+    def __len__(self):
+        return len(self._counts)
+
+
+    def __contains__(self, structure):
+        return structure in self._counts
+
+
+    def add(self, structure):
+        """Records that another atom belongs to a structure.
+
+        :param structure: The structure, or ``None``."""
+
+        if structure is None: return
+        if structure in self._counts:
+            self._counts[structure] += 1
+        else:
+            self._counts[structure] = 1
+            self._index(structure)
+
+
+    def remove(self, structure):
+        """Records that an atom no longer belongs to a structure. Once none do,
+        the structure is forgotten.
+
+        :param structure: The structure, or ``None``."""
+
+        if structure is None or structure not in self._counts: return
+        self._counts[structure] -= 1
+        if not self._counts[structure]:
+            del self._counts[structure]
+            self._index(structure, remove=True)
+
+
+    def move(self, old, new):
+        """Records that an atom has moved from one structure to another.
+
+        :param old: The structure the atom belonged to, or ``None``.
+        :param new: The structure the atom belongs to now, or ``None``."""
+
+        if old is not new:
+            self.remove(old)
+            self.add(new)
+
+
+    def rename(self, structure, name):
+        """Files a structure under a new name. This should be called just before
+        the structure's name changes.
+
+        :param structure: The structure being renamed.
+        :param str name: The name it will have."""
+
+        if structure in self._counts:
+            self._unfile(self._names, structure._name, structure)
+            self._names.setdefault(name, set()).add(structure)
+
+
+    def structures(self, id=None, name=None):
+        """Returns the structures which at least one atom belongs to.
+
+        :param str id: if given, only structures with this ID are returned.
+        :param str name: if given, only structures with this name are returned.
+        :rtype: ``set``"""
+
+        if id and name:
+            return self._ids.get(id, set()) & self._names.get(name, set())
+        if id: return set(self._ids.get(id, ()))
+        if name: return set(self._names.get(name, ()))
+        return set(self._counts)
+
+
+    def _index(self, structure, remove=False):
+        """Files a structure under its ID and name, or takes it out.
+
+        :param structure: The structure to file.
+        :param bool remove: if ``True``, the structure will be taken out."""
+
+        for lookup, key in ((self._ids, structure._id),
+         (self._names, structure._name)):
+            if remove:
+                self._unfile(lookup, key, structure)
+            else:
+                lookup.setdefault(key, set()).add(structure)
+
+
+    @staticmethod
+    def _unfile(lookup, key, structure):
+        """Takes a structure out of one of the lookups.
+
+        :param dict lookup: The lookup to change.
+        :param key: The key the structure is filed under.
+        :param structure: The structure to take out."""
+
+        structures = lookup.get(key)
+        if structures is not None:
+            structures.discard(structure)
+            if not structures: del lookup[key]
@@ -0,0 +1,182 @@
+"""This module contains the cell list used to find atoms near to points in
+space without checking every atom."""
+
+import numpy as np
+
+def sphere_mask(coordinates, centre, radius):
+    """Returns a boolean array saying which of some coordinates are within a
+    given distance of a point (inclusive).
+
+    :param numpy.ndarray coordinates: An (N, 3) array of coordinates.
+    :param centre: The (x, y, z) centre of the sphere.
+    :param radius: The radius of the sphere.
+    :rtype: ``numpy.ndarray``"""
+
+    differences = coordinates - np.asarray(centre, dtype=float)
+    return np.sqrt((differences ** 2).sum(axis=1)) <= radius
+
+
+
+class CellList:
+    """A spatial index which sorts some coordinates into a uniform grid of
+    cubic cells, so that only the cells which overlap a query sphere need to
+    be checked.
+
+    Points are referred to by their row in the coordinates given. Cell lists
+    are snapshots - they do not change if the coordinates are later changed.
+
+    :param coordinates: An (N, 3) array-like of coordinates.
+    :param float cell_size: The width of each cell.
+    :raises ValueError: if the cell size is not positive."""
+
+    def __init__(self, coordinates, cell_size=5):
+        if not cell_size > 0:
+            raise ValueError("{} is not a valid cell size".format(cell_size))
+        self._coordinates = np.array(coordinates, dtype=float).reshape(-1, 3)
+        self._cell_size = cell_size
+        if len(self._coordinates):
+            self._origin = self._coordinates.min(axis=0)
+        else:
+            self._origin = np.zeros(3)
+        cells = self._cells_of(self._coordinates)
+        self._shape = cells.max(axis=0) + 1 if len(cells) else np.ones(
+         3, dtype=int
+        )
+        keys = self._keys_of(cells)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys, self._starts, counts = np.unique(
+         keys[self._order], return_index=True, return_counts=True
+        )
+        self._ends = self._starts + counts
+
+
+    def __repr__(self):
+        return "<CellList ({} points, {} cells)>".format(
+         len(self._coordinates), len(self._keys)
+        )
+
+
+    def __len__(self):
+        return len(self._coordinates)
+
+
+    @property
+    def coordinates(self):
+        """The coordinates that were indexed.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._coordinates
+
+
+    @property
+    def cell_size(self):
+        """The width of each cell.
+
+        :rtype: ``float``"""
+
+        return self._cell_size
+
+
+    def _cells_of(self, coordinates):
+        return np.floor(
+         (coordinates - self._origin) / self._cell_size
+        ).astype(int)
+
+
+    def _keys_of(self, cells):
+        return (cells[:, 0] * self._shape[1] + cells[:, 1]) * self._shape[2] \
+         + cells[:, 2]
+
+
+    def candidates(self, low, high):
+        """Returns the rows of every point in the cells which overlap a box.
+        Some of these points may be outside the box itself.
+
+        :param low: The (x, y, z) lowest corner of the box.
+        :param high: The (x, y, z) highest corner of the box.
+        :rtype: ``numpy.ndarray``"""
+
+        low = self._cells_of(np.asarray(low, dtype=float).reshape(1, 3))[0]
+        high = self._cells_of(np.asarray(high, dtype=float).reshape(1, 3))[0]
+        low, high = np.maximum(low, 0), np.minimum(high, self._shape - 1)
+        if (low > high).any(): return np.zeros(0, dtype=int)
+        cells = np.stack(np.meshgrid(
+         *[np.arange(l, h + 1) for l, h in zip(low, high)], indexing="ij"
+        ), axis=-1).reshape(-1, 3)
+        positions = self._find_cells(self._keys_of(cells))[1]
+        return self._rows_in_cells(positions)[0]
+
+
+    def _find_cells(self, keys):
+        positions = np.searchsorted(self._keys, keys)
+        found = np.flatnonzero(positions < len(self._keys))
+        found = found[self._keys[positions[found]] == keys[found]]
+        return found, positions[found]
+
+
+    def _rows_in_cells(self, positions):
+        lengths = self._ends[positions] - self._starts[positions]
+        offsets = np.repeat(
+         self._starts[positions] - np.cumsum(lengths) + lengths, lengths
+        )
+        return self._order[np.arange(lengths.sum()) + offsets], lengths
+
+
+    def query_sphere(self, centre, radius):
+        """Returns the rows of the points within a given distance of a point
+        (inclusive), in ascending order.
+
+        :param centre: The (x, y, z) centre of the sphere.
+        :param radius: The radius of the sphere.
+        :rtype: ``numpy.ndarray``"""
+
+        centre = np.asarray(centre, dtype=float)
+        rows = self.candidates(centre - radius, centre + radius)
+        rows = rows[sphere_mask(self._coordinates[rows], centre, radius)]
+        return np.sort(rows)
+
+
+    def neighbours(self, centres, radius):
+        """Finds every pairing of a centre and an indexed point which are
+        within a given distance of each other (inclusive).
+
+        The cells around each centre are visited one offset at a time, so
+        memory use is proportional to the number of centres and the number of
+        points in one cell, rather than to every pair at once.
+
+        :param centres: An (M, 3) array-like of coordinates to search around.
+        :param radius: The distance cutoff.
+        :returns: three arrays - the index of each centre, the row of the point\
+        near it, and the distance between them, ordered by centre then row.
+        :rtype: ``tuple``"""
+
+        centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+        found = [[], [], []]
+        if len(self._keys) and len(centres):
+            reach = int(np.ceil(radius / self._cell_size))
+            centre_cells = self._cells_of(centres)
+            steps = np.arange(-reach, reach + 1)
+            for offset in np.stack(np.meshgrid(
+             steps, steps, steps, indexing="ij"
+            ), axis=-1).reshape(-1, 3):
+                cells = centre_cells + offset
+                inside = np.flatnonzero(
+                 ((cells >= 0) & (cells < self._shape)).all(axis=1)
+                )
+                matched, positions = self._find_cells(
+                 self._keys_of(cells[inside])
+                )
+                rows, lengths = self._rows_in_cells(positions)
+                indices = np.repeat(inside[matched], lengths)
+                distances = np.sqrt(((
+                 self._coordinates[rows] - centres[indices]
+                ) ** 2).sum(axis=1))
+                keep = distances <= radius
+                for values, block in zip(found, (indices, rows, distances)):
+                    values.append(block[keep])
+        if not found[0]:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+        indices, rows, distances = [np.concatenate(v) for v in found]
+        order = np.lexsort((rows, indices))
+        return indices[order], rows[order], distances[order]
@@ -0,0 +1,262 @@
+"""This module contains the Trajectory class, which gives one model many sets of
+coordinates."""
+
+import numpy as np
+from .models import Model
+from .arrays import locate_atoms, set_coordinates
+from .geometry import superimpose, pairwise_rmsd
+
+class Trajectory:
+    """A Trajectory is a single :py:class:`.Model` - the topology, with its
+    chains, residues and bonds - which takes a series of positions, or frames.
+    Models which only differ in their coordinates, such as those of an NMR
+    ensemble, can be stored this way without creating any atoms more than once.
+
+    The frames are an (F, N, 3) array, in which each frame's rows match the
+    rows of the model's :py:attr:`~.Model.arrays`. Atoms should not be added to
+    or removed from the model once it is part of a trajectory - doing so can
+    reorder the rows, and anything which places or identifies atoms by row will
+    then raise a ``ValueError``.
+
+    The frames can be a memory-mapped array (such as one opened with
+    ``numpy.load(path, mmap_mode="r")``) for ensembles too large to hold in
+    memory. Analyses read the frames a chunk at a time, so that only a bounded
+    number of frames are in memory at once.
+
+    :param Model model: The model whose atoms the frames position.
+    :param frames: An (F, N, 3) array-like of coordinates.
+    :param int chunk_size: The number of frames analyses read at once.
+    :raises TypeError: if the model is not a Model.
+    :raises ValueError: if the frames are the wrong shape, or there are none.
+    :raises ValueError: if the chunk size is not positive."""
+
+    def __init__(self, model, frames, chunk_size=256):
+        if not isinstance(model, Model):
+            raise TypeError("{} is not a Model".format(model))
+        if not isinstance(frames, np.memmap):
+            frames = np.asarray(frames, dtype=float)
+        if frames.ndim != 3 or not len(frames) \
+         or frames.shape[1:] != (len(model.arrays), 3):
+            raise ValueError("Frames of shape {} do not fit {}".format(
+             frames.shape, model
+            ))
+        if chunk_size < 1:
+            raise ValueError("{} is not a valid chunk size".format(chunk_size))
+        self._model, self._frames, self._frame = model, frames, None
+        self._chunk_size = chunk_size
+        self._topology = model.arrays.topology
+
+
+    def __repr__(self):
+        return "<Trajectory ({} frame{}, {} atoms)>".format(
+         len(self), "" if len(self) == 1 else "s", self._frames.shape[1]
+        )
+
+
+    def __len__(self):
+        return len(self._frames)
+
+
+    def __getitem__(self, index):
+        return self.select(index)
+
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.select(index)
+
+
+    @property
+    def model(self):
+        """The :py:class:`.Model` whose atoms the frames position. Its atoms are
+        at the positions of whichever frame was last selected.
+
+        :rtype: ``Model``"""
+
+        return self._model
+
+
+    @property
+    def frames(self):
+        """The (F, N, 3) array of coordinates.
+
+        :rtype: ``numpy.ndarray``"""
+
+        return self._frames
+
+
+    @property
+    def chunk_size(self):
+        """The number of frames that analyses read into memory at once.
+
+        :rtype: ``int``"""
+
+        return self._chunk_size
+
+
+    @property
+    def frame(self):
+        """The index of the frame which was last selected, or ``None`` if none
+        has been.
+
+        :rtype: ``int``"""
+
+        return self._frame
+
+
+    def _check_topology(self):
+        """Makes sure that the model's rows still match the frames' rows, which
+        they stop doing if atoms are added to or removed from the model.
+
+        :raises ValueError: if the model's atoms have changed."""
+
+        if self._model.arrays.topology != self._topology:
+            raise ValueError("The atoms of {} have changed since {} was made"
+             .format(self._model, self))
+
+
+    def select(self, index):
+        """Moves the model's atoms to the positions of one frame, in a single
+        array copy, and returns the model.
+
+        :param int index: The index of the frame to select.
+        :raises IndexError: if there is no such frame.
+        :raises ValueError: if the model's atoms have changed.
+        :rtype: ``Model``"""
+
+        self._check_topology()
+        coordinates = self._frames[index]
+        arrays = self._model.arrays
+        arrays.coordinates[:] = coordinates
+        arrays.touch()
+        self._frame = range(len(self))[index]
+        return self._model
+
+
+    def _chunks(self):
+        """Yields the frames a chunk at a time, as in-memory arrays.
+
+        :rtype: ``numpy.ndarray``"""
+
+        for start in range(0, len(self._frames), self._chunk_size):
+            yield np.asarray(
+             self._frames[start:start + self._chunk_size], dtype=float
+            )
+
+
+    def _centres(self):
+        """Returns the (F, 3) centers of mass of every frame.
+
+        :rtype: ``numpy.ndarray``"""
+
+        self._check_topology()
+        masses = self._model.arrays.masses
+        return np.concatenate(
+         [np.dot(masses, chunk) for chunk in self._chunks()]
+        ) / masses.sum()
+
+
+    def _aligned(self, superimpose_frames):
+        """Yields the frames a chunk at a time, superimposed onto the first
+        frame if requested.
+
+        :param bool superimpose_frames: Whether to superimpose the frames.
+        :rtype: ``numpy.ndarray``"""
+
+        if superimpose_frames:
+            centres, start = self._centres(), 0
+            first = np.asarray(self._frames[0], dtype=float)
+        for chunk in self._chunks():
+            if superimpose_frames:
+                chunk = superimpose(
+                 chunk, first, centres[start:start + len(chunk)], centres[0]
+                )
+                start += len(chunk)
+            yield chunk
+
+
+    def rmsd_matrix(self, superimpose=True, processes=None):
+        """Calculates the RMSD between every pair of frames.
+
+        :param bool superimpose: If ``True`` (the default), each pair of frames\
+        will be superimposed before their RMSD is calculated.
+        :param int processes: If given, the calculation will be shared out\
+        between this many processes.
+        :rtype: ``numpy.ndarray``"""
+
+        return pairwise_rmsd(
+         self._frames, superimpose, self._centres(), processes,
+         self._chunk_size
+        )
+
+
+    def rmsf(self, superimpose=True):
+        """Calculates the Root Mean Square Fluctuation of every atom across the
+        frames.
+
+        :param bool superimpose: If ``True`` (the default), the frames will be\
+        superimposed onto the first frame first.
+        :returns: the RMSF of each atom, keyed by atom ID.
+        :raises ValueError: if the model's atoms have changed.
+        :rtype: ``dict``"""
+
+        self._check_topology()
+        mean = self.mean_coordinates(superimpose)
+        squares = np.zeros(len(mean))
+        for chunk in self._aligned(superimpose):
+            squares += ((chunk - mean) ** 2).sum(axis=(0, 2))
+        fluctuations = np.sqrt(squares / len(self._frames))
+        return {atom.id: value for atom, value in zip(
+         self._model.arrays._atoms, fluctuations.tolist()
+        )}
+
+
+    def mean_coordinates(self, superimpose=True):
+        """Returns the mean position of every atom across the frames, as an
+        (N, 3) array whose rows match the frames' rows.
+
+        :param bool superimpose: If ``True`` (the default), the frames will be\
+        superimposed onto the first frame first.
+        :rtype: ``numpy.ndarray``"""
+
+        total = np.zeros(self._frames.shape[1:])
+        for chunk in self._aligned(superimpose):
+            total += chunk.sum(axis=0)
+        return total / len(self._frames)
+
+
+    def distances(self, pairs):
+        """Calculates the distance between some pairs of atoms in every frame.
+
+        :param pairs: The (atom, atom) pairs to measure.
+        :returns: an (F, P) array of the P distances in each frame.
+        :raises ValueError: if the model's atoms have changed.
+        :rtype: ``numpy.ndarray``"""
+
+        self._check_topology()
+        arrays = self._model.arrays
+        rows = np.array(
+         [[arrays.row(a1), arrays.row(a2)] for a1, a2 in pairs], dtype=int
+        ).reshape(-1, 2)
+        return np.concatenate([np.sqrt(((
+         chunk[:, rows[:, 0]] - chunk[:, rows[:, 1]]
+        ) ** 2).sum(axis=2)) for chunk in self._chunks()])
+
+
+    def mean_model(self, superimpose=True):
+        """Creates a new :py:class:`.Model` whose atoms are copies of the
+        trajectory model's atoms, placed at their mean positions across the
+        frames (see :py:meth:`.AtomicStructure.copy`).
+
+        :param bool superimpose: If ``True`` (the default), the frames will be\
+        superimposed onto the first frame first.
+        :raises ValueError: if the model's atoms have changed.
+        :rtype: ``Model``"""
+
+        self._check_topology()
+        atoms = [atom.copy() for atom in self._model.arrays._atoms]
+        model = Model(*atoms)
+        set_coordinates(
+         atoms, self.mean_coordinates(superimpose), *locate_atoms(atoms)
+        )
+        return model
@@ -0,0 +1,113 @@
+"""This module contains the read-only views which structures give of the sets
+they hold, so that those sets don't have to be copied every time they are
+asked for."""
+
+from collections.abc import Set
+
+class SetView(Set):
+    """A read-only window onto a set held by some other object - the atoms of
+    a structure, say, or the bonds of an atom. Nothing is copied when a view is
+    made, and it shows the set as it is now, not as it was when the view was
+    made.
+
+    Views support the usual read-only set operations - membership, iteration,
+    comparison, and operators like ``|`` and ``&``, which give new ``set``
+    objects. If you need a set you can change, or are going to change the
+    underlying object while looping over the view, use :py:meth:`copy`.
+
+    :param set items: The set to give a view of."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items):
+        self._items = items
+
+
+    def __repr__(self):
+        return "SetView({!r})".format(self._items)
+
+
+    def __contains__(self, item):
+        return item in self._items
+
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+    def __len__(self):
+        return len(self._items)
+
+
+    def __eq__(self, other):
+        if isinstance(other, SetView): other = other._items
+        if isinstance(other, (set, frozenset)): return self._items == other
+        return NotImplemented
+
+
+    __hash__ = None
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+
+    def copy(self):
+        """Returns a new ``set`` of the items in the view, which can be changed
+        without affecting the object the view came from.
+
+        :rtype: ``set``"""
+
+        return set(self._items)
+
+
+    def union(self, *others):
+        """Returns a new ``set`` of the items in the view and in any of the
+        other iterables given.
+
+        :rtype: ``set``"""
+
+        return self._items.union(*others)
+
+
+    def intersection(self, *others):
+        """Returns a new ``set`` of the items in the view which are also in all
+        of the other iterables given.
+
+        :rtype: ``set``"""
+
+        return self._items.intersection(*others)
+
+
+    def difference(self, *others):
+        """Returns a new ``set`` of the items in the view which are not in any
+        of the other iterables given.
+
+        :rtype: ``set``"""
+
+        return self._items.difference(*others)
+
+
+    def symmetric_difference(self, other):
+        """Returns a new ``set`` of the items in either the view or the other
+        iterable given, but not both.
+
+        :rtype: ``set``"""
+
+        return self._items.symmetric_difference(other)
+
+
+    def issubset(self, other):
+        """Checks whether every item in the view is in another iterable.
+
+        :rtype: ``bool``"""
+
+        return self._items.issubset(other)
+
+
+    def issuperset(self, other):
+        """Checks whether every item in another iterable is in the view.
+
+        :rtype: ``bool``"""
+
+        return self._items.issuperset(other)
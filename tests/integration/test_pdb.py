@@ -173,6 +173,29 @@ class PdbReadingTests(IntegratedTest):
         self.assertEqual(len(all_atoms), 18270)
 
 
+    def test_can_read_multi_model_pdbs_as_trajectory(self):
+        pdb = atomium.pdb_from_file(
+         "tests/integration/files/5xme.pdb", trajectory=True
+        )
+        trajectory = pdb.trajectory
+        self.assertEqual(len(trajectory), 10)
+        self.assertEqual(trajectory.frames.shape, (10, 1827, 3))
+        self.assertEqual(pdb.models, (trajectory.model,))
+        x_values = [
+         33.969, 34.064, 37.369, 36.023, 35.245,
+         35.835, 37.525, 35.062, 36.244, 37.677
+        ]
+        for x, model in zip(x_values, trajectory):
+            self.assertIs(model, pdb.model)
+            atom = model.atom(1)
+            self.assertEqual(atom.x, x)
+            self.assertEqual(len(atom.bonded_atoms()), 1)
+        separate = atomium.pdb_from_file("tests/integration/files/5xme.pdb")
+        matrix = pdb.rmsd_matrix()
+        self.assertEqual(matrix.shape, (10, 10))
+        self.assertTrue(abs(matrix - separate.rmsd_matrix()).max() < 1e-9)
+
+
     def test_can_read_alt_loc_pdbs(self):
         pdb = atomium.pdb_from_file("tests/integration/files/1cbn.pdb")
         chain = pdb.model.chain()
@@ -337,6 +360,56 @@ class PdbSavingTests(IntegratedTest):
             self.assertEqual(len(model.atoms()), 1827)
 
 
+    def test_can_save_trajectory_pdb(self):
+        pdb = atomium.pdb_from_file(
+         "tests/integration/files/5xme.pdb", trajectory=True
+        )
+        pdb.trajectory.select(4)
+        pdb.save("tests/integration/files/5XME2.pdb")
+        self.assertEqual(pdb.trajectory.frame, 4)
+        with open("tests/integration/files/5XME2.pdb") as f:
+            new = [l.strip() for l in f.readlines() if l.strip()]
+        with open("tests/integration/files/5xme_output.pdb") as f:
+            ref = [l.strip() for l in f.readlines() if l.strip()]
+        self.assertEqual(new, ref)
+
+
+    def test_can_write_pdb_model_by_model(self):
+        pdb = atomium.pdb_from_file(
+         "tests/integration/files/5xme.pdb", trajectory=True
+        )
+        path = "tests/integration/files/5XME2.pdb.gz"
+        with atomium.PdbWriter(path, pdb=pdb) as writer:
+            for model in pdb.trajectory:
+                writer.push(model)
+        self.assertEqual(writer.models, 10)
+        import gzip
+        with gzip.open(path, "rt") as f:
+            new = [l.strip() for l in f.readlines() if l.strip()]
+        with open("tests/integration/files/5xme_output.pdb") as f:
+            ref = [l.strip() for l in f.readlines() if l.strip()]
+        self.assertEqual(new, ref)
+
+
+    def test_can_save_compressed_pdbs(self):
+        import bz2, gzip, lzma
+        pdb = atomium.pdb_from_file("tests/integration/files/1lol.pdb")
+        pdb.save("tests/integration/files/1LOL2.pdb")
+        with open("tests/integration/files/1LOL2.pdb") as f:
+            ref = f.read()
+        for extension, module in (("gz", gzip), ("bz2", bz2), ("xz", lzma)):
+            path = "tests/integration/files/1LOL2.pdb." + extension
+            pdb.save(path)
+            with module.open(path, "rt") as f:
+                self.assertEqual(f.read(), ref)
+        pdb.model.chain("A").save("tests/integration/files/chainA.pdb")
+        pdb.model.chain("A").save("tests/integration/files/chainA.pdb.gz")
+        with open("tests/integration/files/chainA.pdb") as f:
+            ref = f.read()
+        with gzip.open("tests/integration/files/chainA.pdb.gz", "rt") as f:
+            self.assertEqual(f.read(), ref)
+
+
     def test_can_save_alt_loc_pdbs(self):
         pdb = atomium.pdb_from_file("tests/integration/files/1cbn.pdb")
 
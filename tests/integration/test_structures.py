@@ -1,6 +1,7 @@
 import math
 from tests.integration.base import IntegratedTest
 from atomium.structures import Model, Atom, Residue, Chain, Molecule, Complex
+from atomium.structures.exceptions import SequenceConnectivityError
 import atomium
 
 class CreationTests(IntegratedTest):
@@ -310,6 +311,14 @@ class CreationTests(IntegratedTest):
         self.assertIs(chaina.residue("A1"), res1)
         self.assertEqual(chaina.length, 3)
         self.assertEqual(len(chainb), 3)
+        self.assertEqual([chaina[i] for i in range(len(chaina))], [res1, res2, res3])
+        res3.next = res1
+        with self.assertRaises(SequenceConnectivityError):
+            chaina.residues()
+        res1.next = None
+        self.assertEqual(chaina.residues(), (res2, res3, res1))
+        res3.next, res1.next = None, res2
+        self.assertEqual(chaina.residues(), (res1, res2, res3))
         self.assertIs(self.atoms[1].chain, chaina)
         self.assertIs(self.atoms[24].chain, chainb)
         self.assertIs(res6.chain, chainb)
@@ -29,6 +29,7 @@ class XyzReadingTests(IntegratedTest):
         xyz.save("tests/integration/files/glucose2.xyz")
         with open("tests/integration/files/glucose2.xyz") as f:
             new = [l.strip() for l in f.readlines()]
+        new_lines = new
         with open("tests/integration/files/glucose.xyz") as f:
             old = [l.strip() for l in f.readlines()]
         self.assertEqual(old[:-12], new[:-12])
@@ -37,6 +38,12 @@ class XyzReadingTests(IntegratedTest):
         model = xyz.model
         self.assertAlmostEqual(model.mass, 168, delta=0.5)
 
+        # The xyz can be saved compressed
+        import bz2
+        xyz.save("tests/integration/files/glucose2.xyz.bz2")
+        with bz2.open("tests/integration/files/glucose2.xyz.bz2", "rt") as f:
+            self.assertEqual([l.strip() for l in f.readlines()], new_lines)
+
 
     def test_can_read_xyz_data(self):
         xyz = atomium.xyz_data_from_file("tests/integration/files/glucose.xyz")
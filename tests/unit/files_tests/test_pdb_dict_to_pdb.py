@@ -1,3 +1,5 @@
+import os
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch, Mock, MagicMock
 from atomium.files.pdbdict2pdb import *
@@ -35,6 +37,133 @@ class PdbDictToPdbTests(TestCase):
         self.assertEqual(returned_pdb._models, ["model1", "model2", "model3"])
 
 
+    @patch("atomium.files.pdbdict2pdb.Pdb")
+    @patch("atomium.files.pdbdict2pdb.model_dicts_to_trajectory")
+    def test_can_convert_pdb_dict_to_trajectory_pdb(self, mock_traj, mock_pdb):
+        pdb = Mock()
+        mock_pdb.return_value = pdb
+        trajectory = Mock()
+        trajectory.select.return_value = "model1"
+        mock_traj.return_value = trajectory
+        pdb_dict = {
+         "deposition_date": "D", "code": "C", "title": "T", "resolution": 1.4,
+         "organism": "H. sap", "expression_system": "M. mus",
+         "technique": "TECHNIQUE", "classification": "CLASS", "rfactor": 4.5,
+         "models": ["1", "2", "3"],
+         "connections": ["c1", "c2"]
+        }
+        returned_pdb = pdb_dict_to_pdb(pdb_dict, trajectory=True)
+        mock_traj.assert_called_with(["1", "2", "3"], ["c1", "c2"], path=None)
+        trajectory.select.assert_called_with(0)
+        self.assertIs(returned_pdb._trajectory, trajectory)
+        self.assertEqual(returned_pdb._models, ["model1"])
+
+
+
+class ModelDictsToTrajectoryTests(TestCase):
+
+    def make_model_dict(self, offset):
+        return {"chains": [{"chain_id": "A", "residues": [{
+         "id": "A1", "name": "VAL", "atoms": [{
+          "atom_id": id_, "atom_name": name, "element": element, "x": x + offset,
+          "y": 0, "z": 0, "charge": 0, "temp_factor": 0, "occupancy": 1,
+          "alt_loc": None
+         } for id_, name, element, x in ((1, "N", "N", 0), (2, "CA", "C", 1))]
+        }]}], "molecules": [{"id": "A100", "name": "XMP", "atoms": [{
+         "atom_id": 3, "atom_name": "O", "element": "O", "x": 5, "y": offset,
+         "z": 0, "charge": 0, "temp_factor": 0, "occupancy": 1, "alt_loc": None
+        }]}]}
+
+
+    def test_can_convert_model_dicts_to_trajectory(self):
+        trajectory = model_dicts_to_trajectory(
+         [self.make_model_dict(0), self.make_model_dict(10)], []
+        )
+        self.assertEqual(len(trajectory), 2)
+        model = trajectory.model
+        self.assertEqual(len(model.atoms()), 3)
+        self.assertEqual(len(model.chains()), 1)
+        rows = [model.arrays.row(model.atom(id_)) for id_ in (1, 2, 3)]
+        self.assertEqual(trajectory.frames[0][rows].tolist(), [
+         [0, 0, 0], [1, 0, 0], [5, 0, 0]
+        ])
+        self.assertEqual(trajectory.frames[1][rows].tolist(), [
+         [10, 0, 0], [11, 0, 0], [5, 10, 0]
+        ])
+
+
+    def test_can_write_trajectory_frames_to_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frames.npy")
+            trajectory = model_dicts_to_trajectory(
+             [self.make_model_dict(0), self.make_model_dict(10)], [], path=path
+            )
+            self.assertIsInstance(trajectory.frames, np.memmap)
+            self.assertEqual(
+             np.load(path).tolist(), np.asarray(trajectory.frames).tolist()
+            )
+            self.assertEqual(trajectory.frames.shape, (2, 3, 3))
+            del trajectory
+
+
+    def test_models_must_share_atoms(self):
+        other = self.make_model_dict(10)
+        other["molecules"] = []
+        with self.assertRaises(ValueError):
+            model_dicts_to_trajectory([self.make_model_dict(0), other], [])
+
+
+    def test_models_cannot_have_extra_atoms(self):
+        other = self.make_model_dict(10)
+        extra = dict(other["molecules"][0]["atoms"][0], atom_id=9)
+        other["molecules"][0]["atoms"].append(extra)
+        with self.assertRaises(ValueError):
+            model_dicts_to_trajectory([self.make_model_dict(0), other], [])
+
+
+    def test_models_cannot_change_elements(self):
+        other = self.make_model_dict(10)
+        other["chains"][0]["residues"][0]["atoms"][1]["element"] = "N"
+        with self.assertRaises(ValueError):
+            model_dicts_to_trajectory([self.make_model_dict(0), other], [])
+
+
+    def test_models_cannot_change_names(self):
+        other = self.make_model_dict(10)
+        other["chains"][0]["residues"][0]["atoms"][1]["atom_name"] = "CB"
+        with self.assertRaises(ValueError):
+            model_dicts_to_trajectory([self.make_model_dict(0), other], [])
+
+
+
+class ModelDictToLocationsTests(TestCase):
+
+    def test_can_get_locations_from_model_dict(self):
+        model_dict = {"chains": [{"residues": [{"atoms": [
+         {"atom_id": 1, "x": 1, "y": 2, "z": 3}
+        ]}, {"atoms": [{"atom_id": 2, "x": 4, "y": 5, "z": 6}]}]}], "molecules": [
+         {"atoms": [{"atom_id": 8, "x": 7, "y": 8, "z": 9}]}
+        ]}
+        self.assertEqual(model_dict_to_locations(model_dict), {
+         1: (1, 2, 3), 2: (4, 5, 6), 8: (7, 8, 9)
+        })
+
+
+
+class ModelDictToTopologyTests(TestCase):
+
+    def test_can_get_topology_from_model_dict(self):
+        model_dict = {"chains": [{"residues": [{"atoms": [
+         {"atom_id": 1, "element": "N", "atom_name": "N"},
+         {"atom_id": 2, "element": "C", "atom_name": "CA"}
+        ]}]}], "molecules": [{"atoms": [
+         {"atom_id": 3, "element": "O", "atom_name": "O"}
+        ]}]}
+        self.assertEqual(model_dict_to_topology(model_dict), {
+         1: ("N", "N"), 2: ("C", "CA"), 3: ("O", "O")
+        })
+
+
 
 class ModelDictToModelTests(TestCase):
 
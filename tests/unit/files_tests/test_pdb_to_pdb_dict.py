@@ -1,25 +1,47 @@
 from unittest import TestCase
 from unittest.mock import patch, Mock, MagicMock
 from atomium.files.pdb2pdbdict import *
+import numpy as np
+from atomium.structures import Model, Residue, Atom, Trajectory
 
 class PdbToPdbDictTests(TestCase):
 
-    @patch("atomium.files.pdb2pdbdict.structure_to_pdb_dict")
-    def test_can_convert_pdb_to_pdb_dict_one_model(self, mock_dict):
-        pdb = Mock()
-        pdb._deposition_date = "D"
-        pdb._code = "C"
-        pdb._title = "T"
-        pdb._resolution = 1.5
-        pdb._rfactor = 1.8
-        pdb._organism = "O"
-        pdb._expression_system = "E"
-        pdb._technique = "T"
-        pdb._classification = "CLASS"
-        pdb._models = ["model1"]
-        mock_dict.return_value = {"models": ["m1"], "connections": ["c1", "c2"]}
-        pdb_dict = pdb_to_pdb_dict(pdb)
+    def setUp(self):
+        self.pdb = Mock()
+        self.pdb._trajectory = None
+        self.pdb._deposition_date = "D"
+        self.pdb._code = "C"
+        self.pdb._title = "T"
+        self.pdb._resolution = 1.5
+        self.pdb._rfactor = 1.8
+        self.pdb._organism = "O"
+        self.pdb._expression_system = "E"
+        self.pdb._technique = "T"
+        self.pdb._classification = "CLASS"
+
+
+    @patch("atomium.files.pdb2pdbdict.trajectory_to_model_dicts")
+    @patch("atomium.files.pdb2pdbdict.structure_to_connections")
+    def test_can_convert_trajectory_pdb_to_pdb_dict(self, mock_con, mock_traj):
+        self.pdb._trajectory = Mock()
+        mock_traj.return_value = ["m1", "m2"]
+        mock_con.return_value = ["c1"]
+        pdb_dict = pdb_to_pdb_dict(self.pdb)
+        mock_traj.assert_called_with(self.pdb._trajectory)
+        mock_con.assert_called_once_with(self.pdb._trajectory.model)
+        self.assertEqual(pdb_dict["models"], ["m1", "m2"])
+        self.assertEqual(pdb_dict["connections"], ["c1"])
+
+
+    @patch("atomium.files.pdb2pdbdict.structure_to_model_dict")
+    @patch("atomium.files.pdb2pdbdict.structure_to_connections")
+    def test_can_convert_pdb_to_pdb_dict_one_model(self, mock_con, mock_dict):
+        self.pdb._models = ["model1"]
+        mock_dict.return_value = "m1"
+        mock_con.return_value = ["c1", "c2"]
+        pdb_dict = pdb_to_pdb_dict(self.pdb)
         mock_dict.assert_called_with("model1")
+        mock_con.assert_called_with("model1")
         self.assertEqual(pdb_dict, {
          "deposition_date": "D", "code": "C", "title": "T", "resolution": 1.5,
          "organism": "O", "expression_system": "E", "technique": "T",
@@ -28,26 +50,16 @@ class PdbToPdbDictTests(TestCase):
         })
 
 
-    @patch("atomium.files.pdb2pdbdict.structure_to_pdb_dict")
-    def test_can_convert_pdb_to_pdb_dict_two_models(self, mock_dict):
-        pdb = Mock()
-        pdb._deposition_date = "D"
-        pdb._code = "C"
-        pdb._title = "T"
-        pdb._resolution = 1.5
-        pdb._rfactor = 1.8
-        pdb._organism = "O"
-        pdb._expression_system = "E"
-        pdb._technique = "T"
-        pdb._classification = "CLASS"
-        pdb._models = ["model1", "model2"]
-        mock_dict.side_effect = [
-         {"models": ["m1"], "connections": ["c1", "c2"]},
-         {"models": ["m2"], "connections": ["c1", "c2"]}
-        ]
-        pdb_dict = pdb_to_pdb_dict(pdb)
+    @patch("atomium.files.pdb2pdbdict.structure_to_model_dict")
+    @patch("atomium.files.pdb2pdbdict.structure_to_connections")
+    def test_can_convert_pdb_to_pdb_dict_two_models(self, mock_con, mock_dict):
+        self.pdb._models = ["model1", "model2"]
+        mock_dict.side_effect = ["m1", "m2"]
+        mock_con.return_value = ["c1", "c2"]
+        pdb_dict = pdb_to_pdb_dict(self.pdb)
         mock_dict.assert_any_call("model1")
         mock_dict.assert_any_call("model2")
+        mock_con.assert_called_once_with("model1")
         self.assertEqual(pdb_dict, {
          "deposition_date": "D", "code": "C", "title": "T", "resolution": 1.5,
          "organism": "O", "expression_system": "E", "technique": "T",
@@ -56,30 +68,26 @@ class PdbToPdbDictTests(TestCase):
         })
 
 
+    @patch("atomium.files.pdb2pdbdict.structure_to_connections")
+    def test_can_convert_pdb_with_no_models(self, mock_con):
+        self.pdb._models = []
+        pdb_dict = pdb_to_pdb_dict(self.pdb)
+        self.assertFalse(mock_con.called)
+        self.assertEqual(pdb_dict["models"], [])
+        self.assertEqual(pdb_dict["connections"], [])
+
+
 
 class StructureToPdbDictTests(TestCase):
 
-    @patch("atomium.files.pdb2pdbdict.atom_to_atom_dict")
-    @patch("atomium.files.pdb2pdbdict.atoms_to_chains")
-    @patch("atomium.files.pdb2pdbdict.atoms_to_residues")
+    @patch("atomium.files.pdb2pdbdict.structure_to_model_dict")
     @patch("atomium.files.pdb2pdbdict.structure_to_connections")
-    def test_can_convert_model_to_pdb_dict(self, mock_con, mock_res, mock_chain, mock_atom):
+    def test_can_convert_structure_to_pdb_dict(self, mock_con, mock_model):
         structure = Mock()
-        atoms = [Mock(), Mock(), Mock(), Mock(), Mock(), Mock()]
-        mock_atom.side_effect = lambda a: "a" + str(a.id)
-        chains = [Mock(), Mock()]
-        for index, atom in enumerate(atoms):
-            atom.id = index + 1
-            atom.chain = chains[index // 2] if index < 4 else None
-        mock_chain.return_value = ["chain1", "chain2"]
-        mock_res.return_value = ["mol1", "mol2"]
-        structure.atoms.return_value = set(atoms)
+        mock_model.return_value = "model"
         mock_con.return_value = ["c1", "c2"]
         pdb_dict = structure_to_pdb_dict(structure)
-        for atom in atoms:
-            mock_atom.assert_any_call(atom)
-        mock_chain.assert_called_with(["a1", "a2", "a3", "a4"])
-        mock_res.assert_called_with(["a5", "a6"])
+        mock_model.assert_called_with(structure)
         mock_con.assert_called_with(structure)
         self.assertEqual(pdb_dict, {
          "deposition_date": None,
@@ -91,15 +99,112 @@ class StructureToPdbDictTests(TestCase):
          "expression_system": None,
          "technique": None,
          "classification": None,
-         "models": [{
-          "chains": ["chain1", "chain2"],
-          "molecules": ["mol1", "mol2"]
-         }],
+         "models": ["model"],
          "connections": ["c1", "c2"]
         })
 
 
 
+class StructureToModelDictTests(TestCase):
+
+    @patch("atomium.files.pdb2pdbdict.atom_to_atom_dict")
+    @patch("atomium.files.pdb2pdbdict.atoms_to_chains")
+    @patch("atomium.files.pdb2pdbdict.atoms_to_residues")
+    def test_can_convert_structure_to_model_dict(self, mock_res, mock_chain, mock_atom):
+        structure = Mock()
+        atoms = [Mock(), Mock(), Mock(), Mock(), Mock(), Mock()]
+        mock_atom.side_effect = lambda a, r: "a" + str(a.id)
+        chains = [Mock(), Mock()]
+        for index, atom in enumerate(atoms):
+            atom.id = index + 1
+            atom.chain = chains[index // 2] if index < 4 else None
+        mock_chain.return_value = ["chain1", "chain2"]
+        mock_res.return_value = ["mol1", "mol2"]
+        structure.atoms.return_value = set(atoms)
+        model_dict = structure_to_model_dict(structure)
+        for atom in atoms:
+            mock_atom.assert_any_call(atom, {})
+        caches = set(id(call[0][1]) for call in mock_atom.call_args_list)
+        self.assertEqual(len(caches), 1)
+        mock_chain.assert_called_with(["a1", "a2", "a3", "a4"])
+        mock_res.assert_called_with(["a5", "a6"])
+        self.assertEqual(model_dict, {
+         "chains": ["chain1", "chain2"], "molecules": ["mol1", "mol2"]
+        })
+
+
+
+class TrajectoryToModelDictsTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("C", 0, 0, 0, id=2, name="CA"), Atom("N", 0, 0, 0, id=1, name="N"),
+         Atom("ZN", 0, 0, 0, id=3, name="ZN")
+        ]
+        self.residue = Residue(*self.atoms[:2], id="A1", name="GLY")
+        self.model = Model(self.residue, self.atoms[2])
+        rows = [self.model.arrays.row(atom) for atom in self.atoms]
+        self.frames = np.zeros((2, 3, 3))
+        for frame in range(2):
+            for atom, row in enumerate(rows):
+                self.frames[frame, row] = [frame, atom, 10]
+        self.trajectory = Trajectory(self.model, self.frames)
+
+
+    def test_can_convert_trajectory_to_model_dicts(self):
+        models = trajectory_to_model_dicts(self.trajectory)
+        self.assertEqual(len(models), 2)
+        for frame, model in enumerate(models):
+            atom_dicts = model["molecules"][0]["atoms"] + model["molecules"][1]["atoms"]
+            self.assertEqual(
+             [(d["atom_id"], d["x"], d["y"], d["z"]) for d in atom_dicts],
+             [(1, frame, 1, 10), (2, frame, 0, 10), (3, frame, 2, 10)]
+            )
+            self.assertEqual(atom_dicts[0]["residue_name"], "GLY")
+
+
+    def test_model_dicts_match_selected_frames(self):
+        models = trajectory_to_model_dicts(self.trajectory)
+        for frame, model in enumerate(self.trajectory):
+            self.assertEqual(models[frame], structure_to_model_dict(model))
+
+
+    def test_converting_trajectory_does_not_select_frames(self):
+        self.trajectory.select(1)
+        trajectory_to_model_dicts(self.trajectory)
+        self.assertEqual(self.trajectory.frame, 1)
+        self.assertEqual(self.atoms[0].location, (1, 0, 10))
+
+
+    def test_trajectory_topology_is_checked(self):
+        self.model.remove_atom(self.atoms[2])
+        with self.assertRaises(ValueError):
+            trajectory_to_model_dicts(self.trajectory)
+
+
+
+class CopyModelDictTests(TestCase):
+
+    def test_can_copy_model_dict_with_new_atoms(self):
+        atoms = [{"atom_id": n} for n in range(3)]
+        model = {
+         "chains": [{"chain_id": "A", "residues": [
+          {"id": "A1", "atoms": atoms[:2]}
+         ]}],
+         "molecules": [{"id": "A100", "atoms": atoms[2:]}]
+        }
+        new_atoms = {id(atom): {"atom_id": atom["atom_id"] + 10} for atom in atoms}
+        copy = copy_model_dict(model, new_atoms)
+        self.assertEqual(copy, {
+         "chains": [{"chain_id": "A", "residues": [
+          {"id": "A1", "atoms": [{"atom_id": 10}, {"atom_id": 11}]}
+         ]}],
+         "molecules": [{"id": "A100", "atoms": [{"atom_id": 12}]}]
+        })
+        self.assertEqual(model["molecules"][0]["atoms"], [{"atom_id": 2}])
+
+
+
 class AtomToAtomDictTests(TestCase):
 
     def setUp(self):
@@ -159,6 +264,16 @@ class AtomToAtomDictTests(TestCase):
         self.assertEqual(d["full_id"], "A13")
 
 
+    def test_residue_fields_are_looked_up_once_per_residue(self):
+        residues = {}
+        d = atom_to_atom_dict(self.atom, residues)
+        self.assertEqual(residues, {self.residue: ("A13B", "GLY", "A", 13, "B")})
+        self.residue.id = "A14"
+        d = atom_to_atom_dict(self.atom, residues)
+        self.assertEqual(d["residue_id"], 13)
+        self.assertEqual(d["full_id"], "A13B")
+
+
     def test_can_convert_atom_with_no_chain_in_residue_id(self):
         self.residue.id = "13"
         d = atom_to_atom_dict(self.atom)
@@ -189,3 +304,18 @@ class StructureToConnectionsTests(TestCase):
         }, {
          "atom": 7, "bond_to": [5, 6]
         }])
+
+
+
+    def test_can_convert_model_to_connections_with_bond_graph(self):
+        atoms = [Atom("C", id=i + 1) for i in range(4)]
+        residue = Residue(*atoms[:2], id="A1", name="ALA")
+        atoms[0].bond_to(atoms[1])
+        atoms[1].bond_to(atoms[2])
+        atoms[2].bond_to(atoms[3])
+        model = Model(residue, *atoms[2:])
+        self.assertEqual(structure_to_connections(model), [{
+         "atom": 3, "bond_to": [2, 4]
+        }, {
+         "atom": 4, "bond_to": [3]
+        }])
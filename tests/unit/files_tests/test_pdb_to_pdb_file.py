@@ -0,0 +1,258 @@
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import numpy as np
+from atomium.files.pdb2pdbfile import *
+from atomium.files.pdb import Pdb
+from atomium.files.pdb2pdbdict import pdb_to_pdb_dict, structure_to_pdb_dict
+from atomium.files.pdb2pdbdict import atom_to_atom_dict
+from atomium.files.pdbdict2pdbstring import pdb_dict_to_pdb_string
+from atomium.files.pdbdict2pdbstring import atom_dict_to_atom_line
+from atomium.structures import Model, Chain, Residue, Molecule, Atom, Trajectory
+
+class PdbFileTest(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("N", 1, 2, 3, id=1, name="N", bfactor=12.5),
+         Atom("C", 1.5, 2, 3, id=2, name="CA"),
+         Atom("N", 4, 5, 6, id=3, name="N"),
+         Atom("C", 4.5, 5, 6, id=4, name="CA", charge=-1),
+         Atom("N", -1, 0, 0, id=5, name="N"),
+         Atom("Zn", 9, 9, 9, id=6, name="ZN", charge=2),
+         Atom("O", 8, 8, 8, id=7, name="O"),
+         Atom("C", 7, 7, 7, id=8, name="C1")
+        ]
+        residues = [
+         Residue(*self.atoms[:2], id="B1", name="GLY"),
+         Residue(*self.atoms[2:4], id="B2A", name="ALA"),
+         Residue(self.atoms[4], id="A7", name="SER")
+        ]
+        residues[0].next = residues[1]
+        self.chainb = Chain(*residues[:2], id="B")
+        self.chaina = Chain(residues[2], id="A")
+        self.metal = Molecule(self.atoms[5], id="A100", name="ZN")
+        self.ligand = Molecule(*self.atoms[6:], id="B101", name="LIG")
+        self.atoms[6].bond_to(self.atoms[7])
+        self.atoms[7].bond_to(self.atoms[5])
+        self.model = Model(self.chainb, self.chaina, self.metal, self.ligand)
+
+
+
+class RecordWritingTests(TestCase):
+
+    def test_can_write_records(self):
+        f = StringIO()
+        self.assertTrue(write_records(["A", "B", "C"], f))
+        self.assertEqual(f.getvalue(), "A\nB\nC")
+
+
+    def test_can_write_records_in_chunks(self):
+        f = Mock()
+        write_records(iter(["A", "B", "C"]), f, chunk_size=2)
+        self.assertEqual(
+         [call[0][0] for call in f.write.call_args_list], ["A\nB", "\nC"]
+        )
+
+
+    def test_can_separate_records_from_earlier_records(self):
+        f = StringIO()
+        self.assertTrue(write_records(["B"], f, write_records(["A"], f)))
+        self.assertEqual(f.getvalue(), "A\nB")
+
+
+    def test_nothing_is_written_for_no_records(self):
+        f = StringIO()
+        self.assertFalse(write_records([], f))
+        self.assertTrue(write_records([], f, True))
+        self.assertEqual(f.getvalue(), "")
+
+
+
+class PdbAnnotationTests(TestCase):
+
+    def test_can_get_pdb_annotation(self):
+        pdb = Pdb()
+        pdb._code, pdb._title, pdb._resolution = "1XXX", "T", 1.5
+        annotation = pdb_annotation(pdb)
+        self.assertEqual(annotation["code"], "1XXX")
+        self.assertEqual(annotation["title"], "T")
+        self.assertEqual(annotation["resolution"], 1.5)
+        self.assertEqual(len(annotation), 9)
+        self.assertIsNone(annotation["organism"])
+
+
+    def test_can_get_annotation_without_pdb(self):
+        annotation = pdb_annotation(None, title="T")
+        self.assertEqual(annotation["title"], "T")
+        self.assertEqual(set(annotation.values()), {"T", None})
+
+
+
+class ResidueFieldTests(PdbFileTest):
+
+    def test_can_get_residue_fields(self):
+        self.assertEqual(residue_fields(self.atoms[0]), ("B1", "GLY", "B", 1, ""))
+        self.assertEqual(
+         residue_fields(self.atoms[2]), ("B2A", "ALA", "B", 2, "A")
+        )
+
+
+    def test_can_get_molecule_fields(self):
+        self.assertEqual(
+         residue_fields(self.atoms[5]), ("A100", "ZN", "A", 100, "")
+        )
+
+
+    def test_can_get_fields_of_lone_atoms(self):
+        self.assertEqual(residue_fields(Atom("C")), ("", "", "", "", ""))
+
+
+    def test_fields_match_atom_dicts(self):
+        for atom in self.atoms:
+            d = atom_to_atom_dict(atom)
+            self.assertEqual(residue_fields(atom), (
+             d["full_id"], d["residue_name"], d["chain_id"], d["residue_id"],
+             d["insert_code"]
+            ))
+
+
+
+class AtomLineTests(PdbFileTest):
+
+    def setUp(self):
+        PdbFileTest.setUp(self)
+        self.records = ["HETATM" if a.chain is None else "ATOM  " for a in self.atoms]
+        self.residues = {}
+        for atom in self.atoms:
+            fields = residue_fields(atom)
+            self.residues[atom.residue or atom.molecule] = RESIDUE_COLUMNS % (
+             fields[1] or "", fields[2], fields[3] or "", fields[4]
+            )
+
+
+    def test_atom_lines_match_atom_dict_lines(self):
+        lines = atom_lines(self.atoms, self.records, self.residues)
+        self.assertEqual(lines, "\n".join([atom_dict_to_atom_line(
+         atom_to_atom_dict(atom), hetero=record == "HETATM"
+        ) for atom, record in zip(self.atoms, self.records)]))
+
+
+    def test_can_make_atom_line(self):
+        self.assertEqual(
+         atom_lines(self.atoms[3:4], ["ATOM  "], self.residues),
+         "ATOM      4  CA  ALA B   2A      4.500   5.000   6.000  1.00"
+         "                 C1-"
+        )
+
+
+    def test_atom_lines_of_atoms_outside_models(self):
+        atom = Atom("C", 1, 2, 3, id=100000, name="CA")
+        self.assertEqual(
+         atom_lines([atom], ["HETATM"], {None: RESIDUE_COLUMNS % ("", "", "", "")}),
+         atom_dict_to_atom_line(atom_to_atom_dict(atom), hetero=True)
+        )
+
+
+    def test_no_atoms_make_no_lines(self):
+        self.assertEqual(atom_lines([], [], {}), "")
+
+
+
+class StructureRecordTests(PdbFileTest):
+
+    def test_atoms_are_grouped_by_chain_then_molecule(self):
+        groups, fields = structure_groups(self.model)
+        self.assertEqual(groups, [
+         (self.atoms[4:5], False), (self.atoms[:2], False),
+         (self.atoms[2:4], False), (self.atoms[5:6], True),
+         (self.atoms[6:], True)
+        ])
+        self.assertEqual(fields[self.metal], ("A100", "ZN", "A", 100, ""))
+        self.assertEqual(len(fields), 5)
+
+
+    def test_can_get_structure_records(self):
+        records = list(structure_records(self.model))[0].split("\n")
+        self.assertEqual(len(records), 8)
+        self.assertTrue(records[0].startswith("ATOM      5  N   SER A   7"))
+        self.assertTrue(records[-1].startswith("HETATM    8  C1  LIG B 101"))
+
+
+    def test_can_get_structure_records_in_blocks(self):
+        records = list(structure_records(self.model, chunk_size=3))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0].count("\n"), 2)
+        self.assertEqual(records[2].count("\n"), 1)
+        self.assertEqual("\n".join(records), "\n".join(structure_records(self.model)))
+
+
+    def test_can_wrap_structure_records_in_model(self):
+        records = list(structure_records(self.chaina, multi=3))
+        self.assertEqual(records[0], "MODEL        3".ljust(80))
+        self.assertTrue(records[1].startswith("ATOM      5  N   SER A   7"))
+        self.assertEqual(records[-1], "ENDMDL".ljust(80))
+        self.assertEqual(len(records), 3)
+
+
+    def test_can_get_connection_records(self):
+        self.assertEqual(connection_records([
+         {"atom": 1, "bond_to": [2, 3, 4, 5, 6]}
+        ]), [
+         "CONECT    1    2    3    4    5".ljust(80),
+         "CONECT    1    6".ljust(80)
+        ])
+
+
+
+class PdbFileWritingTests(PdbFileTest):
+
+    def test_structure_file_matches_pdb_string(self):
+        for structure in (self.model, self.chainb, self.ligand):
+            f = StringIO()
+            structure_to_pdb_file(structure, f, description="SOME ATOMS")
+            pdb_dict = structure_to_pdb_dict(structure)
+            pdb_dict["title"] = "SOME ATOMS"
+            self.assertEqual(f.getvalue(), pdb_dict_to_pdb_string(pdb_dict))
+
+
+    def test_pdb_file_matches_pdb_string(self):
+        pdb = Pdb()
+        pdb._models = [self.model]
+        pdb._code, pdb._technique = "1XXX", "X-RAY DIFFRACTION"
+        f = StringIO()
+        pdb_to_pdb_file(pdb, f)
+        self.assertEqual(f.getvalue(), pdb_dict_to_pdb_string(pdb_to_pdb_dict(pdb)))
+        self.assertIn("CONECT    6    8", f.getvalue())
+
+
+    def test_multi_model_pdb_file_matches_pdb_string(self):
+        pdb = Pdb()
+        other = Model(*[atom.copy() for atom in self.model.atoms()])
+        pdb._models = [self.model, other]
+        f = StringIO()
+        pdb_to_pdb_file(pdb, f)
+        self.assertEqual(f.getvalue(), pdb_dict_to_pdb_string(pdb_to_pdb_dict(pdb)))
+        self.assertEqual(f.getvalue().count("ENDMDL"), 2)
+
+
+    def test_trajectory_pdb_file_matches_pdb_string(self):
+        pdb = Pdb()
+        frames = np.stack([self.model.arrays.coordinates] * 3)
+        frames[1] += 1
+        pdb._trajectory = Trajectory(self.model, frames)
+        pdb._models = [self.model]
+        pdb._trajectory.select(2)
+        f = StringIO()
+        pdb_to_pdb_file(pdb, f)
+        self.assertEqual(pdb._trajectory.frame, 2)
+        self.assertEqual(f.getvalue(), pdb_dict_to_pdb_string(pdb_to_pdb_dict(pdb)))
+        self.assertEqual(f.getvalue().count("MODEL "), 3)
+
+
+    def test_empty_pdb_file_has_only_annotation(self):
+        pdb = Pdb()
+        pdb._technique = "X-RAY DIFFRACTION"
+        f = StringIO()
+        pdb_to_pdb_file(pdb, f)
+        self.assertEqual(f.getvalue(), "EXPDTA    X-RAY DIFFRACTION".ljust(80))
@@ -0,0 +1,206 @@
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch, Mock, MagicMock
+from atomium.files.pdbwriter import PdbWriter
+from atomium.files.pdb import Pdb
+from atomium.files.pdb2pdbfile import pdb_to_pdb_file
+from atomium.structures import Model, Residue, Molecule, Atom
+
+class PdbWriterTest(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("N", 1, 2, 3, id=1, name="N"), Atom("C", 4, 5, 6, id=2, name="CA"),
+         Atom("Zn", 7, 8, 9, id=3, name="ZN")
+        ]
+        self.atoms[2].bond_to(self.atoms[1])
+        self.model = Model(
+         Residue(*self.atoms[:2], id="A1", name="GLY"),
+         Molecule(self.atoms[2], id="A100", name="ZN")
+        )
+        self.pdb = Pdb()
+        self.pdb._code, self.pdb._title = "1XXX", "A TITLE"
+
+
+    def moved_model(self, distance):
+        model = Model(*[atom.copy() for atom in self.model.atoms()])
+        model.translate(distance, 0, 0)
+        return model
+
+
+    def saved(self, models):
+        self.pdb._models = models
+        f = StringIO()
+        pdb_to_pdb_file(self.pdb, f)
+        return f.getvalue()
+
+
+
+class PdbWriterCreationTests(PdbWriterTest):
+
+    def test_can_create_writer_with_file(self):
+        f = StringIO()
+        writer = PdbWriter(f, pdb=self.pdb)
+        self.assertEqual(writer._models, 0)
+        self.assertFalse(writer._closed)
+        self.assertIs(writer._file, f)
+        self.assertFalse(writer._opened)
+        self.assertTrue(f.getvalue().startswith("HEADER"))
+        self.assertIn("1XXX", f.getvalue())
+
+
+    @patch("atomium.files.pdbwriter.open_file")
+    def test_can_create_writer_with_path(self, mock_open):
+        writer = PdbWriter("path.pdb.gz", title="T", compression="gzip")
+        mock_open.assert_called_with("path.pdb.gz", "w", "gzip")
+        self.assertIs(writer._file, mock_open.return_value)
+        self.assertTrue(writer._opened)
+        mock_open.return_value.write.assert_called_with("TITLE     T".ljust(80))
+
+
+    def test_cannot_compress_open_file(self):
+        f = StringIO()
+        with self.assertRaises(ValueError):
+            PdbWriter(f, compression="gzip")
+        self.assertEqual(f.getvalue(), "")
+
+
+    def test_header_can_be_empty(self):
+        f = StringIO()
+        writer = PdbWriter(f)
+        self.assertEqual(f.getvalue(), "")
+        self.assertFalse(writer._written)
+
+
+    def test_writer_repr(self):
+        writer = PdbWriter(StringIO())
+        self.assertEqual(repr(writer), "<PdbWriter (0 models)>")
+        writer.push(self.model)
+        self.assertEqual(repr(writer), "<PdbWriter (1 model)>")
+        writer.close()
+        self.assertEqual(repr(writer), "<PdbWriter (1 model, closed)>")
+
+
+
+class PdbWriterPropertyTests(PdbWriterTest):
+
+    def test_models_property(self):
+        writer = PdbWriter(StringIO())
+        writer._models = 4
+        self.assertEqual(writer.models, 4)
+
+
+    def test_closed_property(self):
+        writer = PdbWriter(StringIO())
+        writer._closed = True
+        self.assertTrue(writer.closed)
+
+
+
+class PdbWriterPushingTests(PdbWriterTest):
+
+    def test_first_model_is_held_back(self):
+        f = StringIO()
+        writer = PdbWriter(f)
+        writer.push(self.model)
+        self.assertEqual(f.getvalue(), "")
+        self.assertEqual(writer.models, 1)
+        self.assertEqual(writer._connections, [
+         {"atom": 3, "bond_to": [2]}
+        ])
+
+
+    def test_second_model_writes_both(self):
+        f = StringIO()
+        writer = PdbWriter(f)
+        writer.push(self.model)
+        writer.push(self.moved_model(10))
+        self.assertIsNone(writer._pending)
+        self.assertEqual(f.getvalue().count("ENDMDL"), 2)
+        self.assertTrue(f.getvalue().startswith("MODEL        1"))
+
+
+    def test_models_are_formatted_when_pushed(self):
+        f = StringIO()
+        writer = PdbWriter(f)
+        writer.push(self.model)
+        self.model.translate(100, 0, 0)
+        writer.close()
+        self.assertIn("   1.000   2.000   3.000", f.getvalue())
+
+
+    def test_cannot_push_to_closed_writer(self):
+        writer = PdbWriter(StringIO())
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.push(self.model)
+
+
+
+class PdbWriterClosingTests(PdbWriterTest):
+
+    def test_one_model_is_written_like_pdb_save(self):
+        f = StringIO()
+        writer = PdbWriter(f, pdb=self.pdb)
+        writer.push(self.model)
+        writer.close()
+        self.assertTrue(writer.closed)
+        self.assertEqual(f.getvalue(), self.saved([self.model]))
+
+
+    def test_many_models_are_written_like_pdb_save(self):
+        models = [self.model, self.moved_model(10), self.moved_model(20)]
+        f = StringIO()
+        with PdbWriter(f, pdb=self.pdb) as writer:
+            for model in models:
+                writer.push(model)
+        self.assertTrue(writer.closed)
+        self.assertEqual(f.getvalue(), self.saved(models))
+        self.assertFalse(f.closed)
+
+
+    def test_no_models_writes_only_header(self):
+        f = StringIO()
+        with PdbWriter(f, pdb=self.pdb):
+            pass
+        self.assertEqual(f.getvalue(), self.saved([]))
+
+
+    @patch("atomium.files.pdbwriter.open_file")
+    def test_closing_closes_opened_file(self, mock_open):
+        writer = PdbWriter("path")
+        writer.close()
+        mock_open.return_value.close.assert_called_with()
+        writer.close()
+        self.assertEqual(mock_open.return_value.close.call_count, 1)
+
+
+    @patch("atomium.files.pdbwriter.open_file")
+    def test_file_is_closed_when_context_fails(self, mock_open):
+        with self.assertRaises(ZeroDivisionError):
+            with PdbWriter("path") as writer:
+                1 / 0
+        mock_open.return_value.close.assert_called_with()
+
+
+    def test_failed_context_does_not_finish_file(self):
+        f = StringIO()
+        with self.assertRaises(ZeroDivisionError):
+            with PdbWriter(f, pdb=self.pdb) as writer:
+                writer.push(self.model)
+                1 / 0
+        self.assertTrue(writer.closed)
+        self.assertIsNone(writer._pending)
+        self.assertEqual(f.getvalue(), self.saved([]))
+        self.assertNotIn("CONECT", f.getvalue())
+
+
+    def test_failed_context_keeps_models_already_written(self):
+        f = StringIO()
+        with self.assertRaises(ZeroDivisionError):
+            with PdbWriter(f) as writer:
+                writer.push(self.model)
+                writer.push(self.moved_model(10))
+                1 / 0
+        self.assertEqual(f.getvalue().count("ENDMDL"), 2)
+        self.assertNotIn("CONECT", f.getvalue())
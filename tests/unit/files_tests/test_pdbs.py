@@ -9,6 +9,7 @@ class PdbCreationTests(TestCase):
     def test_can_create_pdb(self):
         pdb = Pdb()
         self.assertEqual(pdb._models, [])
+        self.assertEqual(pdb._trajectory, None)
         self.assertEqual(pdb._code, None)
         self.assertEqual(pdb._deposition_date, None)
         self.assertEqual(pdb._title, None)
@@ -40,6 +41,12 @@ class PdbReprTests(TestCase):
         self.assertEqual(str(pdb), "<Pdb (3 models)>")
 
 
+    def test_pdb_repr_trajectory(self):
+        pdb = Pdb()
+        pdb._models, pdb._trajectory = ["1"], ["1", "2", "3", "4"]
+        self.assertEqual(str(pdb), "<Pdb (4 models)>")
+
+
     def test_pdb_repr_with_code(self):
         pdb = Pdb()
         pdb._code = "1XXX"
@@ -279,6 +286,70 @@ class PdbRfactorTests(TestCase):
 
 
 
+class PdbRmsdMatrixTests(TestCase):
+
+    @patch("atomium.files.pdb.rmsd_matrix")
+    def test_can_get_rmsd_matrix_of_models(self, mock_matrix):
+        pdb = Pdb()
+        pdb._models = [Mock(), Mock()]
+        mock_matrix.return_value = "matrix"
+        self.assertEqual(pdb.rmsd_matrix(), "matrix")
+        mock_matrix.assert_called_with(
+         pdb._models, superimpose=True, labels=False, processes=None
+        )
+        pdb.rmsd_matrix(superimpose=False, labels=True, processes=3)
+        mock_matrix.assert_called_with(
+         pdb._models, superimpose=False, labels=True, processes=3
+        )
+
+
+
+class PdbEnsembleTests(TestCase):
+
+    def test_can_get_trajectory(self):
+        pdb = Pdb()
+        self.assertIsNone(pdb.trajectory)
+        pdb._trajectory = "trajectory"
+        self.assertEqual(pdb.trajectory, "trajectory")
+
+
+    def test_trajectory_is_used_for_ensemble_analyses(self):
+        pdb = Pdb()
+        pdb._trajectory = Mock()
+        pdb._trajectory.rmsd_matrix.return_value = "matrix"
+        pdb._trajectory.rmsf.return_value = "rmsf"
+        pdb._trajectory.mean_model.return_value = "model"
+        self.assertEqual(pdb.rmsd_matrix(False, processes=2), "matrix")
+        pdb._trajectory.rmsd_matrix.assert_called_with(False, 2)
+        self.assertEqual(pdb.rmsf(), "rmsf")
+        pdb._trajectory.rmsf.assert_called_with(True)
+        self.assertEqual(pdb.mean_model(), "model")
+        pdb._trajectory.mean_model.assert_called_with(True)
+
+
+    @patch("atomium.files.pdb.rmsf")
+    def test_can_get_rmsf_of_models(self, mock_rmsf):
+        pdb = Pdb()
+        pdb._models = [Mock(), Mock()]
+        mock_rmsf.return_value = {1: 0.5}
+        self.assertEqual(pdb.rmsf(), {1: 0.5})
+        mock_rmsf.assert_called_with(
+         pdb._models, superimpose=True, labels=False
+        )
+
+
+    @patch("atomium.files.pdb.mean_structure")
+    def test_can_get_mean_model(self, mock_mean):
+        pdb = Pdb()
+        pdb._models = [Mock(), Mock()]
+        mock_mean.return_value = "model"
+        self.assertEqual(pdb.mean_model(superimpose=False, labels=True), "model")
+        mock_mean.assert_called_with(
+         pdb._models, superimpose=False, labels=True
+        )
+
+
+
 class PdbToStringTests(TestCase):
 
     @patch("atomium.files.pdb2pdbdict.pdb_to_pdb_dict")
@@ -297,10 +368,21 @@ class PdbToStringTests(TestCase):
 
 class PdbToFileTests(TestCase):
 
-    @patch("atomium.files.utilities.string_to_file")
-    @patch("atomium.files.pdb.Pdb.to_file_string")
-    def test_can_save_pdb_to_file(self, mock_string, mock_save):
+    @patch("builtins.open")
+    @patch("atomium.files.pdb2pdbfile.pdb_to_pdb_file")
+    def test_can_save_pdb_to_file(self, mock_write, mock_open):
         pdb = Pdb()
-        mock_string.return_value = "filestring"
+        f = mock_open.return_value.__enter__.return_value
         pdb.save("test.pdb")
-        mock_save.assert_called_with("filestring", "test.pdb")
+        mock_open.assert_called_with("test.pdb", "w")
+        mock_write.assert_called_with(pdb, f)
+
+
+    @patch("atomium.files.utilities.open_file")
+    @patch("atomium.files.pdb2pdbfile.pdb_to_pdb_file")
+    def test_can_save_compressed_pdb_to_file(self, mock_write, mock_open):
+        pdb = Pdb()
+        f = mock_open.return_value.__enter__.return_value
+        pdb.save("test.pdb.xz")
+        mock_open.assert_called_with("test.pdb.xz", "w")
+        mock_write.assert_called_with(pdb, f)
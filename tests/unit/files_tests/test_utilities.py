@@ -133,7 +133,9 @@ class PdbFromFileTests(TestCase):
         mock_pdb.return_value = "PDB"
         pdb = pdb_from_file("path")
         mock_dict.assert_called_with("path")
-        mock_pdb.assert_called_with({"pdb": "dict"})
+        mock_pdb.assert_called_with(
+         {"pdb": "dict"}, trajectory=False, frames_path=None
+        )
         self.assertEqual(pdb, "PDB")
 
 
@@ -147,8 +149,14 @@ class PdbFetchingTests(TestCase):
         mock_pdb.return_value = "PDB"
         pdb = fetch("1xxx", a="blorg")
         mock_dict.assert_called_with("1xxx", a="blorg")
-        mock_pdb.assert_called_with({"pdb": "dict"})
+        mock_pdb.assert_called_with(
+         {"pdb": "dict"}, trajectory=False, frames_path=None
+        )
         self.assertEqual(pdb, "PDB")
+        fetch("1xxx", trajectory=True, frames_path="f.npy")
+        mock_pdb.assert_called_with(
+         {"pdb": "dict"}, trajectory=True, frames_path="f.npy"
+        )
 
 
     @patch("atomium.files.utilities.fetch_data")
@@ -209,3 +217,61 @@ class StringToFileTests(TestCase):
         string_to_file("filestring", "filename")
         mock_open.assert_called_once_with("filename", "w")
         mock_write.assert_called_once_with("filestring")
+
+
+    @patch("atomium.files.utilities.open_file")
+    def test_saves_string_to_compressed_file(self, mock_open):
+        mock_file = mock_open.return_value.__enter__.return_value
+        string_to_file("filestring", "filename.gz")
+        mock_open.assert_called_once_with("filename.gz", "w")
+        mock_file.write.assert_called_once_with("filestring")
+
+
+
+class PathCompressionTests(TestCase):
+
+    def test_can_get_compression_from_extension(self):
+        self.assertEqual(path_compression("file.pdb.gz"), "gzip")
+        self.assertEqual(path_compression("file.xyz.BZ2"), "bz2")
+        self.assertEqual(path_compression("path/to/file.pdb.xz"), "xz")
+
+
+    def test_uncompressed_paths_have_no_compression(self):
+        self.assertIsNone(path_compression("file.pdb"))
+        self.assertIsNone(path_compression("gz"))
+        self.assertIsNone(path_compression("path.gz/file.pdb"))
+
+
+
+class FileOpeningTests(TestCase):
+
+    @patch("builtins.open")
+    def test_can_open_plain_file(self, mock_open):
+        f = open_file("path/to/file", "w")
+        mock_open.assert_called_with("path/to/file", "w")
+        self.assertIs(f, mock_open.return_value)
+
+
+    @patch("gzip.open")
+    def test_can_open_compressed_file(self, mock_open):
+        with patch.dict(
+         "atomium.files.utilities.COMPRESSORS", {"gzip": mock_open}
+        ):
+            f = open_file("path/to/file", "w", compression="gzip")
+        mock_open.assert_called_with("path/to/file", "wt")
+        self.assertIs(f, mock_open.return_value)
+
+
+    @patch("bz2.open")
+    def test_compression_can_come_from_extension(self, mock_open):
+        with patch.dict(
+         "atomium.files.utilities.COMPRESSORS", {"bz2": mock_open}
+        ):
+            f = open_file("path/to/file.bz2", "a")
+        mock_open.assert_called_with("path/to/file.bz2", "at")
+        self.assertIs(f, mock_open.return_value)
+
+
+    def test_compression_must_be_known(self):
+        with self.assertRaises(ValueError):
+            open_file("path/to/file", "w", compression="zip")
@@ -0,0 +1,226 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+import numpy as np
+from atomium.structures.atoms import Atom
+from atomium.structures.arrays import AtomArrays, element_code, locate_atoms
+from atomium.structures.arrays import get_coordinates, set_coordinates
+
+class ElementCodeTests(TestCase):
+
+    def test_can_get_element_codes(self):
+        self.assertEqual(element_code("H"), 0)
+        self.assertEqual(element_code("C"), element_code("c"))
+        self.assertNotEqual(element_code("C"), element_code("N"))
+
+
+    def test_unknown_elements_get_new_codes(self):
+        code = element_code("XQ")
+        self.assertEqual(element_code("xq"), code)
+        arrays = AtomArrays()
+        arrays.add(Atom("XQ"))
+        self.assertEqual(arrays.masses.tolist(), [0])
+
+
+
+class AtomArraysCreationTests(TestCase):
+
+    def test_can_create_atom_arrays(self):
+        arrays = AtomArrays(capacity=4)
+        self.assertEqual(arrays._coordinates.shape, (4, 3))
+        self.assertEqual(arrays._bfactors.shape, (4,))
+        self.assertEqual(arrays._charges.shape, (4,))
+        self.assertEqual(arrays._elements.shape, (4,))
+        self.assertEqual(arrays._atoms, [])
+        self.assertEqual(arrays._rows, {})
+        self.assertEqual(arrays._version, 0)
+
+
+    def test_atom_arrays_repr(self):
+        arrays = AtomArrays()
+        arrays.add(Atom("C"))
+        self.assertEqual(str(arrays), "<AtomArrays (1 atoms)>")
+
+
+
+class AtomArraysAdditionTests(TestCase):
+
+    def test_can_add_atoms(self):
+        arrays = AtomArrays()
+        atom1 = Atom("C", 1, 2, 3, bfactor=4.5, charge=-1)
+        atom2 = Atom("N", 4, 5, 6)
+        arrays.add(atom1)
+        arrays.add(atom2)
+        self.assertEqual(len(arrays), 2)
+        self.assertIn(atom1, arrays)
+        self.assertEqual(arrays.atoms, (atom1, atom2))
+        self.assertEqual(arrays.coordinates.tolist(), [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(arrays.bfactors.tolist(), [4.5, 0])
+        self.assertEqual(arrays.charges.tolist(), [-1, 0])
+        self.assertEqual(
+         arrays.elements.tolist(), [element_code("C"), element_code("N")]
+        )
+        self.assertEqual(arrays.row(atom2), 1)
+        self.assertIs(atom2._arrays, arrays)
+        self.assertEqual(atom2._index, 1)
+        self.assertEqual(arrays.version, 2)
+
+
+    def test_adding_atoms_twice_does_nothing(self):
+        arrays = AtomArrays()
+        atom = Atom("C", 1, 2, 3)
+        arrays.add(atom)
+        arrays.add(atom)
+        self.assertEqual(len(arrays), 1)
+
+
+    def test_arrays_grow_when_full(self):
+        arrays = AtomArrays(capacity=1)
+        atoms = [Atom("C", i, 0, 0) for i in range(20)]
+        for atom in atoms: arrays.add(atom)
+        self.assertGreaterEqual(len(arrays._coordinates), 20)
+        self.assertEqual(arrays.coordinates[:, 0].tolist(), list(range(20)))
+
+
+    def test_adding_atom_takes_it_from_other_arrays(self):
+        arrays1, arrays2 = AtomArrays(), AtomArrays()
+        atom = Atom("C", 1, 2, 3)
+        arrays1.add(atom)
+        arrays2.add(atom)
+        self.assertNotIn(atom, arrays1)
+        self.assertIs(atom._arrays, arrays2)
+        self.assertEqual(atom.location, (1, 2, 3))
+
+
+
+class AtomArraysExtensionTests(TestCase):
+
+    def test_can_add_many_atoms(self):
+        arrays = AtomArrays(capacity=1)
+        arrays.add(Atom("C", 0, 0, 0))
+        atoms = [Atom("N", 1, 2, 3, bfactor=4, charge=-1), Atom("o", 4, 5, 6)]
+        version = Atom._placement_version
+        arrays.extend(atoms + atoms)
+        self.assertEqual(len(arrays), 3)
+        self.assertEqual(arrays.atoms[1:], tuple(atoms))
+        self.assertEqual(arrays.coordinates[1:].tolist(), [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(arrays.bfactors.tolist(), [0, 4, 0])
+        self.assertEqual(arrays.charges.tolist(), [0, -1, 0])
+        self.assertEqual(arrays.elements[2], element_code("O"))
+        self.assertIs(atoms[1]._arrays, arrays)
+        self.assertEqual(atoms[1]._index, 2)
+        self.assertEqual(atoms[1].location, (4, 5, 6))
+        self.assertGreater(Atom._placement_version, version)
+
+
+    def test_extending_takes_atoms_from_other_arrays(self):
+        arrays1, arrays2 = AtomArrays(), AtomArrays()
+        atom = Atom("C", 1, 2, 3)
+        arrays1.add(atom)
+        arrays2.extend([atom])
+        arrays2.extend([atom])
+        self.assertNotIn(atom, arrays1)
+        self.assertEqual(len(arrays2), 1)
+        self.assertEqual(atom.location, (1, 2, 3))
+
+
+
+class AtomArraysRemovalTests(TestCase):
+
+    def test_can_remove_atoms(self):
+        arrays = AtomArrays()
+        atoms = [Atom("C", i, i, i, bfactor=i) for i in range(3)]
+        for atom in atoms: arrays.add(atom)
+        atoms[1].x = 10
+        arrays.remove(atoms[0])
+        self.assertEqual(arrays.atoms, (atoms[2], atoms[1]))
+        self.assertEqual(arrays.coordinates.tolist(), [[2, 2, 2], [10, 1, 1]])
+        self.assertEqual(arrays.bfactors.tolist(), [2, 1])
+        self.assertEqual(atoms[2]._index, 0)
+        self.assertIsNone(atoms[0]._arrays)
+        self.assertEqual(atoms[0].location, (0, 0, 0))
+        self.assertEqual(atoms[2].location, (2, 2, 2))
+
+
+    def test_removing_absent_atom_does_nothing(self):
+        arrays = AtomArrays()
+        arrays.remove(Atom("C"))
+        self.assertEqual(arrays.version, 0)
+
+
+
+class AtomArraysElementMaskTests(TestCase):
+
+    def setUp(self):
+        self.arrays = AtomArrays()
+        for element in ("C", "h", "Zn", "c", "XQ"):
+            self.arrays.add(Atom(element))
+
+
+    def test_empty_mask(self):
+        self.assertEqual(self.arrays.element_mask().tolist(), [True] * 5)
+
+
+    def test_element_mask(self):
+        self.assertEqual(
+         self.arrays.element_mask(element="C").tolist(),
+         [True, False, False, True, False]
+        )
+        self.assertFalse(self.arrays.element_mask(element="QQ").any())
+
+
+    def test_hydrogen_and_metal_mask(self):
+        self.assertEqual(
+         self.arrays.element_mask(hydrogen=False, metal=False).tolist(),
+         [True, False, False, True, True]
+        )
+
+
+
+class CoordinateAccessTests(TestCase):
+
+    def setUp(self):
+        self.arrays = AtomArrays()
+        self.atoms = [Atom("C", i, i + 1, i + 2) for i in range(3)]
+        for atom in self.atoms: self.arrays.add(atom)
+
+
+    def test_can_locate_atoms(self):
+        arrays, rows = locate_atoms(self.atoms[::-1])
+        self.assertIs(arrays, self.arrays)
+        self.assertEqual(rows.tolist(), [2, 1, 0])
+
+
+    def test_cannot_locate_atoms_in_different_places(self):
+        self.assertEqual(locate_atoms(self.atoms + [Atom("C")]), (None, None))
+        self.assertEqual(locate_atoms([]), (None, None))
+
+
+    def test_can_get_coordinates(self):
+        coordinates = get_coordinates(self.atoms[1:], *locate_atoms(self.atoms[1:]))
+        self.assertEqual(coordinates.tolist(), [[1, 2, 3], [2, 3, 4]])
+        coordinates[0, 0] = 100
+        self.assertEqual(self.atoms[1].x, 1)
+
+
+    def test_can_get_free_coordinates(self):
+        atoms = [Atom("C", 1, 2, 3), Atom("C", 4, 5, 6)]
+        self.assertEqual(
+         get_coordinates(atoms).tolist(), [[1, 2, 3], [4, 5, 6]]
+        )
+        self.assertEqual(get_coordinates([]).shape, (0, 3))
+
+
+    def test_can_set_coordinates(self):
+        set_coordinates(
+         self.atoms[:2], np.array([[9, 9, 9], [8, 8, 8]]),
+         *locate_atoms(self.atoms[:2])
+        )
+        self.assertEqual(self.atoms[0].location, (9, 9, 9))
+        self.assertEqual(self.atoms[1].location, (8, 8, 8))
+        self.assertEqual(self.arrays.version, 4)
+
+
+    def test_can_set_free_coordinates(self):
+        atoms = [Atom("C", 1, 2, 3)]
+        set_coordinates(atoms, np.array([[9, 8, 7]]))
+        self.assertEqual(atoms[0].location, (9, 8, 7))
@@ -1,9 +1,15 @@
+import gc
 import math
+import weakref
+import numpy as np
 from unittest import TestCase
 from unittest.mock import Mock, patch, PropertyMock
 from atomium.structures.atoms import Atom
 from atomium.structures.molecules import AtomicStructure, Molecule, Residue
+from atomium.structures.molecules import rmsd_matrix, rmsf, mean_structure
 from atomium.structures.chains import Chain
+from atomium.structures.models import Model
+from atomium.structures.views import SetView
 
 class AtomicStructureTest(TestCase):
 
@@ -68,6 +74,41 @@ class AtomicStructureAtomsTests(AtomicStructureTest):
         self.assertEqual(structure.atoms(), set(self.atoms))
 
 
+    def test_all_atoms_are_not_copied(self):
+        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
+        atoms = structure.atoms()
+        self.assertIsInstance(atoms, SetView)
+        self.assertIs(atoms._items, structure._atoms)
+        with self.assertRaises(AttributeError):
+            atoms.add(Mock(Atom))
+        copy = atoms.copy()
+        copy.remove(self.atom1)
+        self.assertIn(self.atom1, structure)
+
+
+    def test_filtered_atoms_are_new_sets(self):
+        atoms = [Atom("C", name="CA", id=1), Atom("h", name="H", id=2)]
+        structure = AtomicStructure(*atoms)
+        self.assertIs(type(structure.atoms(element="C")), set)
+        self.assertIsInstance(structure.atoms(id=1), SetView)
+
+
+    def test_can_filter_atoms(self):
+        atoms = [Atom("C", name="CA", id=1), Atom("h", name="H", id=2)]
+        structure = AtomicStructure(*atoms)
+        self.assertEqual(structure.atoms(element="c"), {atoms[0]})
+        self.assertEqual(structure.atoms(hydrogen=False), {atoms[0]})
+        self.assertEqual(structure.atoms(name="H"), {atoms[1]})
+
+
+    def test_can_filter_atoms_by_id_index(self):
+        atoms = [Atom("C", name="CA", id=1), Atom("N", name="CA", id=1)]
+        structure = AtomicStructure(*atoms, Atom("C", id=2))
+        self.assertEqual(structure.atoms(id=1), set(atoms))
+        self.assertEqual(structure.atoms(id=1, element="N"), {atoms[1]})
+        self.assertEqual(structure.atoms(id=3), set())
+
+
 
 class AtomicStructureAtomTest(AtomicStructureTest):
 
@@ -541,68 +582,101 @@ class StructureComplexTest(AtomicStructureTest):
 
 class AtomicStructureTrimmingTests(AtomicStructureTest):
 
-    @patch("atomium.structures.molecules.AtomicStructure.atoms")
-    def test_can_trim_structure(self, mock_atoms):
-        mock_atoms.return_value = set(self.atoms)
-        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
-        structure.trim(108)
-        mock_atoms.assert_called_with()
-        self.atom1.trim.assert_called_with(108)
-        self.atom2.trim.assert_called_with(108)
-        self.atom3.trim.assert_called_with(108)
+    def test_can_trim_structure(self):
+        self.atom1.location = (0.1234, 1.5678, -2.3456)
+        self.atom2.location = (1, 2, 3)
+        structure = AtomicStructure(self.atom1, self.atom2)
+        for atom in (self.atom1, self.atom2): atom._arrays = None
+        structure.trim(2)
+        self.assertEqual(
+         (self.atom1._x, self.atom1._y, self.atom1._z), (0.12, 1.57, -2.35)
+        )
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (1, 2, 3))
+
+
+    @patch("atomium.structures.molecules.set_coordinates")
+    def test_trimming_with_none_does_nothing(self, mock_set):
+        structure = AtomicStructure(self.atom1, self.atom2)
+        structure.trim(None)
+        self.assertFalse(mock_set.called)
 
 
 
 class AtomicStructureTranslationTests(AtomicStructureTest):
 
+    def setUp(self):
+        AtomicStructureTest.setUp(self)
+        self.atom1.location = (1, 2, 3)
+        self.atom2.location = (4, 5, 6)
+        for atom in self.atoms: atom._arrays = None
+        self.structure = AtomicStructure(self.atom1, self.atom2)
+
+
     def test_structure_translation(self):
-        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
-        structure.translate(5, 4, -2, a=1, b=2)
-        for atom in self.atoms:
-            atom.translate.assert_called_with(5, 4, -2, a=1, b=2)
+        self.structure.translate(5, 4, -2)
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (6, 6, 1))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (9, 9, 4))
+
+
+    def test_structure_translation_with_iterable(self):
+        self.structure.translate((5, 4, -2))
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (6, 6, 1))
+
+
+    def test_structure_translation_trims(self):
+        atom = Atom("C", 1, 2, 3)
+        structure = AtomicStructure(atom)
+        structure.translate(0.123, 0, 0)
+        self.assertEqual(atom._x, 1.123)
+        structure.translate(0.0001, 0, 0, trim=2)
+        self.assertEqual(atom._x, 1.12)
+        structure.translate(0.0001, 0, 0, trim=None)
+        self.assertAlmostEqual(atom._x, 1.1201, delta=0.000001)
+
+
+    def test_structure_translation_in_arrays(self):
+        atoms = [Atom("C", 1, 2, 3), Atom("N", 4, 5, 6)]
+        model = Model(*atoms)
+        version = model.arrays.version
+        structure = AtomicStructure(*atoms)
+        structure.translate(1, 1, 1)
+        self.assertEqual(atoms[0].location, (2, 3, 4))
+        self.assertEqual(atoms[1].location, (5, 6, 7))
+        self.assertGreater(model.arrays.version, version)
 
 
 
 class AtomicStructureRotationTests(AtomicStructureTest):
 
-    @patch("atomium.structures.molecules.Atom.generate_rotation_matrix")
-    @patch("atomium.structures.molecules.AtomicStructure.trim")
-    def test_structure_rotation(self, mock_trim, mock_matrix):
-        matrix = Mock()
-        mock_matrix.return_value = matrix
-        matrix.dot.side_effect = ([10, 20, 30], [40, 50, 60], [70, 80, 90])
-        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
-        structure._atoms = self.atoms
-        structure.rotate(0.1, "z")
-        mock_matrix.assert_called_with(None, 0.1, "z")
-        for i, atom in enumerate(self.atoms):
-            for j, coord in enumerate((atom._x, atom._y, atom._z)):
-                self.assertEqual(coord, 10 + (30 * i) + (10 * j))
-        mock_trim.assert_called_with(12)
-
-
-    @patch("atomium.structures.molecules.Atom.generate_rotation_matrix")
-    @patch("atomium.structures.molecules.AtomicStructure.trim")
-    def test_structure_rotation_varied_trim(self, mock_trim, mock_matrix):
-        matrix = Mock()
-        mock_matrix.return_value = matrix
-        matrix.dot.side_effect = ([10, 20, 30], [40, 50, 60], [70, 80, 90])
-        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
-        structure._atoms = self.atoms
-        structure.rotate(0.1, "z", trim=9)
-        mock_trim.assert_called_with(9)
+    def setUp(self):
+        AtomicStructureTest.setUp(self)
+        self.atom1.location = (1, 0, 0)
+        self.atom2.location = (0, 1, 0)
+        for atom in self.atoms: atom._arrays = None
+        self.structure = AtomicStructure(self.atom1, self.atom2)
 
 
-    @patch("atomium.structures.molecules.Atom.generate_rotation_matrix")
-    @patch("atomium.structures.molecules.AtomicStructure.trim")
-    def test_structure_rotation_in_degrees(self, mock_trim, mock_matrix):
-        matrix = Mock()
-        mock_matrix.return_value = matrix
-        matrix.dot.side_effect = ([10, 20, 30], [40, 50, 60], [70, 80, 90])
-        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
-        structure._atoms = self.atoms
-        structure.rotate(0.1, "z", degrees=True)
-        mock_matrix.assert_called_with(None, math.radians(0.1), "z")
+    @patch("atomium.structures.molecules.rotation_matrix")
+    def test_structure_rotation(self, mock_matrix):
+        mock_matrix.return_value = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+        self.structure.rotate(0.1, "z")
+        mock_matrix.assert_called_with(0.1, "z")
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (0, 1, 0))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (-1, 0, 0))
+
+
+    def test_structure_rotation_varied_trim(self):
+        self.structure.rotate(math.pi / 4, "z", trim=3)
+        self.assertEqual(
+         (self.atom1._x, self.atom1._y, self.atom1._z), (0.707, 0.707, 0)
+        )
+
+
+    @patch("atomium.structures.molecules.rotation_matrix")
+    def test_structure_rotation_in_degrees(self, mock_matrix):
+        mock_matrix.return_value = np.identity(3)
+        self.structure.rotate(0.1, "z", degrees=True)
+        mock_matrix.assert_called_with(math.radians(0.1), "z")
 
 
     def test_rotation_axis_must_be_valid(self):
@@ -611,10 +685,85 @@ class AtomicStructureRotationTests(AtomicStructureTest):
             structure.rotate(0.1, "s")
 
 
+    def test_structure_rotation_around_vector(self):
+        self.structure.rotate(math.pi, (1, 1, 0))
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (0, 1, 0))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (1, 0, 0))
+
+
+    def test_structure_rotation_around_point(self):
+        self.structure.rotate(math.pi / 2, "z", point=(1, 1, 0))
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (2, 1, 0))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (1, 0, 0))
+
+
+    def test_structure_quaternion_rotation(self):
+        self.structure.rotate_by_quaternion((1, 0, 0, 1), trim=12)
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (0, 1, 0))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (-1, 0, 0))
+
+
+    def test_structure_quaternion_rotation_around_point(self):
+        self.structure.rotate_by_quaternion((0, 0, 0, 1), point=(0, 1, 0))
+        self.assertAlmostEqual(self.atom1._x, -1, delta=0.0000001)
+        self.assertAlmostEqual(self.atom1._y, 2, delta=0.0000001)
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (0, 1, 0))
+
+
+
+class AtomicStructureTransformationTests(AtomicStructureTest):
+
+    def setUp(self):
+        AtomicStructureTest.setUp(self)
+        self.atom1.location = (1, 0, 0)
+        self.atom2.location = (0, 1, 0)
+        for atom in self.atoms: atom._arrays = None
+        self.structure = AtomicStructure(self.atom1, self.atom2)
+
+
+    def test_can_apply_linear_matrix(self):
+        self.structure.transform([[2, 0, 0], [0, 3, 0], [0, 0, 1]])
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (2, 0, 0))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (0, 3, 0))
+
+
+    def test_can_apply_affine_matrix(self):
+        self.structure.transform([
+         [0, -1, 0, 5], [1, 0, 0, 6], [0, 0, 1, 7], [0, 0, 0, 1]
+        ])
+        self.assertEqual((self.atom1._x, self.atom1._y, self.atom1._z), (5, 7, 7))
+        self.assertEqual((self.atom2._x, self.atom2._y, self.atom2._z), (4, 6, 7))
+
+
+    def test_transformation_only_trims_when_asked(self):
+        atom = Atom("C", 1, 0, 0)
+        structure = AtomicStructure(atom)
+        structure.transform([[1 / 3, 0, 0], [0, 1, 0], [0, 0, 1]])
+        self.assertEqual(atom._x, 1 / 3)
+        structure.transform(np.identity(3), trim=2)
+        self.assertEqual(atom._x, 0.33)
+
+
+    def test_matrix_must_be_right_shape(self):
+        with self.assertRaises(ValueError):
+            self.structure.transform([[1, 0], [0, 1]])
+
+
+    def test_transformation_in_arrays(self):
+        atoms = [Atom("C", 1, 2, 3), Atom("N", 4, 5, 6)]
+        model = Model(*atoms)
+        version = model.arrays.version
+        model.transform(np.identity(4) * 2)
+        self.assertEqual(atoms[0].location, (2, 4, 6))
+        self.assertEqual(atoms[1].location, (8, 10, 12))
+        self.assertGreater(model.arrays.version, version)
+
+
 
 class AtomicStructureMassTests(AtomicStructureTest):
 
     def test_structure_mass_is_sum_of_atom_masses(self):
+        for atom in self.atoms: atom._arrays = None
         structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
         self.assertEqual(structure.mass, 17.1)
 
@@ -626,6 +775,7 @@ class AtomicStructureChargeTests(AtomicStructureTest):
         self.atom1.charge = 0.2
         self.atom2.charge = -1.4
         self.atom3.charge = 0.6
+        for atom in self.atoms: atom._arrays = None
         structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
         self.assertEqual(structure.charge, -0.6)
 
@@ -634,49 +784,124 @@ class AtomicStructureChargeTests(AtomicStructureTest):
 class AtomicStructureFormulaTests(AtomicStructureTest):
 
     def test_can_get_formula(self):
+        for atom in self.atoms: atom._arrays = None
         structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
         self.assertEqual(structure.formula, {"A":1, "B":2})
 
 
 
+class AtomicStructureDerivedValueCachingTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [Atom("C", 0, 0, 0, charge=1), Atom("O", 2, 0, 0)]
+        self.structure = AtomicStructure(*self.atoms)
+
+
+    def test_values_are_only_calculated_once(self):
+        with patch("atomium.structures.molecules.AtomicStructure._masses") as m:
+            m.return_value = np.array([12, 16])
+            self.assertEqual(self.structure.mass, 28)
+            self.assertEqual(self.structure.mass, 28)
+            self.assertEqual(m.call_count, 1)
+
+
+    def test_formula_cache_cannot_be_changed(self):
+        self.structure.formula["C"] = 100
+        self.assertEqual(self.structure.formula["C"], 1)
+
+
+    def test_free_atom_changes_are_seen(self):
+        center = self.structure.center_of_mass
+        self.atoms[1].x = 4
+        self.assertNotEqual(self.structure.center_of_mass, center)
+        self.atoms[0].charge = -1
+        self.assertEqual(self.structure.charge, -1)
+        self.atoms[1].element = "C"
+        self.assertEqual(self.structure.formula, {"C": 2})
+
+
+    def test_array_atom_changes_are_seen(self):
+        model = Model(*self.atoms)
+        for structure in (self.structure, model):
+            self.assertAlmostEqual(structure.mass, 28, delta=0.1)
+            self.assertAlmostEqual(
+             structure.radius_of_gyration, 1.01, delta=0.01
+            )
+        model.translate(1, 0, 0)
+        self.atoms[1].element = "C"
+        self.atoms[1].charge = 2
+        for structure in (self.structure, model):
+            self.assertAlmostEqual(structure.mass, 24, delta=0.1)
+            self.assertEqual(structure.center_of_mass, (2, 0, 0))
+            self.assertEqual(structure.radius_of_gyration, 1)
+            self.assertEqual(structure.charge, 3)
+
+
+    def test_added_and_removed_atoms_are_seen(self):
+        self.assertEqual(self.structure.charge, 1)
+        atom = Atom("N", charge=0.5)
+        self.structure.add_atom(atom)
+        self.assertEqual(self.structure.charge, 1.5)
+        self.structure.remove_atom(self.atoms[0])
+        self.assertEqual(self.structure.charge, 0.5)
+        self.assertEqual(self.structure.formula, {"O": 1, "N": 1})
+
+
+    def test_atoms_split_between_models_are_not_cached(self):
+        Model(self.atoms[0])
+        Model(self.atoms[1])
+        self.assertEqual(self.structure.center_of_mass[1:], (0, 0))
+        self.assertIsNone(self.structure._value_stamp())
+        self.atoms[0].x = -2
+        self.assertAlmostEqual(
+         self.structure.radius_of_gyration, 2.02, delta=0.01
+        )
+
+
+
 class AtomicStructureCenterOfMassTests(AtomicStructureTest):
 
-    @patch("atomium.structures.molecules.AtomicStructure.mass", new_callable=PropertyMock)
-    def test_can_get_center_of_mass_when_equal_mass(self, mock_mass):
-        mock_mass.return_value = 20
-        self.atom1.x, self.atom1.y, self.atom1.z = 0, 0, 0
-        self.atom2.x, self.atom2.y, self.atom2.z = 1, 1, 1
+    def setUp(self):
+        AtomicStructureTest.setUp(self)
+        for atom in self.atoms: atom._arrays = None
+
+
+    def test_can_get_center_of_mass_when_equal_mass(self):
+        self.atom1.location = (0, 0, 0)
+        self.atom2.location = (1, 1, 1)
         self.atom1.mass = 10
         self.atom2.mass = 10
         structure = AtomicStructure(self.atom1, self.atom2)
         self.assertEqual(structure.center_of_mass, (0.5, 0.5, 0.5))
 
 
-    @patch("atomium.structures.molecules.AtomicStructure.mass", new_callable=PropertyMock)
-    def test_can_get_center_of_mass_when_unequal_mass(self, mock_mass):
-        mock_mass.return_value = 40
-        self.atom1.x, self.atom1.y, self.atom1.z = 0, 0, 0
-        self.atom2.x, self.atom2.y, self.atom2.z = 1, 1, 1
+    def test_can_get_center_of_mass_when_unequal_mass(self):
+        self.atom1.location = (0, 0, 0)
+        self.atom2.location = (1, 1, 1)
         self.atom1.mass = 10
         self.atom2.mass = 30
         structure = AtomicStructure(self.atom1, self.atom2)
         self.assertEqual(structure.center_of_mass, (0.75, 0.75, 0.75))
 
 
+    def test_can_get_center_of_mass_from_arrays(self):
+        atoms = [Atom("C", 0, 0, 0), Atom("C", 1, 1, 1), Atom("O", 5, 5, 5)]
+        Model(*atoms)
+        structure = AtomicStructure(*atoms[:2])
+        self.assertEqual(structure.center_of_mass, (0.5, 0.5, 0.5))
+
+
 
 class AtomicStructureRadiusOfGyrationTests(AtomicStructureTest):
 
     @patch("atomium.structures.molecules.AtomicStructure.center_of_mass", new_callable=PropertyMock)
     def test_can_get_radius_of_gyration(self, mock_center):
         mock_center.return_value = (5, 0, 0)
-        self.atom1.distance_to.return_value = 5
-        self.atom2.distance_to.return_value = 5
-        self.atom1.x, self.atom1.y, self.atom1.z = 0, 0, 0
-        self.atom2.x, self.atom2.y, self.atom2.z = 10, 0, 0
+        self.atom1.location = (0, 0, 0)
+        self.atom2.location = (10, 0, 0)
+        self.atom1._arrays = self.atom2._arrays = None
         structure = AtomicStructure(self.atom1, self.atom2)
         self.assertEqual(structure.radius_of_gyration, 5)
-        self.atom1.distance_to.assert_called_with((5, 0, 0))
-        self.atom2.distance_to.assert_called_with((5, 0, 0))
 
 
 
@@ -691,7 +916,7 @@ class AtomicStructurePairingTests(AtomicStructureTest):
         self.structure2._atoms = set(self.other_atoms)
         for i, atom1, atom2 in zip(range(10), self.atoms, self.other_atoms):
             atom1.element = atom2.element = chr(i + 65)
-            atom1.bonds = atom2.bonds = []
+            atom1._bonds = atom2._bonds = []
 
 
     def test_pairing_needs_structure(self):
@@ -737,7 +962,7 @@ class AtomicStructurePairingTests(AtomicStructureTest):
         for i, atom1, atom2 in zip(range(10), self.atoms, self.other_atoms):
             atom1.element = atom2.element = elements[i]
             atom1.name = atom2.name = names[i]
-            atom1.bonds = atom2.bonds = [
+            atom1._bonds = atom2._bonds = [
              "bond" for _ in range(bond_counts[i])
             ]
         self.assertEqual(self.structure1.pairing_with(self.structure2), {
@@ -757,7 +982,7 @@ class AtomicStructurePairingTests(AtomicStructureTest):
         for i, atom1, atom2 in zip(range(10), self.atoms, self.other_atoms):
             atom1.element = atom2.element = elements[i]
             atom1.name = atom2.name = names[i]
-            atom1.bonds = atom2.bonds = [
+            atom1._bonds = atom2._bonds = [
              "bond" for _ in range(bond_counts[i])
             ]
             atom1.id = atom2.id = ids[i]
@@ -778,7 +1003,7 @@ class AtomicStructurePairingTests(AtomicStructureTest):
         for i, atom1, atom2 in zip(range(10), self.atoms, self.other_atoms):
             atom1.element = atom2.element = elements[i]
             atom1.name = atom2.name = names[i]
-            atom1.bonds = atom2.bonds = [
+            atom1._bonds = atom2._bonds = [
              "bond" for _ in range(bond_counts[i])
             ]
             atom1.id = atom2.id = ids[i]
@@ -790,82 +1015,331 @@ class AtomicStructurePairingTests(AtomicStructureTest):
 
 
 
+class AtomicStructureLabelPairingTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("C", 0, 0, 0, name="CA"), Atom("N", 1, 0, 0, name="N"),
+         Atom("O", 1, 2, 0, name="O"), Atom("C", 3, 3, 3, name="CB")
+        ]
+        self.others = [
+         Atom("O", 3, 6, 5, name="O"), Atom("C", 5, 5, 5, name="CA"),
+         Atom("N", 5, 6, 5, name="N")
+        ]
+        Residue(*self.atoms[:3], id="A1")
+        Residue(self.atoms[3], id="A2")
+        Residue(*self.others, id="A1")
+        self.structure = AtomicStructure(*self.atoms)
+        self.other = AtomicStructure(*self.others)
+
+
+    def test_can_pair_by_label(self):
+        self.assertEqual(self.structure.pairing_with(self.other, labels=True), {
+         self.atoms[0]: self.others[1], self.atoms[1]: self.others[2],
+         self.atoms[2]: self.others[0]
+        })
+
+
+    def test_labels_must_match_completely(self):
+        Residue(self.others[2], id="A2")
+        self.assertEqual(self.structure.pairing_with(self.other, labels=True), {
+         self.atoms[0]: self.others[1], self.atoms[2]: self.others[0]
+        })
+
+
+    def test_atoms_outside_residues_are_labelled_by_molecule(self):
+        def waters(ids):
+            atoms = []
+            for id_ in ids:
+                atom = Atom("O", 0, 0, 0, id=int(id_[1:]), name="O")
+                Molecule(atom, id=id_, name="HOH")
+                atoms.append(atom)
+            return atoms
+        atoms = waters(["A100", "A101", "A102", "A103"])
+        others = waters(["A100", "A102", "A103"])
+        structure = Model(*self.atoms, *atoms)
+        other = Model(*self.others, *others)
+        pairing = structure.pairing_with(other, labels=True)
+        self.assertEqual(len(pairing), 6)
+        for atom, partner in pairing.items():
+            self.assertEqual(atom.name, partner.name)
+            self.assertEqual(
+             (atom.residue or atom.molecule).id,
+             (partner.residue or partner.molecule).id
+            )
+        self.assertNotIn(atoms[1], pairing)
+
+
+    def test_pairing_is_redone_when_molecules_change(self):
+        atom, partner = Atom("O", 0, 0, 0, name="O"), Atom("O", 0, 0, 0, name="O")
+        structure, other = Model(atom), Model(partner)
+        self.assertEqual(structure.pairing_with(other, labels=True), {atom: partner})
+        Molecule(atom, id="A100")
+        self.assertEqual(structure.pairing_with(other, labels=True), {})
+        Molecule(partner, id="A100")
+        self.assertEqual(structure.pairing_with(other, labels=True), {atom: partner})
+
+
+    def test_atoms_sharing_labels_are_paired_in_order(self):
+        atoms = [Atom("C", 0, 0, 0, id=2), Atom("C", 0, 0, 0, id=1)]
+        others = [Atom("C", 0, 0, 0, id=1), Atom("C", 0, 0, 0, id=2)]
+        pairing = AtomicStructure(*atoms).pairing_with(
+         AtomicStructure(*others), labels=True
+        )
+        self.assertEqual(pairing, {atoms[0]: others[1], atoms[1]: others[0]})
+
+
+    def test_pairing_is_reused(self):
+        pairing = self.structure.pairing_with(self.other, labels=True)
+        with patch("atomium.structures.molecules._atom_label") as mock_label:
+            self.assertEqual(
+             self.structure.pairing_with(self.other, labels=True), pairing
+            )
+            self.assertFalse(mock_label.called)
+        pairing[self.atoms[3]] = None
+        self.assertNotIn(
+         self.atoms[3], self.structure.pairing_with(self.other, labels=True)
+        )
+
+
+    def test_pairing_is_redone_when_labels_change(self):
+        self.structure.pairing_with(self.other, labels=True)
+        self.others[0].name = "CB"
+        self.assertEqual(self.structure.pairing_with(self.other, labels=True), {
+         self.atoms[0]: self.others[1], self.atoms[1]: self.others[2]
+        })
+
+
+    def test_pairing_is_redone_when_bonds_change(self):
+        atoms = [Atom("C", 0, 0, 0), Atom("C", 0, 0, 0), Atom("O", 0, 0, 0)]
+        others = [Atom("C", 0, 0, 0), Atom("C", 0, 0, 0)]
+        structure = AtomicStructure(*atoms[:2])
+        other = AtomicStructure(*others)
+        low, high = sorted(atoms[:2], key=id)
+        other_low = min(others, key=id)
+        self.assertIs(structure.pairing_with(other)[low], other_low)
+        low.bond_to(atoms[2])
+        self.assertIs(structure.pairing_with(other)[high], other_low)
+
+
+    def test_remembered_pairings_dont_keep_structures_alive(self):
+        model = Model(*self.atoms[:3])
+        for _ in range(5):
+            other = Model(*[Atom(
+             atom.element, *atom.location, name=atom.name
+            ) for atom in self.atoms[:3]])
+            model.rmsd_with(other)
+        refs = [weakref.ref(other), weakref.ref(next(iter(other.atoms())))]
+        del other
+        gc.collect()
+        self.assertEqual([ref() for ref in refs], [None, None])
+        self.assertEqual(len(model._pairings), 0)
+
+
+    def test_can_get_rmsd_of_labelled_atoms(self):
+        self.assertAlmostEqual(
+         self.structure.rmsd_with(self.other, superimpose=True, labels=True), 0
+        )
+        with self.assertRaises(ValueError):
+            self.structure.rmsd_with(self.other)
+
+
+    def test_can_superimpose_by_labelled_atoms(self):
+        self.structure.superimpose_onto(self.other, labels=True)
+        self.assertEqual(
+         [atom.location for atom in self.atoms[:3]],
+         [self.others[1].location, self.others[2].location,
+          self.others[0].location]
+        )
+        self.assertNotEqual(self.atoms[3].location, (3, 3, 3))
+
+
+    def test_no_labels_in_common(self):
+        other = AtomicStructure(Atom("C", 0, 0, 0, name="XX"))
+        with self.assertRaises(ValueError):
+            self.structure.rmsd_with(other, labels=True)
+
+
+
 class AtomicStructureSuperimposingTests(AtomicStructureTest):
 
     @patch("atomium.structures.molecules.AtomicStructure.pairing_with")
     @patch("atomium.structures.molecules.AtomicStructure.center_of_mass", new_callable=PropertyMock)
-    @patch("atomium.structures.molecules.AtomicStructure.translate")
-    def test_can_superimpose(self, mock_tran, mock_cntr, mock_pair):
+    def test_can_superimpose(self, mock_cntr, mock_pair):
         m1, m2, m3 = Mock(), Mock(), Mock()
         mock_pair.return_value = {self.atom1: m1, self.atom2: m2, self.atom3: m3}
         other = Mock()
         other.center_of_mass = (10, 20, 30)
         mock_cntr.return_value = (1, 2, 3)
-        self.atom1.location, m1.x, m1.y, m1.z = (0.1, 0.2, 0.3), 0.6, 0.7, 0.8
-        self.atom2.location, m2.x, m2.y, m2.z = (0.2, 0.3, 0.4), 0.7, 0.8, 0.9
-        self.atom3.location, m3.x, m3.y, m3.z = (0.3, 0.4, 0.5), 0.8, 0.9, 1
+        self.atom1.location, m1.location = (1, 2, 3), (10, 20, 30)
+        self.atom2.location, m2.location = (2, 2, 3), (10, 21, 30)
+        self.atom3.location, m3.location = (0, 2, 3), (10, 19, 30)
+        for atom in self.atoms + [m1, m2, m3]: atom._arrays = None
         structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
         structure.superimpose_onto(other)
-        mock_tran.assert_any_call(-1, -2, -3)
-        mock_pair.assert_called_with(other)
-        self.assertAlmostEqual(self.atom1.move_to.call_args_list[0][0][0], -0.135, delta=0.005)
-        self.assertAlmostEqual(self.atom1.move_to.call_args_list[0][0][1], -0.208, delta=0.005)
-        self.assertAlmostEqual(self.atom1.move_to.call_args_list[0][0][2], -0.280, delta=0.005)
-        self.assertAlmostEqual(self.atom2.move_to.call_args_list[0][0][0], -0.138, delta=0.005)
-        self.assertAlmostEqual(self.atom2.move_to.call_args_list[0][0][1], -0.286, delta=0.005)
-        self.assertAlmostEqual(self.atom2.move_to.call_args_list[0][0][2], -0.434, delta=0.005)
-        self.assertAlmostEqual(self.atom3.move_to.call_args_list[0][0][0], -0.142, delta=0.005)
-        self.assertAlmostEqual(self.atom3.move_to.call_args_list[0][0][1], -0.365, delta=0.005)
-        self.assertAlmostEqual(self.atom3.move_to.call_args_list[0][0][2], -0.589, delta=0.005)
-        mock_tran.assert_any_call(10, 20, 30)
+        mock_pair.assert_called_with(other, labels=False)
+        self.assertEqual(
+         (self.atom1._x, self.atom1._y, self.atom1._z), (10, 20, 30)
+        )
+        self.assertEqual(
+         (self.atom2._x, self.atom2._y, self.atom2._z), (10, 21, 30)
+        )
+        self.assertEqual(
+         (self.atom3._x, self.atom3._y, self.atom3._z), (10, 19, 30)
+        )
 
 
 
 class AtomicStructureTestRmsdTests(AtomicStructureTest):
 
+    def setUp(self):
+        AtomicStructureTest.setUp(self)
+        self.other_atoms = [Mock(), Mock(), Mock()]
+        self.atom1.location = (0, 0, 0)
+        self.atom2.location = (1, 1, 1)
+        self.atom3.location = (2, 2, 2)
+        self.other_atoms[0].location = (3, 4, 0)
+        self.other_atoms[1].location = (1, 2, 1)
+        self.other_atoms[2].location = (2, 2, 1)
+        for atom in self.atoms + self.other_atoms: atom._arrays = None
+
+
     @patch("atomium.structures.molecules.AtomicStructure.pairing_with")
     def test_can_get_rmsd(self, mock_pair):
         structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
         other = Mock(AtomicStructure)
-        other_atoms = [Mock(), Mock(), Mock()]
-        self.atom1.distance_to.return_value = 5
-        self.atom2.distance_to.return_value = 1
-        self.atom3.distance_to.return_value = -1
-        mock_pair.return_value = {
-         self.atom1: other_atoms[0],
-         self.atom2: other_atoms[1],
-         self.atom3: other_atoms[2]
-        }
+        mock_pair.return_value = dict(zip(self.atoms, self.other_atoms))
         rmsd = structure.rmsd_with(other)
-        mock_pair.assert_called_with(other)
-        self.atom1.distance_to.assert_called_with(other_atoms[0])
-        self.atom2.distance_to.assert_called_with(other_atoms[1])
-        self.atom3.distance_to.assert_called_with(other_atoms[2])
+        mock_pair.assert_called_with(other, labels=False)
         self.assertEqual(rmsd, 3)
 
 
-    @patch("atomium.structures.molecules.AtomicStructure.pairing_with")
     @patch("atomium.structures.molecules.AtomicStructure.superimpose_onto")
-    def test_can_get_rmsd_after_superposition(self, mock_onto, mock_pair):
-        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
-        other = Mock(AtomicStructure)
-        other_atoms = [Mock(), Mock(), Mock()]
-        self.atom1.distance_to.return_value = 5
-        self.atom2.distance_to.return_value = 1
-        self.atom3.distance_to.return_value = -1
-        self.atom1.location = (1, 2, 3)
-        self.atom2.location = (4, 5, 6)
-        self.atom3.location = (7, 8, 9)
-        mock_pair.return_value = {
-         self.atom1: other_atoms[0],
-         self.atom2: other_atoms[1],
-         self.atom3: other_atoms[2]
-        }
+    def test_can_get_rmsd_after_superposition(self, mock_onto):
+        atoms = [Atom("C", 0, 0, 0), Atom("N", 1, 0, 0), Atom("O", 1, 2, 0)]
+        others = [Atom("C", 5, 5, 5), Atom("N", 5, 6, 5), Atom("O", 3, 6, 5)]
+        structure, other = AtomicStructure(*atoms), AtomicStructure(*others)
+        self.assertAlmostEqual(structure.rmsd_with(other, superimpose=True), 0)
+        others[2].move_to(3, 6, 6)
         rmsd = structure.rmsd_with(other, superimpose=True)
-        mock_onto.assert_called_with(other)
-        self.atom1.move_to.assert_called_with(1, 2, 3)
-        self.atom2.move_to.assert_called_with(4, 5, 6)
-        self.atom3.move_to.assert_called_with(7, 8, 9)
+        self.assertGreater(rmsd, 0)
+        self.assertLess(rmsd, structure.rmsd_with(other))
+        self.assertFalse(mock_onto.called)
+        self.assertEqual(
+         [atom.location for atom in atoms], [(0, 0, 0), (1, 0, 0), (1, 2, 0)]
+        )
+
+
+
+class RmsdMatrixTests(TestCase):
+
+    def setUp(self):
+        self.structures = [AtomicStructure(
+         Atom("C", 0, 0, 0), Atom("N", 1, 0, 0), Atom("O", 1, 2, 0)
+        ), AtomicStructure(
+         Atom("O", 3, 6, 5), Atom("C", 5, 5, 5), Atom("N", 5, 6, 5)
+        ), AtomicStructure(
+         Atom("N", 1, 0, 1), Atom("O", 1, 2, 2), Atom("C", 0, 0, 0)
+        )]
+
+
+    def test_can_get_rmsd_matrix(self):
+        for superimpose in (True, False):
+            matrix = rmsd_matrix(self.structures, superimpose=superimpose)
+            self.assertEqual(matrix.shape, (3, 3))
+            for i, s1 in enumerate(self.structures):
+                for j, s2 in enumerate(self.structures):
+                    self.assertAlmostEqual(
+                     matrix[i, j], s1.rmsd_with(s2, superimpose=superimpose)
+                    )
+
+
+    def test_rmsd_matrix_does_not_move_atoms(self):
+        locations = [
+         atom.location for s in self.structures for atom in s.atoms()
+        ]
+        rmsd_matrix(self.structures)
+        self.assertEqual(
+         [atom.location for s in self.structures for atom in s.atoms()],
+         locations
+        )
+
+
+    def test_can_get_rmsd_matrix_of_labelled_atoms(self):
+        for structure in self.structures: Residue(*structure.atoms(), id="A1")
+        extra = Atom("S", 9, 9, 9, name="S")
+        Residue(extra, id="A2")
+        self.structures[1].add_atom(extra)
+        matrix = rmsd_matrix(self.structures, labels=True)
+        self.structures[1].remove_atom(extra)
+        self.assertTrue(np.allclose(matrix, rmsd_matrix(self.structures)))
+
+
+    def test_can_get_empty_rmsd_matrix(self):
+        self.assertEqual(rmsd_matrix([]).shape, (0, 0))
+
+
+    def test_rmsd_matrix_needs_matching_structures(self):
+        with self.assertRaises(TypeError):
+            rmsd_matrix(["structure"])
+        with self.assertRaises(ValueError):
+            rmsd_matrix([
+             self.structures[0], AtomicStructure(Atom("C", 0, 0, 0))
+            ])
+
+
+
+class EnsembleTests(TestCase):
+
+    def setUp(self):
+        self.structures = [AtomicStructure(
+         Atom("C", x, 0, 0, id=1), Atom("N", x + 1, 0, 0, id=2),
+         Atom("O", x + 1, y, 0, id=3)
+        ) for x, y in ((0, 1), (2, 1), (4, 4))]
+
+
+    def test_can_get_rmsf(self):
+        fluctuations = rmsf(self.structures[:2], superimpose=False)
+        self.assertEqual(fluctuations, {1: 1, 2: 1, 3: 1})
+        fluctuations = rmsf(self.structures[:2])
+        for value in fluctuations.values(): self.assertAlmostEqual(value, 0)
+
+
+    def test_can_get_rmsf_after_superposition(self):
+        fluctuations = rmsf(self.structures)
+        moving = [AtomicStructure(
+         *[atom.copy() for atom in structure.atoms()]
+        ) for structure in self.structures]
+        for structure in moving[1:]: structure.superimpose_onto(moving[0])
+        for id_ in (1, 2, 3):
+            locations = np.array([s.atom(id_).location for s in moving])
+            self.assertAlmostEqual(fluctuations[id_], math.sqrt(
+             ((locations - locations.mean(axis=0)) ** 2).sum(axis=1).mean()
+            ))
+
+
+    def test_can_get_mean_structure(self):
+        mean = mean_structure(self.structures, superimpose=False)
+        self.assertIsInstance(mean, AtomicStructure)
+        self.assertEqual(len(mean.atoms()), 3)
+        self.assertFalse(mean.atoms() & self.structures[0].atoms())
+        self.assertEqual(mean.atom(1).location, (2, 0, 0))
+        self.assertEqual(mean.atom(3).location, (3, 2, 0))
+        self.assertEqual(self.structures[0].atom(1).location, (0, 0, 0))
+
+
+    def test_mean_structure_is_in_first_structures_frame(self):
+        mean = mean_structure(self.structures[:2])
+        for id_ in (1, 2, 3):
+            for a, b in zip(
+             mean.atom(id_).location, self.structures[0].atom(id_).location
+            ):
+                self.assertAlmostEqual(a, b)
+
+
+    def test_empty_ensembles(self):
+        self.assertEqual(rmsf([]), {})
+        self.assertIsNone(mean_structure([]))
 
 
 
@@ -893,6 +1367,7 @@ class AtomicStructureGridTests(AtomicStructureTest):
         self.atom1.location = (1, 1.1, 3)
         self.atom2.location = (-1, -2, -3)
         self.atom3.location = (1.5, -2.4, 1)
+        for atom in self.atoms: atom._arrays = None
 
 
     def test_can_get_grid(self):
@@ -918,6 +1393,61 @@ class AtomicStructureGridTests(AtomicStructureTest):
          for y in range(-8, 8) for z in range(-8, 9)])
 
 
+    def test_grid_values_keep_type_of_size(self):
+        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
+        self.assertIsInstance(next(structure.grid())[0], int)
+        self.assertIsInstance(next(structure.grid(size=0.5))[0], float)
+
+
+    def test_can_get_grid_points(self):
+        structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
+        points = structure.grid_points(size=0.5, margin=1)
+        self.assertIsInstance(points, np.ndarray)
+        self.assertEqual(
+         points.tolist(), [list(point) for point in structure.grid(0.5, 1)]
+        )
+
+
+    def test_grid_always_includes_origin(self):
+        structure = AtomicStructure(Atom("C", 5, 5, 5))
+        self.assertEqual(structure.grid_points().tolist(), [
+         [x, y, z] for x in range(6) for y in range(6) for z in range(6)
+        ])
+
+
+
+class AtomicStructureVoxelTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [Atom("C", 0, 0, 0), Atom("C", 2, 0, 0)]
+        self.structure = AtomicStructure(*self.atoms)
+
+
+    def test_can_voxelize_structure(self):
+        axes, voxels = self.structure.voxelize()
+        self.assertEqual([axis.tolist() for axis in axes], [
+         [-1, 0, 1, 2, 3], [-1, 0, 1], [-1, 0, 1]
+        ])
+        self.assertEqual(voxels.dtype, bool)
+        expected = np.zeros((5, 3, 3), dtype=bool)
+        points = self.structure.grid_points(margin=1).reshape(5, 3, 3, 3)
+        for atom in self.atoms:
+            expected |= np.sqrt(
+             ((points - atom.location) ** 2).sum(axis=3)
+            ) <= 1
+        self.assertEqual(voxels.tolist(), expected.tolist())
+
+
+    def test_can_get_voxel_density(self):
+        axes, voxels = self.structure.voxelize(
+         size=0.5, radius=1.5, margin=0, density=True
+        )
+        self.assertEqual(voxels.shape, (5, 1, 1))
+        self.assertEqual(voxels[:, 0, 0].tolist(), [1, 2, 2, 2, 1])
+        axes, voxels = self.structure.voxelize(radius=1, density=True)
+        self.assertEqual(voxels[:, 1, 1].tolist(), [1, 1, 2, 1, 1])
+
+
 
 class AtomSphereTests(AtomicStructureTest):
 
@@ -947,12 +1477,67 @@ class AtomSphereTests(AtomicStructureTest):
 
 
     def test_can_get_atoms_in_sphere(self):
+        self.atom1.location = (1, 2, 8)
+        self.atom2.location = (1, 12, 3)
+        self.atom3.location = (16, 2, 3)
+        for atom in self.atoms: atom._arrays = None
         structure = AtomicStructure(self.atom1, self.atom2, self.atom3)
         atoms = structure.atoms_in_sphere(1, 2, 3, 10)
         self.assertEqual(atoms, {self.atom1, self.atom2})
-        self.atom1.distance_to.assert_called_with((1, 2, 3))
-        self.atom2.distance_to.assert_called_with((1, 2, 3))
-        self.atom3.distance_to.assert_called_with((1, 2, 3))
+
+
+    @patch("atomium.structures.models.CellList.query_sphere")
+    def test_models_use_spatial_index(self, mock_query):
+        atoms = [Atom("C", 0, 0, 0), Atom("C", 1, 0, 0), Atom("C", 9, 0, 0)]
+        model = Model(*atoms)
+        mock_query.return_value = np.array([0, 1])
+        self.assertEqual(model.atoms_in_sphere(1, 2, 3, 10), {
+         model.arrays.atoms[0], model.arrays.atoms[1]
+        })
+        mock_query.assert_called_with((1, 2, 3), 10)
+
+
+
+class AtomicStructureDistanceMatrixTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [Atom("C", 0, 0, 0), Atom("C", 3, 4, 0), Atom("N", 0, 0, 1)]
+        self.structure = AtomicStructure(*self.atoms)
+
+
+    def test_can_get_distance_matrix(self):
+        rows, columns, matrix = self.structure.distance_matrix()
+        self.assertEqual(set(rows), set(self.atoms))
+        self.assertEqual(rows, columns)
+        self.assertEqual(matrix.dtype, np.float32)
+        for i, atom1 in enumerate(rows):
+            for j, atom2 in enumerate(columns):
+                self.assertAlmostEqual(
+                 matrix[i, j], atom1.distance_to(atom2), delta=0.00001
+                )
+
+
+    def test_can_get_cross_distance_matrix(self):
+        other = Model(Atom("O", 0, 0, 10))
+        rows, columns, matrix = self.structure.distance_matrix(
+         other, dtype=float, block_size=1
+        )
+        self.assertEqual(columns, list(other.atoms()))
+        self.assertEqual(matrix.shape, (3, 1))
+        self.assertEqual(
+         sorted(matrix[:, 0].tolist()), [9, 10, math.sqrt(125)]
+        )
+
+
+    def test_can_write_distance_matrix_to_file(self):
+        import os, tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "matrix.npy")
+            rows, columns, matrix = self.structure.distance_matrix(path=path)
+            self.assertIsInstance(matrix, np.memmap)
+            saved = np.load(path)
+            self.assertEqual(saved.tolist(), matrix.tolist())
+            del matrix
 
 
 
@@ -1011,3 +1596,35 @@ class AtomicStructureSavingTests(AtomicStructureTest):
         structure.save("path/to/file.dfghdfg", "a description")
         mock_string.assert_called_with("dfghdfg", "a description")
         mock_save.assert_called_with("filestring", "path/to/file.dfghdfg")
+
+
+    @patch("builtins.open")
+    @patch("atomium.files.pdb2pdbfile.structure_to_pdb_file")
+    @patch("atomium.structures.molecules.AtomicStructure.to_file_string")
+    def test_pdb_files_are_written_directly(self, mock_string, mock_write, mock_open):
+        structure = AtomicStructure(*self.atoms)
+        f = mock_open.return_value.__enter__.return_value
+        structure.save("path/to/file.PDB", description="a description")
+        mock_open.assert_called_with("path/to/file.PDB", "w")
+        mock_write.assert_called_with(structure, f, description="a description")
+        self.assertFalse(mock_string.called)
+
+
+    @patch("atomium.files.utilities.open_file")
+    @patch("atomium.files.pdb2pdbfile.structure_to_pdb_file")
+    def test_compressed_pdb_files_are_written_directly(self, mock_write, mock_open):
+        structure = AtomicStructure(*self.atoms)
+        f = mock_open.return_value.__enter__.return_value
+        structure.save("path/to/file.pdb.gz")
+        mock_open.assert_called_with("path/to/file.pdb.gz", "w")
+        mock_write.assert_called_with(structure, f)
+
+
+    @patch("atomium.structures.molecules.AtomicStructure.to_file_string")
+    @patch("atomium.files.utilities.string_to_file")
+    def test_compression_extension_is_ignored_for_format(self, mock_save, mock_string):
+        mock_string.return_value = "filestring"
+        structure = AtomicStructure(*self.atoms)
+        structure.save("path/to/file.xyz.BZ2", "a description")
+        mock_string.assert_called_with("xyz", "a description")
+        mock_save.assert_called_with("filestring", "path/to/file.xyz.BZ2")
@@ -1,7 +1,10 @@
 import math
 from unittest import TestCase
 from unittest.mock import patch, Mock, PropertyMock
-from atomium.structures.atoms import Atom, Bond, atom_query
+from atomium.structures.atoms import Atom, Bond, atom_query, METALS
+from atomium.structures.atoms import compile_atom_query
+from atomium.structures.arrays import AtomArrays, element_code
+from atomium.structures.views import SetView
 
 class AtomCreationTests(TestCase):
 
@@ -118,6 +121,15 @@ class AtomElementTests(TestCase):
         self.assertEqual(atom._element, "N")
 
 
+    def test_upper_case_element_is_kept(self):
+        atom = Atom("Fe", 2, 3, 5)
+        self.assertEqual(atom._upper_element, "FE")
+        atom.element = "zn"
+        self.assertEqual(atom._upper_element, "ZN")
+        atom._element = "h"
+        self.assertEqual(atom._upper_element, "H")
+
+
     def test_atom_element_must_be_str(self):
         atom = Atom("C", 2, 3, 5)
         with self.assertRaises(TypeError):
@@ -268,6 +280,47 @@ class AtomLocationTests(TestCase):
 
 
 
+class AtomArrayStorageTests(TestCase):
+
+    def setUp(self):
+        self.atom = Atom("C", 20, 30, 50, bfactor=1.5, charge=-1)
+        self.arrays = AtomArrays()
+        self.arrays.add(self.atom)
+
+
+    def test_atom_coordinates_are_read_from_arrays(self):
+        self.assertEqual(self.atom.location, (20, 30, 50))
+        self.arrays.coordinates[0] = (1, 2, 3)
+        self.assertEqual(self.atom.location, (1, 2, 3))
+        self.assertEqual((self.atom.x, self.atom.y, self.atom.z), (1, 2, 3))
+
+
+    def test_atom_coordinates_are_written_to_arrays(self):
+        self.atom.x = 4
+        self.atom.translate(1, 1, 1)
+        self.assertEqual(self.arrays.coordinates.tolist(), [[5, 31, 51]])
+
+
+    def test_atom_values_are_mirrored_in_arrays(self):
+        self.atom.bfactor = 2.5
+        self.atom.charge = 1
+        self.atom.element = "N"
+        self.assertEqual(self.arrays.bfactors.tolist(), [2.5])
+        self.assertEqual(self.arrays.charges.tolist(), [1])
+        self.assertEqual(self.arrays.elements.tolist(), [element_code("N")])
+        self.assertEqual(self.atom.charge, 1)
+
+
+    def test_atom_keeps_coordinates_when_removed(self):
+        self.atom.move_to(1, 2, 3)
+        self.arrays.remove(self.atom)
+        self.assertIsNone(self.atom._arrays)
+        self.assertEqual(self.atom.location, (1, 2, 3))
+        self.atom.x = 10
+        self.assertEqual(self.atom.location, (10, 2, 3))
+
+
+
 class AtomRoundingTests(TestCase):
 
     def test_can_round_atom_location(self):
@@ -558,6 +611,8 @@ class AtomBondsTests(TestCase):
         atom._bonds = set(("bond1", "bond2"))
         self.assertEqual(atom.bonds, atom._bonds)
         self.assertIsNot(atom.bonds, atom._bonds)
+        self.assertIsInstance(atom.bonds, SetView)
+        self.assertIs(atom.bonds._items, atom._bonds)
 
 
 
@@ -587,11 +642,12 @@ class AtomBondingTests(TestCase):
 
 
     @patch("atomium.structures.atoms.Bond")
-    @patch("atomium.structures.atoms.Atom.bonded_atoms")
-    def test_cant_make_second_bond(self, mock_atoms, mock_bond):
+    def test_cant_make_second_bond(self, mock_bond):
         atom1 = Atom("C", 2, 3, 5)
         atom2 = Mock(Atom)
-        mock_atoms.return_value = set([atom2])
+        bond = Mock(Bond)
+        bond._atoms = set([atom1, atom2])
+        atom1._bonds = set([bond])
         atom1.bond_to(atom2)
         self.assertFalse(mock_bond.called)
 
@@ -763,3 +819,50 @@ class AtomSelectorTests(TestCase):
         self.assertEqual(
          self.func(1, 2, hydrogen=False, element="C", c=3), set(self.atoms[:2])
         )
+
+
+    def test_metals_are_frozenset(self):
+        self.assertIsInstance(METALS, frozenset)
+        self.assertIn("ZN", METALS)
+
+
+
+class AtomQueryCompilationTests(TestCase):
+
+    def setUp(self):
+        self.atom = Atom("Zn", 2, 3, 5, name="ZN", id=19)
+        self.atom._residue = "R"
+
+
+    def test_no_criteria_gives_no_function(self):
+        self.assertIsNone(compile_atom_query())
+        self.assertIsNone(compile_atom_query(hydrogen=True, het=True))
+
+
+    def test_single_criterion(self):
+        self.assertTrue(compile_atom_query(id=19)(self.atom))
+        self.assertFalse(compile_atom_query(id=20)(self.atom))
+
+
+    def test_element_criterion_ignores_case(self):
+        self.assertTrue(compile_atom_query(element="zN")(self.atom))
+        self.assertFalse(compile_atom_query(element="C")(self.atom))
+
+
+    def test_multiple_criteria(self):
+        self.assertTrue(compile_atom_query(
+         name="ZN", element="ZN", hydrogen=False, het=False
+        )(self.atom))
+        self.assertFalse(compile_atom_query(
+         name="ZN", element="ZN", metal=False
+        )(self.atom))
+
+
+    def test_residue_name_criterion(self):
+        residue = Mock()
+        residue._name = "ALA"
+        self.atom._residue = residue
+        self.assertTrue(compile_atom_query(residue_name="ALA")(self.atom))
+        self.assertFalse(compile_atom_query(residue_name="GLY")(self.atom))
+        self.atom._residue = None
+        self.assertFalse(compile_atom_query(residue_name="ALA")(self.atom))
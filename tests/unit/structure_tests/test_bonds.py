@@ -1,6 +1,7 @@
 from unittest import TestCase
 from unittest.mock import Mock, patch
 from atomium.structures.atoms import Bond, Atom
+from atomium.structures.views import SetView
 
 class BondTest(TestCase):
 
@@ -10,6 +11,7 @@ class BondTest(TestCase):
         self.atom1.element = "C"
         self.atom2.element = "N"
         self.atom1._bonds, self.atom2._bonds = set(), set()
+        self.atom1._arrays, self.atom2._arrays = None, None
         self.atoms = set([self.atom1, self.atom2])
 
 
@@ -39,6 +41,12 @@ class BondCreationTests(BondTest):
         self.assertEqual(self.atom2._bonds, set([bond]))
 
 
+    def test_creating_bonds_updates_version(self):
+        version = Bond._version
+        Bond(self.atom1, self.atom2)
+        self.assertEqual(Bond._version, version + 1)
+
+
 
 class BondReprTests(BondTest):
 
@@ -54,6 +62,8 @@ class BondAtomsTests(BondTest):
         bond = Bond(self.atom1, self.atom2)
         self.assertEqual(bond.atoms(), bond._atoms)
         self.assertIsNot(bond.atoms(), bond._atoms)
+        self.assertIsInstance(bond.atoms(), SetView)
+        self.assertIs(bond.atoms()._items, bond._atoms)
 
 
 
@@ -74,6 +84,8 @@ class BondDestructionTests(BondTest):
         bond = Bond(self.atom1, self.atom2)
         self.assertEqual(self.atom1._bonds, set([bond, "some bond"]))
         self.assertEqual(self.atom2._bonds, set([bond]))
+        version = Bond._version
         bond.destroy()
         self.assertEqual(self.atom1._bonds, set(["some bond"]))
         self.assertEqual(self.atom2._bonds, set())
+        self.assertEqual(Bond._version, version + 1)
@@ -12,14 +12,17 @@ class ChainTest(TestCase):
         self.residue1, self.residue2 = Mock(Residue), Mock(Residue)
         self.patch1 = patch("atomium.structures.chains.ResidueSequence.verify")
         self.mock_verify = self.patch1.start()
+        self.addCleanup(self.patch1.stop)
         self.mock_verify.return_value = True
         self.patch2 = patch("atomium.structures.chains.ResidueSequence.residues")
         self.mock_residues = self.patch2.start()
+        self.addCleanup(self.patch2.stop)
         self.mock_residues.return_value = (self.residue1, self.residue2)
         def mock_init(obj, *args, **kwargs):
             obj._atoms = set(args)
         self.patch3 = patch("atomium.structures.molecules.Molecule.__init__")
         self.mock_init = self.patch3.start()
+        self.addCleanup(self.patch3.stop)
         self.mock_init.side_effect = mock_init
 
 
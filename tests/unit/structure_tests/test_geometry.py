@@ -0,0 +1,305 @@
+import math
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from atomium.structures.geometry import rotation_matrix, quaternion_matrix
+from atomium.structures.geometry import matrix_about_point
+from atomium.structures.geometry import transform_coordinates, distance_matrix
+from atomium.structures.geometry import grid_axes, grid_points, voxelize
+from atomium.structures.geometry import kabsch_matrix, superimpose, rmsd
+from atomium.structures.geometry import pairwise_rmsd
+
+class RotationMatrixTests(TestCase):
+
+    def test_can_get_rotation_matrix_for_named_axis(self):
+        matrix = rotation_matrix(math.pi / 2, "z")
+        self.assertTrue(np.allclose(matrix, [[0, -1, 0], [1, 0, 0], [0, 0, 1]]))
+
+
+    def test_can_get_rotation_matrix_for_vector_axis(self):
+        self.assertTrue(np.allclose(
+         rotation_matrix(0.3, (0, 0, 5)), rotation_matrix(0.3, "z")
+        ))
+        matrix = rotation_matrix(math.pi * 2 / 3, (1, 1, 1))
+        self.assertTrue(np.allclose(matrix.dot([1, 0, 0]), [0, 1, 0]))
+
+
+    def test_axis_must_be_valid(self):
+        with self.assertRaises(ValueError):
+            rotation_matrix(1, "s")
+        with self.assertRaises(ValueError):
+            rotation_matrix(1, (0, 0, 0))
+        with self.assertRaises(ValueError):
+            rotation_matrix(1, (1, 0))
+
+
+
+class QuaternionMatrixTests(TestCase):
+
+    def test_identity_quaternion(self):
+        self.assertTrue(np.allclose(quaternion_matrix((1, 0, 0, 0)), np.identity(3)))
+
+
+    def test_quaternion_matches_axis_angle(self):
+        angle = 0.7
+        axis = np.array([1, 2, 3]) / math.sqrt(14)
+        quaternion = [math.cos(angle / 2), *(axis * math.sin(angle / 2))]
+        self.assertTrue(np.allclose(
+         quaternion_matrix(quaternion), rotation_matrix(angle, axis)
+        ))
+
+
+    def test_quaternion_is_normalised(self):
+        self.assertTrue(np.allclose(
+         quaternion_matrix((2, 0, 0, 2)), quaternion_matrix((1, 0, 0, 1))
+        ))
+
+
+    def test_quaternion_must_be_valid(self):
+        with self.assertRaises(ValueError):
+            quaternion_matrix((0, 0, 0, 0))
+        with self.assertRaises(ValueError):
+            quaternion_matrix((1, 0, 0))
+
+
+
+class MatrixAboutPointTests(TestCase):
+
+    def test_can_move_matrix_to_point(self):
+        matrix = matrix_about_point(rotation_matrix(math.pi, "z"), (1, 1, 0))
+        self.assertEqual(matrix.shape, (4, 4))
+        self.assertTrue(np.allclose(
+         transform_coordinates(np.array([[1, 1, 0], [2, 1, 0]]), matrix),
+         [[1, 1, 0], [0, 1, 0]]
+        ))
+
+
+
+class CoordinateTransformationTests(TestCase):
+
+    def test_can_apply_linear_matrix(self):
+        coordinates = np.array([[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(transform_coordinates(
+         coordinates, np.identity(3) * 2
+        ).tolist(), [[2, 4, 6], [8, 10, 12]])
+
+
+    def test_can_apply_affine_matrix(self):
+        coordinates = np.array([[1, 2, 3], [4, 5, 6]])
+        matrix = np.identity(4)
+        matrix[:3, 3] = (1, -1, 0)
+        self.assertEqual(transform_coordinates(
+         coordinates, matrix
+        ).tolist(), [[2, 1, 3], [5, 4, 6]])
+
+
+    def test_matrix_must_be_valid_shape(self):
+        with self.assertRaises(ValueError):
+            transform_coordinates(np.zeros((1, 3)), np.identity(2))
+
+
+
+class SuperpositionTests(TestCase):
+
+    def setUp(self):
+        self.coordinates = np.random.RandomState(6).uniform(-10, 10, (8, 3))
+        self.matrix = rotation_matrix(1.2, (1, -2, 0.5))
+        self.moved = transform_coordinates(self.coordinates, self.matrix) + 4
+
+
+    def test_can_find_kabsch_matrix(self):
+        P = self.coordinates - self.coordinates.mean(axis=0)
+        Q = self.moved - self.moved.mean(axis=0)
+        self.assertTrue(np.allclose(kabsch_matrix(P, Q), self.matrix))
+
+
+    def test_kabsch_matrix_is_never_a_reflection(self):
+        P = self.coordinates - self.coordinates.mean(axis=0)
+        matrix = kabsch_matrix(P, P * [1, 1, -1])
+        self.assertAlmostEqual(np.linalg.det(matrix), 1)
+
+
+    def test_can_superimpose_coordinates(self):
+        original = self.coordinates.copy()
+        superimposed = superimpose(self.coordinates, self.moved)
+        self.assertTrue(np.allclose(superimposed, self.moved))
+        self.assertTrue((self.coordinates == original).all())
+
+
+    def test_can_superimpose_about_given_centres(self):
+        superimposed = superimpose(
+         self.coordinates, self.moved, self.coordinates[0], self.moved[0]
+        )
+        self.assertTrue(np.allclose(superimposed, self.moved))
+
+
+    def test_can_superimpose_stacks(self):
+        stack = np.stack([self.coordinates, self.moved])
+        superimposed = superimpose(stack, stack[::-1])
+        self.assertTrue(np.allclose(superimposed, stack[::-1]))
+
+
+    def test_can_get_rmsd(self):
+        self.assertAlmostEqual(
+         rmsd([[0, 0, 0], [1, 1, 1]], [[3, 4, 0], [1, 1, 1]]), math.sqrt(12.5)
+        )
+        self.assertEqual(rmsd(np.zeros((2, 4, 3)), np.ones((2, 4, 3))).tolist(), [
+         math.sqrt(3), math.sqrt(3)
+        ])
+
+
+
+class PairwiseRmsdTests(TestCase):
+
+    def setUp(self):
+        self.coordinates = np.random.RandomState(7).uniform(-10, 10, (5, 6, 3))
+
+
+    def brute_force(self, superimposing):
+        return np.array([[rmsd(
+         superimpose(c1, c2) if superimposing else c1, c2
+        ) for c2 in self.coordinates] for c1 in self.coordinates])
+
+
+    def test_can_get_rmsd_matrix(self):
+        matrix = pairwise_rmsd(self.coordinates, superimpose=False)
+        self.assertTrue(np.allclose(matrix, self.brute_force(False)))
+        self.assertEqual(matrix.diagonal().tolist(), [0] * 5)
+
+
+    def test_can_get_superimposed_rmsd_matrix(self):
+        matrix = pairwise_rmsd(self.coordinates)
+        self.assertTrue(np.allclose(matrix, self.brute_force(True)))
+        self.assertTrue((matrix == matrix.T).all())
+
+
+    def test_can_use_given_centres(self):
+        centres = self.coordinates[:, 0]
+        matrix = pairwise_rmsd(self.coordinates, centres=centres)
+        self.assertAlmostEqual(matrix[0, 1], rmsd(superimpose(
+         self.coordinates[1], self.coordinates[0], centres[1], centres[0]
+        ), self.coordinates[0]))
+
+
+    def test_can_use_processes(self):
+        self.assertTrue(np.allclose(
+         pairwise_rmsd(self.coordinates, processes=2),
+         pairwise_rmsd(self.coordinates)
+        ))
+
+
+    def test_can_use_chunks(self):
+        for chunk_size in (1, 2, 10):
+            self.assertTrue(np.allclose(
+             pairwise_rmsd(self.coordinates, chunk_size=chunk_size),
+             self.brute_force(True)
+            ))
+
+
+    def test_can_use_memory_mapped_coordinates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frames.npy")
+            np.save(path, self.coordinates)
+            frames = np.load(path, mmap_mode="r")
+            for processes in (None, 2):
+                self.assertTrue(np.allclose(pairwise_rmsd(
+                 frames, processes=processes, chunk_size=2
+                ), self.brute_force(True)))
+            del frames
+
+
+
+class DistanceMatrixTests(TestCase):
+
+    def setUp(self):
+        self.coordinates = np.random.RandomState(3).uniform(-10, 10, (7, 3))
+        self.other = np.random.RandomState(4).uniform(-10, 10, (5, 3))
+
+
+    def brute_force(self, first, second):
+        return np.array([[
+         math.sqrt(sum((a - b) ** 2 for a, b in zip(p1, p2))) for p2 in second
+        ] for p1 in first])
+
+
+    def test_can_get_self_distance_matrix(self):
+        for block_size in (1, 3, 100):
+            matrix = distance_matrix(self.coordinates, block_size=block_size)
+            self.assertEqual(matrix.dtype, np.float32)
+            self.assertTrue(np.allclose(
+             matrix, self.brute_force(self.coordinates, self.coordinates),
+             atol=1e-5
+            ))
+            self.assertTrue((matrix == matrix.T).all())
+
+
+    def test_can_get_cross_distance_matrix(self):
+        for block_size in (2, 100):
+            matrix = distance_matrix(
+             self.coordinates, self.other, dtype=float, block_size=block_size
+            )
+            self.assertEqual(matrix.shape, (7, 5))
+            self.assertTrue(np.allclose(
+             matrix, self.brute_force(self.coordinates, self.other)
+            ))
+
+
+    def test_can_write_into_existing_array(self):
+        out = np.zeros((7, 5))
+        matrix = distance_matrix(self.coordinates, self.other, out=out)
+        self.assertIs(matrix, out)
+        self.assertTrue(out.any())
+
+
+    def test_output_must_be_right_shape(self):
+        with self.assertRaises(ValueError):
+            distance_matrix(self.coordinates, self.other, out=np.zeros((5, 7)))
+
+
+    def test_block_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            distance_matrix(self.coordinates, block_size=0)
+
+
+
+class GridTests(TestCase):
+
+    def test_can_get_grid_axes(self):
+        axes = grid_axes(np.array([[1, 1.1, 3], [-1, -2, -3]]), size=2, margin=1)
+        self.assertEqual([axis.tolist() for axis in axes], [
+         [-2, 0, 2], [-4, -2, 0, 2, 4], [-4, -2, 0, 2, 4]
+        ])
+
+
+    def test_can_get_grid_points(self):
+        points = grid_points((np.array([0, 1]), np.array([5]), np.array([7, 8])))
+        self.assertEqual(points.tolist(), [
+         [0, 5, 7], [0, 5, 8], [1, 5, 7], [1, 5, 8]
+        ])
+
+
+
+class VoxelizationTests(TestCase):
+
+    def test_voxels_match_brute_force(self):
+        coordinates = np.random.RandomState(5).uniform(-5, 5, (30, 3))
+        axes = grid_axes(coordinates, 0.7, 2)
+        points = grid_points(axes)
+        distances = np.sqrt(
+         ((points[:, None] - coordinates[None]) ** 2).sum(axis=2)
+        )
+        shape = tuple(len(axis) for axis in axes)
+        voxels = voxelize(coordinates, axes, 0.7, 1.6)
+        self.assertEqual(
+         voxels.tolist(), (distances <= 1.6).any(axis=1).reshape(shape).tolist()
+        )
+        density = voxelize(coordinates, axes, 0.7, 1.6, density=True)
+        self.assertEqual(
+         density.tolist(), (distances <= 1.6).sum(axis=1).reshape(shape).tolist()
+        )
+
+
+    def test_can_voxelize_nothing(self):
+        axes = (np.arange(3), np.arange(2), np.arange(1))
+        self.assertEqual(voxelize(np.zeros((0, 3)), axes, 1, 1).shape, (3, 2, 1))
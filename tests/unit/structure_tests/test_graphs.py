@@ -0,0 +1,84 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from atomium.structures.atoms import Atom
+from atomium.structures.graphs import BondGraph
+
+class BondGraphTest(TestCase):
+
+    def setUp(self):
+        self.atoms = [Mock(Atom) for _ in range(6)]
+        self.graph = BondGraph(self.atoms, [(0, 1), (2, 1), (1, 3), (4, 5)])
+
+
+
+class BondGraphCreationTests(BondGraphTest):
+
+    def test_can_create_bond_graph(self):
+        self.assertEqual(self.graph._atoms, tuple(self.atoms))
+        self.assertEqual(self.graph.indptr.tolist(), [0, 1, 4, 5, 6, 7, 8])
+        self.assertEqual(self.graph.indices.tolist(), [1, 0, 2, 3, 1, 1, 5, 4])
+
+
+    def test_can_create_empty_graph(self):
+        graph = BondGraph(self.atoms, [])
+        self.assertEqual(graph.indptr.tolist(), [0] * 7)
+        self.assertEqual(graph.indices.tolist(), [])
+        self.assertEqual(graph.bond_count, 0)
+
+
+    def test_pairs_must_be_in_graph(self):
+        with self.assertRaises(ValueError):
+            BondGraph(self.atoms, [(0, 6)])
+        with self.assertRaises(ValueError):
+            BondGraph(self.atoms, [(-1, 2)])
+
+
+    def test_can_create_graph_from_atoms(self):
+        atoms = [Atom("C"), Atom("C"), Atom("O"), Atom("N")]
+        atoms[0].bond_to(atoms[1])
+        atoms[1].bond_to(atoms[2])
+        atoms[2].bond_to(atoms[3])
+        graph = BondGraph.from_atoms(atoms[:3])
+        self.assertEqual(graph.atoms, tuple(atoms[:3]))
+        self.assertEqual(graph.pairs().tolist(), [[0, 1], [1, 2]])
+
+
+    def test_bond_graph_repr(self):
+        self.assertEqual(str(self.graph), "<BondGraph (6 atoms, 4 bonds)>")
+        self.assertEqual(len(self.graph), 6)
+
+
+
+class BondGraphQueryTests(BondGraphTest):
+
+    def test_can_get_degrees(self):
+        self.assertEqual(self.graph.degrees.tolist(), [1, 3, 1, 1, 1, 1])
+
+
+    def test_can_get_neighbours(self):
+        self.assertEqual(self.graph.neighbours(1).tolist(), [0, 2, 3])
+        self.assertEqual(self.graph.neighbours(5).tolist(), [4])
+
+
+    def test_can_get_pairs(self):
+        self.assertEqual(
+         self.graph.pairs().tolist(), [[0, 1], [1, 2], [1, 3], [4, 5]]
+        )
+
+
+    def test_can_get_components(self):
+        graph = BondGraph(self.atoms, [(5, 3), (3, 1), (0, 2)])
+        self.assertEqual(graph.components().tolist(), [0, 1, 0, 1, 2, 1])
+        self.assertEqual(BondGraph([], []).components().tolist(), [])
+
+
+    def test_can_get_hop_distances(self):
+        self.assertEqual(
+         self.graph.hop_distances(0).tolist(), [0, 1, 2, 2, -1, -1]
+        )
+
+
+    def test_can_get_shortest_path(self):
+        self.assertEqual(self.graph.shortest_path(0, 3), [0, 1, 3])
+        self.assertEqual(self.graph.shortest_path(4, 4), [4])
+        self.assertIsNone(self.graph.shortest_path(0, 5))
@@ -1,18 +1,21 @@
 from unittest import TestCase
 from unittest.mock import patch, Mock
 from atomium.structures.models import Model
-from atomium.structures.molecules import AtomicStructure
+from atomium.structures.molecules import AtomicStructure, Molecule, Residue
 from atomium.structures.atoms import Atom
+from atomium.structures.arrays import AtomArrays
 
 class ModelTest(TestCase):
 
     def setUp(self):
-        self.atom1, self.atom2, self.atom3 = Mock(Atom), Mock(Atom), Mock(Atom)
+        self.atom1, self.atom2 = Atom("C", 1, 2, 3), Atom("N", 4, 5, 6)
+        self.atom3 = Atom("O", 7, 8, 9, bfactor=1.5)
         self.atoms = [self.atom1, self.atom2, self.atom3]
         def mock_init(obj, *args, **kwargs):
             obj._atoms = set(args)
         self.patch1 = patch("atomium.structures.molecules.AtomicStructure.__init__")
         self.mock_init = self.patch1.start()
+        self.addCleanup(self.patch1.stop)
         self.mock_init.side_effect = mock_init
 
 
@@ -34,9 +37,455 @@ class ModelCreationTests(ModelTest):
         self.assertIs(self.atom3._model, model)
 
 
+    def test_atoms_are_stored_in_model_arrays(self):
+        model = Model(*self.atoms)
+        self.assertIsInstance(model._arrays, AtomArrays)
+        self.assertIs(model.arrays, model._arrays)
+        self.assertEqual(set(model._arrays.atoms), set(self.atoms))
+        for atom in self.atoms:
+            self.assertIs(atom._arrays, model._arrays)
+            self.assertEqual(atom._index, model._arrays.row(atom))
+            self.assertEqual(
+             model._arrays.coordinates[atom._index].tolist(),
+             list(atom.location)
+            )
+        self.assertEqual(self.atom3.bfactor, 1.5)
+        self.assertEqual(model._arrays.bfactors[self.atom3._index], 1.5)
+
+
 
 class ModelReprTests(ModelTest):
 
     def test_model_repr(self):
         model = Model(self.atom1, self.atom2, self.atom3)
         self.assertEqual(str(model), "<Model (3 atoms)>")
+
+
+
+class ModelAtomTests(TestCase):
+
+    def test_adding_atoms_stores_them_in_arrays(self):
+        model = Model()
+        atom = Atom("C", 1, 2, 3)
+        model.add_atom(atom)
+        self.assertIs(atom.model, model)
+        self.assertIs(atom._arrays, model.arrays)
+        self.assertEqual(model.arrays.coordinates.tolist(), [[1, 2, 3]])
+
+
+    def test_adding_structures_stores_them_in_arrays(self):
+        model = Model(Atom("C", 0, 0, 0))
+        atoms = [Atom("N", 1, 2, 3), Atom("O", 4, 5, 6)]
+        model.add(Molecule(*atoms))
+        self.assertEqual(len(model.arrays), 3)
+        for atom in atoms:
+            self.assertIs(atom.model, model)
+            self.assertIs(atom._arrays, model.arrays)
+        self.assertEqual(atoms[1].location, (4, 5, 6))
+        with self.assertRaises(TypeError):
+            model.add(atoms[0])
+
+
+    def test_structures_notice_their_atoms_joining_models(self):
+        atoms = [Atom("C", 0, 0, 0), Atom("C", 2, 0, 0)]
+        structure = AtomicStructure(*atoms)
+        self.assertEqual(structure.center_of_mass, (1, 0, 0))
+        Model(*atoms)
+        atoms[1].x = 4
+        self.assertEqual(structure.center_of_mass, (2, 0, 0))
+
+
+    def test_removing_atoms_takes_them_from_arrays(self):
+        atom1, atom2 = Atom("C", 1, 2, 3), Atom("C", 4, 5, 6)
+        model = Model(atom1, atom2)
+        model.remove_atom(atom1)
+        self.assertIsNone(atom1.model)
+        self.assertIsNone(atom1._arrays)
+        self.assertEqual(atom1.location, (1, 2, 3))
+        self.assertEqual(model.arrays.atoms, (atom2,))
+
+
+    def test_atom_can_move_between_models(self):
+        atom = Atom("C", 1, 2, 3)
+        model1 = Model(atom)
+        model2 = Model(atom)
+        self.assertEqual(len(model1.arrays), 0)
+        self.assertIs(atom._arrays, model2.arrays)
+        model1.translate(1, 1, 1)
+        self.assertEqual(atom.location, (2, 3, 4))
+
+
+
+class ModelAtomQueryTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("C", name="CA", id=1), Atom("H", name="H1", id=2),
+         Atom("ZN", name="ZN", id=3), Atom("C", name="CB", id=4)
+        ]
+        self.residue = Residue(*self.atoms[:2], name="ALA")
+        self.model = Model(*self.atoms)
+
+
+    def test_can_query_by_element_with_arrays(self):
+        self.assertEqual(self.model.atoms(element="c"), {
+         self.atoms[0], self.atoms[3]
+        })
+        self.assertEqual(
+         self.model.atoms(hydrogen=False, metal=False),
+         {self.atoms[0], self.atoms[3]}
+        )
+
+
+    def test_element_query_combines_with_other_criteria(self):
+        self.assertEqual(
+         self.model.atoms(element="C", name="CA"), {self.atoms[0]}
+        )
+        self.assertEqual(
+         self.model.atoms(hydrogen=False, het=False), {self.atoms[0]}
+        )
+
+
+    def test_element_changes_are_seen_by_queries(self):
+        self.atoms[1].element = "C"
+        self.assertEqual(len(self.model.atoms(element="C")), 3)
+
+
+
+class ModelAtomIndexTests(TestCase):
+
+    def setUp(self):
+        self.patch1 = patch("atomium.structures.molecules.INDEX_THRESHOLD", 0)
+        self.patch1.start()
+        self.addCleanup(self.patch1.stop)
+        self.atoms = [
+         Atom("C", name="CA", id=1), Atom("N", name="N", id=2),
+         Atom("C", name="CA", id=3), Atom("O", name="O", id=4)
+        ]
+        self.residue1 = Residue(*self.atoms[:2], name="ALA")
+        self.residue2 = Residue(*self.atoms[2:], name="GLY")
+        self.model = Model(*self.atoms)
+
+
+    def test_can_query_by_name(self):
+        self.assertEqual(
+         self.model.atoms(name="CA"), {self.atoms[0], self.atoms[2]}
+        )
+        self.assertEqual(self.model.atoms(name="XX"), set())
+
+
+    def test_can_query_by_residue_name(self):
+        self.assertEqual(
+         self.model.atoms(residue_name="GLY"), {self.atoms[2], self.atoms[3]}
+        )
+        self.assertEqual(
+         self.model.atoms(residue_name="ALA", name="CA"), {self.atoms[0]}
+        )
+
+
+    def test_indexes_follow_added_and_removed_atoms(self):
+        self.model.atoms(element="C")
+        indexes = self.model._indexes
+        atom = Atom("c", name="CB", id=5)
+        self.model.add_atom(atom)
+        self.assertEqual(self.model.atoms(element="C"), {
+         self.atoms[0], self.atoms[2], atom
+        })
+        self.model.remove_atom(self.atoms[0])
+        self.assertEqual(self.model.atoms(name="CA"), {self.atoms[2]})
+        self.assertIs(self.model._indexes, indexes)
+
+
+    def test_indexes_follow_renaming(self):
+        self.assertEqual(len(self.model.atoms(name="CA")), 2)
+        indexes = self.model._indexes
+        self.atoms[0].name = "CB"
+        self.assertEqual(self.model.atoms(name="CA"), {self.atoms[2]})
+        self.assertIs(self.model._indexes, indexes)
+        self.residue1.name = "SER"
+        self.assertEqual(len(self.model.atoms(residue_name="SER")), 2)
+        self.assertEqual(self.model.atoms(residue_name="ALA"), set())
+
+
+    def test_indexes_follow_residue_membership(self):
+        self.assertEqual(len(self.model.atoms(residue_name="GLY")), 2)
+        self.residue2.remove_atom(self.atoms[3])
+        self.residue1.add_atom(self.atoms[3])
+        self.assertEqual(self.model.atoms(residue_name="GLY"), {self.atoms[2]})
+        self.assertEqual(self.model.atoms(residue_name="ALA"), {
+         self.atoms[0], self.atoms[1], self.atoms[3]
+        })
+
+
+    def test_indexes_are_kept_when_other_structures_change(self):
+        self.model.atoms(name="CA")
+        indexes = self.model._indexes
+        other = Atom("C", name="CA")
+        Residue(other, name="VAL")
+        other.name = "CB"
+        self.atoms[0].name = "CB"
+        self.assertIs(self.model._indexes, indexes)
+        self.assertEqual(self.model.atoms(name="CB"), {self.atoms[0]})
+
+
+    def test_small_structures_are_not_indexed(self):
+        self.patch1.stop()
+        self.assertEqual(len(self.residue1.atoms(name="CA")), 1)
+        self.assertIsNone(self.residue1._indexes)
+        self.patch1.start()
+
+
+    def test_untracked_structures_rebuild_indexes(self):
+        structure = AtomicStructure(*self.atoms)
+        self.assertEqual(len(structure.atoms(name="CA")), 2)
+        self.atoms[0].name = "CB"
+        self.assertEqual(structure.atoms(name="CA"), {self.atoms[2]})
+
+
+    def test_superseded_structures_stop_trusting_indexes(self):
+        self.assertEqual(len(self.residue1.atoms(name="CA")), 1)
+        Residue(self.atoms[0], name="SER")
+        self.assertFalse(self.residue1._tracked)
+        self.atoms[0].name = "CB"
+        self.assertEqual(self.residue1.atoms(name="CA"), set())
+
+
+
+class ModelRegistryTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [Atom("C", id=1), Atom("N", id=2), Atom("O", id=3)]
+        self.residue1 = Residue(*self.atoms[:2], id="A1", name="ALA")
+        self.residue2 = Residue(self.atoms[2], id="A2", name="GLY")
+        self.model = Model(*self.atoms)
+
+
+    def test_residues_come_from_registry(self):
+        self.assertEqual(
+         self.model.residues(), {self.residue1, self.residue2}
+        )
+        registry = self.model._registries["_residue"]
+        self.assertEqual(self.model.residues(id="A2"), {self.residue2})
+        self.assertEqual(self.model.residues(name="ALA"), {self.residue1})
+        self.assertEqual(self.model.residues(id="A2", name="ALA"), set())
+        self.assertIs(self.model._registries["_residue"], registry)
+
+
+    def test_registry_follows_added_and_removed_atoms(self):
+        self.model.residues()
+        atom = Atom("S", id=4)
+        residue = Residue(atom, id="A3")
+        self.model.add_atom(atom)
+        self.assertIn(residue, self.model.residues())
+        self.model.remove_atom(self.atoms[2])
+        self.assertEqual(self.model.residues(), {self.residue1, residue})
+        self.model.add(Residue(Atom("C"), Atom("C"), id="A4"))
+        self.assertEqual(len(self.model.residues(id="A4")), 1)
+
+
+    def test_registry_follows_membership_changes(self):
+        self.model.residues()
+        self.model.molecules()
+        self.residue2.remove_atom(self.atoms[2])
+        self.assertEqual(self.model.residues(), {self.residue1})
+        residue = Residue(self.atoms[0], id="B1")
+        self.assertEqual(self.model.residues(), {self.residue1, residue})
+        self.assertIn(residue, self.model.molecules())
+
+
+    def test_registry_follows_renaming(self):
+        self.model.residues()
+        self.model.molecules()
+        self.residue1.name = "SER"
+        self.assertEqual(self.model.residues(name="SER"), {self.residue1})
+        self.assertEqual(self.model.residues(name="ALA"), set())
+        self.assertEqual(self.model.molecules(name="SER"), {self.residue1})
+
+
+    def test_superseded_models_stop_keeping_registries(self):
+        self.model.residues()
+        Model(self.atoms[0])
+        self.assertEqual(
+         self.model.residues(), {self.residue1, self.residue2}
+        )
+        self.assertIsNone(self.model._registries)
+
+
+
+class ModelSpatialIndexTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [Atom("C", 0, 0, 0), Atom("C", 1, 0, 0), Atom("C", 9, 0, 0)]
+        self.model = Model(*self.atoms)
+
+
+    def test_spatial_index_is_cached(self):
+        index = self.model.spatial_index()
+        self.assertIs(self.model.spatial_index(), index)
+        self.assertEqual(len(index), 3)
+
+
+    def test_spatial_index_is_rebuilt_when_atoms_move(self):
+        index = self.model.spatial_index()
+        self.atoms[2].x = 1
+        self.assertIsNot(self.model.spatial_index(), index)
+        self.assertEqual(self.atoms[0].nearby_atoms(1.5), {
+         self.atoms[1], self.atoms[2]
+        })
+
+
+    def test_spatial_index_is_rebuilt_when_atoms_added(self):
+        self.assertEqual(self.model.atoms_in_sphere(0, 0, 0, 1), {
+         self.atoms[0], self.atoms[1]
+        })
+        atom = Atom("N", 0, 0.5, 0)
+        self.model.add_atom(atom)
+        self.assertEqual(self.model.atoms_in_sphere(0, 0, 0, 1), {
+         self.atoms[0], self.atoms[1], atom
+        })
+
+
+
+class ModelNeighbourPairTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("C", 0, 0, 0), Atom("C", 1, 0, 0), Atom("H", 0, 1.5, 0),
+         Atom("N", 3, 0, 0), Atom("C", 10, 0, 0)
+        ]
+        self.model = Model(*self.atoms)
+        self.rows = [self.model.arrays.row(atom) for atom in self.atoms]
+
+
+    def row_pairs(self, *pairs):
+        return sorted(tuple(sorted(
+         (self.rows[i], self.rows[j])
+        )) for i, j in pairs)
+
+
+    def test_can_get_neighbour_pairs(self):
+        pairs, distances = self.model.neighbour_pairs(2)
+        self.assertEqual(
+         [tuple(pair) for pair in pairs.tolist()],
+         self.row_pairs((0, 1), (0, 2), (1, 2), (1, 3))
+        )
+        for (i, j), distance in zip(pairs.tolist(), distances.tolist()):
+            self.assertAlmostEqual(distance, self.model.arrays.atoms[i].distance_to(
+             self.model.arrays.atoms[j]
+            ))
+
+
+    def test_neighbour_pairs_are_filtered_on_both_sides(self):
+        pairs, distances = self.model.neighbour_pairs(2, hydrogen=False)
+        self.assertEqual(
+         [tuple(pair) for pair in pairs.tolist()],
+         self.row_pairs((0, 1), (1, 3))
+        )
+        pairs, distances = self.model.neighbour_pairs(2, element="C")
+        self.assertEqual(pairs.tolist(), [list(self.row_pairs((0, 1))[0])])
+
+
+    def test_can_get_neighbour_atom_pairs(self):
+        pairs, distances = self.model.neighbour_pairs(1, atoms=True)
+        self.assertEqual(len(pairs), 1)
+        self.assertEqual(set(pairs[0]), set(self.atoms[:2]))
+        self.assertEqual(distances.tolist(), [1])
+
+
+    def test_chunking_does_not_change_pairs(self):
+        pairs, distances = self.model.neighbour_pairs(20)
+        chunked, chunk_distances = self.model.neighbour_pairs(20, chunk_size=2)
+        self.assertEqual(pairs.tolist(), chunked.tolist())
+        self.assertEqual(distances.tolist(), chunk_distances.tolist())
+        self.assertEqual(len(pairs), 10)
+
+
+    def test_no_neighbour_pairs(self):
+        pairs, distances = Model().neighbour_pairs(2)
+        self.assertEqual(pairs.shape, (0, 2))
+        self.assertEqual(distances.shape, (0,))
+
+
+
+class ModelSiteTests(TestCase):
+
+    def setUp(self):
+        self.ligand_atoms = [Atom("C", 0, 0, 0, id=1), Atom("H", 0, 0, 1, id=2)]
+        self.ligand = Molecule(*self.ligand_atoms, id="A100", name="LIG")
+        self.near = Residue(
+         Atom("O", 3, 0, 0, name="OG", id=3), Atom("C", 2, 0, 0, name="CA", id=4),
+         id="A1", name="SER"
+        )
+        self.main = Residue(Atom("N", 0, 3, 0, name="N", id=5), id="A2")
+        self.far = Residue(Atom("C", 9, 0, 0, name="CB", id=6), id="A3")
+        self.hydrogen = Residue(Atom("H", 0, -1, 0, name="H", id=7), id="A4")
+        self.water = Molecule(Atom("O", 0, 0, -2, id=8), id="A200", name="HOH")
+        self.model = Model(
+         self.ligand, self.near, self.main, self.far, self.hydrogen, self.water
+        )
+
+
+    def test_ligand_site_uses_model(self):
+        site = self.ligand.site()
+        self.assertIs(site.ligand, self.ligand)
+        self.assertEqual(site.residues(), {self.near})
+        self.assertEqual(self.ligand.site(main_chain=True).residues(), {
+         self.near, self.main
+        })
+        self.assertEqual(self.ligand.site(water=True).residues(), {
+         self.near, self.water
+        })
+
+
+    def test_can_get_all_sites(self):
+        other = Molecule(Atom("C", 9, 1, 0, id=9), id="A101", name="LAG")
+        self.model.add(other)
+        sites = {site.ligand: site for site in self.model.sites(cutoff=3.5)}
+        self.assertEqual(set(sites.keys()), {self.ligand, other})
+        self.assertEqual(sites[self.ligand].residues(), {self.near})
+        self.assertEqual(sites[other].residues(), {self.far})
+
+
+    def test_sites_options(self):
+        site, = self.model.sites(carbon=False, main_chain=True, water=True)
+        self.assertEqual(site.residues(), {self.near, self.main, self.water})
+
+
+
+class ModelBondGraphTests(TestCase):
+
+    def setUp(self):
+        self.atoms = [Atom("C", id=1), Atom("C", id=2), Atom("O", id=3)]
+        self.atoms[0].bond_to(self.atoms[1])
+        self.model = Model(*self.atoms)
+
+
+    def test_can_get_bond_graph(self):
+        graph = self.model.bond_graph()
+        self.assertEqual(graph.atoms, self.model.arrays.atoms)
+        self.assertEqual(graph.bond_count, 1)
+        row1, row2 = (self.model.arrays.row(a) for a in self.atoms[:2])
+        self.assertEqual(graph.neighbours(row1).tolist(), [row2])
+
+
+    def test_bond_graph_is_reused(self):
+        graph = self.model.bond_graph()
+        self.atoms[0].move_to(5, 5, 5)
+        self.assertIs(self.model.bond_graph(), graph)
+
+
+    def test_bond_graph_is_rebuilt_after_bond_changes(self):
+        graph = self.model.bond_graph()
+        self.atoms[1].bond_to(self.atoms[2])
+        graph2 = self.model.bond_graph()
+        self.assertIsNot(graph2, graph)
+        self.assertEqual(graph2.bond_count, 2)
+        self.atoms[0].unbond_from(self.atoms[1])
+        self.assertEqual(self.model.bond_graph().bond_count, 1)
+
+
+    def test_bond_graph_is_rebuilt_after_atom_changes(self):
+        graph = self.model.bond_graph()
+        self.model.remove_atom(self.atoms[0])
+        self.assertEqual(len(self.model.bond_graph()), 2)
+        self.assertEqual(self.model.bond_graph().bond_count, 0)
@@ -12,6 +12,7 @@ class MoleculeTest(TestCase):
             obj._atoms = set(args)
         self.patch1 = patch("atomium.structures.molecules.AtomicStructure.__init__")
         self.mock_init = self.patch1.start()
+        self.addCleanup(self.patch1.stop)
         self.mock_init.side_effect = mock_init
 
 
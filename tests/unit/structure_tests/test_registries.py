@@ -0,0 +1,128 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from atomium.structures.molecules import Residue
+from atomium.structures.registries import StructureRegistry
+
+class StructureRegistryTest(TestCase):
+
+    def setUp(self):
+        self.residue1, self.residue2, self.residue3 = [
+         Mock(Residue) for _ in range(3)
+        ]
+        self.residue1._id, self.residue1._name = "A1", "ALA"
+        self.residue2._id, self.residue2._name = "A2", "GLY"
+        self.residue3._id, self.residue3._name = "A3", "ALA"
+        self.registry = StructureRegistry([
+         self.residue1, self.residue1, self.residue2, None
+        ])
+
+
+
+class StructureRegistryCreationTests(StructureRegistryTest):
+
+    def test_can_create_registry(self):
+        self.assertEqual(
+         self.registry._counts, {self.residue1: 2, self.residue2: 1}
+        )
+        self.assertEqual(
+         self.registry._ids, {"A1": {self.residue1}, "A2": {self.residue2}}
+        )
+        self.assertEqual(self.registry._names, {
+         "ALA": {self.residue1}, "GLY": {self.residue2}
+        })
+
+
+    def test_can_create_empty_registry(self):
+        registry = StructureRegistry()
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(registry.structures(), set())
+
+
+    def test_registry_repr(self):
+        self.assertEqual(
+         repr(self.registry), "<StructureRegistry (2 structures)>"
+        )
+
+
+    def test_registry_container(self):
+        self.assertIn(self.residue1, self.registry)
+        self.assertNotIn(self.residue3, self.registry)
+
+
+
+class StructureRegistryUpdateTests(StructureRegistryTest):
+
+    def test_can_add_structures(self):
+        self.registry.add(self.residue3)
+        self.registry.add(self.residue2)
+        self.registry.add(None)
+        self.assertEqual(self.registry._counts[self.residue2], 2)
+        self.assertEqual(
+         self.registry._names["ALA"], {self.residue1, self.residue3}
+        )
+
+
+    def test_structures_are_forgotten_when_no_atoms_are_left(self):
+        self.registry.remove(self.residue1)
+        self.assertIn(self.residue1, self.registry)
+        self.registry.remove(self.residue1)
+        self.assertNotIn(self.residue1, self.registry)
+        self.assertNotIn("A1", self.registry._ids)
+        self.assertNotIn("ALA", self.registry._names)
+        self.registry.remove(self.residue1)
+        self.registry.remove(None)
+        self.assertEqual(len(self.registry), 1)
+
+
+    def test_can_move_atoms_between_structures(self):
+        self.registry.move(self.residue2, self.residue3)
+        self.assertEqual(
+         self.registry.structures(), {self.residue1, self.residue3}
+        )
+        self.registry.move(self.residue3, self.residue3)
+        self.assertEqual(self.registry._counts[self.residue3], 1)
+        self.registry.move(self.residue3, None)
+        self.assertEqual(self.registry.structures(), {self.residue1})
+
+
+    def test_can_rename_structures(self):
+        self.registry.rename(self.residue1, "SER")
+        self.assertEqual(self.registry.structures(name="SER"), {self.residue1})
+        self.assertEqual(self.registry.structures(name="ALA"), set())
+        self.registry.rename(self.residue3, "SER")
+        self.assertEqual(self.registry.structures(name="SER"), {self.residue1})
+
+
+
+class StructureRegistryQueryTests(StructureRegistryTest):
+
+    def test_can_get_all_structures(self):
+        self.assertEqual(
+         self.registry.structures(), {self.residue1, self.residue2}
+        )
+
+
+    def test_can_get_structures_by_id(self):
+        self.assertEqual(self.registry.structures(id="A2"), {self.residue2})
+        self.assertEqual(self.registry.structures(id="A9"), set())
+
+
+    def test_can_get_structures_by_name(self):
+        self.registry.add(self.residue3)
+        self.assertEqual(
+         self.registry.structures(name="ALA"), {self.residue1, self.residue3}
+        )
+
+
+    def test_can_get_structures_by_id_and_name(self):
+        self.assertEqual(
+         self.registry.structures(id="A1", name="ALA"), {self.residue1}
+        )
+        self.assertEqual(self.registry.structures(id="A1", name="GLY"), set())
+
+
+    def test_returned_sets_are_copies(self):
+        self.registry.structures(id="A1").add(self.residue3)
+        self.registry.structures().add(self.residue3)
+        self.assertEqual(self.registry.structures(id="A1"), {self.residue1})
+        self.assertNotIn(self.residue3, self.registry)
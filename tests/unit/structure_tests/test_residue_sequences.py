@@ -9,6 +9,7 @@ class ResidueSequenceTest(TestCase):
 
     def setUp(self):
         self.sequence = ResidueSequence()
+        self.sequence._label_stamp = Mock(return_value=(0, None, 0))
         self.atom1, self.atom2 = Mock(Atom), Mock(Atom)
         self.atom3, self.atom4 = Mock(Atom), Mock(Atom)
         self.atom5, self.atom6 = Mock(Atom), Mock(Atom)
@@ -109,6 +110,40 @@ class ResidueSequenceResiduesTests(ResidueSequenceTest):
         self.assertEqual(self.sequence.residues(), ())
 
 
+    @patch("atomium.structures.chains.AtomicStructure.residues")
+    def test_residue_order_is_reused(self, mock_residues):
+        mock_residues.return_value = set(
+         (self.residue1, self.residue2, self.residue3, self.residue4)
+        )
+        residues = self.sequence.residues()
+        self.assertIs(self.sequence.residues(), residues)
+        self.assertEqual(mock_residues.call_count, 1)
+        self.sequence._label_stamp.return_value = (1, None, 0)
+        self.assertEqual(self.sequence.residues(), residues)
+        self.assertEqual(mock_residues.call_count, 2)
+
+
+    @patch("atomium.structures.chains.AtomicStructure.residues")
+    def test_residues_must_be_connected(self, mock_residues):
+        mock_residues.return_value = set((self.residue1, self.residue3))
+        self.residue2.next, self.residue3.previous = None, None
+        with self.assertRaises(SequenceConnectivityError):
+            self.sequence.residues()
+        with self.assertRaises(ValueError):
+            self.sequence.residues()
+
+
+    @patch("atomium.structures.chains.AtomicStructure.residues")
+    def test_residue_links_cannot_loop(self, mock_residues):
+        mock_residues.return_value = set((self.residue1, self.residue2))
+        self.residue1.previous = self.residue4
+        with self.assertRaises(SequenceConnectivityError):
+            self.sequence.residues()
+        self.residue1.previous, self.residue4.next = None, self.residue1
+        with self.assertRaises(SequenceConnectivityError):
+            self.sequence.residues()
+
+
 
 class ResidueSequenceCorrectCheckingTests(ResidueSequenceTest):
 
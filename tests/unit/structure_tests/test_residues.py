@@ -13,6 +13,7 @@ class ResidueTest(TestCase):
             obj._id, obj._name = None, None
         self.patch1 = patch("atomium.structures.molecules.Molecule.__init__")
         self.mock_init = self.patch1.start()
+        self.addCleanup(self.patch1.stop)
         self.mock_init.side_effect = mock_init
 
 
@@ -90,9 +91,11 @@ class ResidueNextTests(ResidueTest):
     def test_can_assign_next(self):
         res = Residue(self.atom1, self.atom2, self.atom3)
         next_res = Mock(Residue)
+        version = Residue._link_version
         res.next = next_res
         self.assertIs(res._next, next_res)
         self.assertIs(next_res._previous, res)
+        self.assertGreater(Residue._link_version, version)
 
 
     def test_next_residue_must_be_residue(self):
@@ -130,9 +133,11 @@ class ResiduePreviousTests(ResidueTest):
     def test_can_assign_previous(self):
         res = Residue(self.atom1, self.atom2, self.atom3)
         previous_res = Mock(Residue)
+        version = Residue._link_version
         res.previous = previous_res
         self.assertIs(res._previous, previous_res)
         self.assertIs(previous_res._next, res)
+        self.assertGreater(Residue._link_version, version)
 
 
     def test_previous_residue_must_be_residue(self):
@@ -11,6 +11,7 @@ class SiteTest(TestCase):
             obj._atoms = {i: {arg} for i, arg in enumerate(args)}
         self.patch1 = patch("atomium.structures.molecules.AtomicStructure.__init__")
         self.mock_init = self.patch1.start()
+        self.addCleanup(self.patch1.stop)
         self.mock_init.side_effect = mock_init
         self.ligand = Mock(Molecule)
 
@@ -0,0 +1,92 @@
+from unittest import TestCase
+import numpy as np
+from atomium.structures.spatial import CellList, sphere_mask
+
+class SphereMaskTests(TestCase):
+
+    def test_can_get_sphere_mask(self):
+        coordinates = np.array([[0, 0, 0], [3, 4, 0], [3, 4, 0.1]])
+        self.assertEqual(
+         sphere_mask(coordinates, (0, 0, 0), 5).tolist(), [True, True, False]
+        )
+
+
+
+class CellListCreationTests(TestCase):
+
+    def test_can_create_cell_list(self):
+        cells = CellList([[0, 0, 0], [1, 1, 1], [12, 0, 0]], cell_size=5)
+        self.assertEqual(len(cells), 3)
+        self.assertEqual(cells.cell_size, 5)
+        self.assertEqual(cells.coordinates.tolist(), [
+         [0, 0, 0], [1, 1, 1], [12, 0, 0]
+        ])
+        self.assertEqual(str(cells), "<CellList (3 points, 2 cells)>")
+
+
+    def test_cell_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            CellList([[0, 0, 0]], cell_size=0)
+
+
+    def test_can_create_empty_cell_list(self):
+        cells = CellList(np.zeros((0, 3)))
+        self.assertEqual(len(cells), 0)
+        self.assertEqual(cells.query_sphere((0, 0, 0), 10).tolist(), [])
+
+
+
+class CellListQueryTests(TestCase):
+
+    def setUp(self):
+        self.coordinates = np.random.RandomState(1).uniform(-20, 20, (500, 3))
+        self.cells = CellList(self.coordinates, cell_size=3)
+
+
+    def test_candidates_cover_box(self):
+        rows = self.cells.candidates((-5, -5, -5), (5, 5, 5))
+        inside = np.flatnonzero(
+         (np.abs(self.coordinates) <= 5).all(axis=1)
+        )
+        self.assertTrue(set(inside.tolist()) <= set(rows.tolist()))
+        self.assertEqual(len(set(rows.tolist())), len(rows))
+
+
+    def test_sphere_query_matches_brute_force(self):
+        for centre, radius in [
+         ((0, 0, 0), 4), ((19, -19, 5), 7.5), ((3, 1, -2), 0), ((0, 0, 0), 100)
+        ]:
+            expected = np.flatnonzero(
+             sphere_mask(self.coordinates, centre, radius)
+            )
+            self.assertEqual(
+             self.cells.query_sphere(centre, radius).tolist(),
+             expected.tolist()
+            )
+
+
+    def test_sphere_outside_points(self):
+        self.assertEqual(
+         self.cells.query_sphere((100, 100, 100), 5).tolist(), []
+        )
+
+
+    def test_neighbours_match_brute_force(self):
+        centres = np.random.RandomState(2).uniform(-25, 25, (40, 3))
+        for radius in (0.5, 4, 7):
+            indices, rows, distances = self.cells.neighbours(centres, radius)
+            expected = [(i, j) for i, centre in enumerate(centres)
+             for j in np.flatnonzero(
+              sphere_mask(self.coordinates, centre, radius)
+             ).tolist()]
+            self.assertEqual(list(zip(indices.tolist(), rows.tolist())), expected)
+            self.assertTrue(np.allclose(distances, np.sqrt(((
+             self.coordinates[rows] - centres[indices]
+            ) ** 2).sum(axis=1))))
+
+
+    def test_neighbours_of_nothing(self):
+        indices, rows, distances = self.cells.neighbours(np.zeros((0, 3)), 5)
+        self.assertEqual(len(indices), 0)
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(len(distances), 0)
@@ -0,0 +1,212 @@
+import math
+import os
+import tempfile
+import numpy as np
+from unittest import TestCase
+from unittest.mock import Mock
+from atomium.structures.atoms import Atom
+from atomium.structures.models import Model
+from atomium.structures.trajectories import Trajectory
+from atomium.structures.geometry import pairwise_rmsd
+
+class TrajectoryTest(TestCase):
+
+    def setUp(self):
+        self.atoms = [
+         Atom("C", 0, 0, 0, id=1), Atom("N", 1, 0, 0, id=2),
+         Atom("O", 1, 2, 0, id=3)
+        ]
+        self.model = Model(*self.atoms)
+        self.rows = [self.model.arrays.row(atom) for atom in self.atoms]
+        self.frames = np.zeros((3, 3, 3))
+        for frame, offset in zip(self.frames, (0, 2, 4)):
+            frame[self.rows] = [
+             [offset, 0, 0], [offset + 1, 0, 0], [offset + 1, offset / 2 + 2, 0]
+            ]
+
+
+
+class TrajectoryCreationTests(TrajectoryTest):
+
+    def test_can_create_trajectory(self):
+        trajectory = Trajectory(self.model, self.frames)
+        self.assertIs(trajectory._model, self.model)
+        self.assertTrue((trajectory._frames == self.frames).all())
+        self.assertIsNone(trajectory._frame)
+        self.assertEqual(trajectory._chunk_size, 256)
+        self.assertEqual(trajectory._topology, self.model.arrays.topology)
+
+
+    def test_can_create_trajectory_with_memory_mapped_frames(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frames.npy")
+            np.save(path, self.frames)
+            frames = np.load(path, mmap_mode="r")
+            trajectory = Trajectory(self.model, frames, chunk_size=2)
+            self.assertIs(trajectory._frames, frames)
+            self.assertEqual(trajectory._chunk_size, 2)
+            del trajectory, frames
+
+
+    def test_trajectory_needs_model(self):
+        with self.assertRaises(TypeError):
+            Trajectory(Mock(), self.frames)
+
+
+    def test_frames_must_fit_model(self):
+        with self.assertRaises(ValueError):
+            Trajectory(self.model, self.frames[:, :2])
+        with self.assertRaises(ValueError):
+            Trajectory(self.model, self.frames[0])
+        with self.assertRaises(ValueError):
+            Trajectory(self.model, self.frames[:0])
+
+
+    def test_chunk_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            Trajectory(self.model, self.frames, chunk_size=0)
+
+
+
+class TrajectoryReprTests(TrajectoryTest):
+
+    def test_trajectory_repr(self):
+        self.assertEqual(
+         repr(Trajectory(self.model, self.frames)),
+         "<Trajectory (3 frames, 3 atoms)>"
+        )
+        self.assertEqual(
+         repr(Trajectory(self.model, self.frames[:1])),
+         "<Trajectory (1 frame, 3 atoms)>"
+        )
+
+
+
+class TrajectoryPropertyTests(TrajectoryTest):
+
+    def test_trajectory_properties(self):
+        trajectory = Trajectory(self.model, self.frames)
+        self.assertEqual(len(trajectory), 3)
+        self.assertIs(trajectory.model, self.model)
+        self.assertIs(trajectory.frames, trajectory._frames)
+        self.assertEqual(trajectory.chunk_size, 256)
+        self.assertIsNone(trajectory.frame)
+
+
+
+class FrameSelectionTests(TrajectoryTest):
+
+    def test_can_select_frame(self):
+        trajectory = Trajectory(self.model, self.frames)
+        version = self.model.arrays.version
+        self.assertIs(trajectory.select(1), self.model)
+        self.assertEqual(trajectory.frame, 1)
+        self.assertEqual(self.atoms[2].location, (3, 3, 0))
+        self.assertGreater(self.model.arrays.version, version)
+        self.assertIs(trajectory[-1], self.model)
+        self.assertEqual(trajectory.frame, 2)
+        self.assertEqual(self.atoms[2].location, (5, 4, 0))
+
+
+    def test_frame_must_exist(self):
+        trajectory = Trajectory(self.model, self.frames)
+        with self.assertRaises(IndexError):
+            trajectory.select(3)
+
+
+    def test_can_iterate_through_frames(self):
+        trajectory = Trajectory(self.model, self.frames)
+        locations = [model.atom(id=1).location for model in trajectory]
+        self.assertEqual(locations, [(0, 0, 0), (2, 0, 0), (4, 0, 0)])
+
+
+
+class TrajectoryAnalysisTests(TrajectoryTest):
+
+    def test_can_get_rmsd_matrix(self):
+        trajectory = Trajectory(self.model, self.frames)
+        masses = self.model.arrays.masses
+        centres = np.dot(masses, self.frames) / masses.sum()
+        self.assertTrue(np.allclose(
+         trajectory.rmsd_matrix(), pairwise_rmsd(self.frames, True, centres)
+        ))
+        self.assertTrue(np.allclose(
+         trajectory.rmsd_matrix(superimpose=False),
+         pairwise_rmsd(self.frames, False)
+        ))
+
+
+    def test_can_get_rmsf(self):
+        trajectory = Trajectory(self.model, self.frames[:2])
+        self.assertEqual(
+         trajectory.rmsf(superimpose=False), {1: 1, 2: 1, 3: math.sqrt(1.25)}
+        )
+        for value in trajectory.rmsf().values():
+            self.assertLess(value, 1)
+
+
+    def test_can_get_mean_coordinates(self):
+        trajectory = Trajectory(self.model, self.frames)
+        mean = trajectory.mean_coordinates(superimpose=False)
+        self.assertEqual(mean[self.rows].tolist(), [
+         [2, 0, 0], [3, 0, 0], [3, 3, 0]
+        ])
+        self.assertEqual(
+         trajectory.mean_coordinates(superimpose=True).shape, (3, 3)
+        )
+
+
+    def test_can_get_mean_model(self):
+        trajectory = Trajectory(self.model, self.frames)
+        mean = trajectory.mean_model(superimpose=False)
+        self.assertIsInstance(mean, Model)
+        self.assertFalse(mean.atoms() & self.model.atoms())
+        self.assertEqual(mean.atom(3).location, (3, 3, 0))
+        self.assertEqual(self.atoms[2].location, (1, 2, 0))
+
+
+    def test_chunked_analyses_match_whole_analyses(self):
+        whole = Trajectory(self.model, self.frames)
+        chunked = Trajectory(self.model, self.frames, chunk_size=2)
+        self.assertTrue(np.allclose(whole.rmsd_matrix(), chunked.rmsd_matrix()))
+        self.assertTrue(np.allclose(
+         whole.mean_coordinates(), chunked.mean_coordinates()
+        ))
+        whole_rmsf, chunked_rmsf = whole.rmsf(), chunked.rmsf()
+        for id_ in whole_rmsf:
+            self.assertAlmostEqual(whole_rmsf[id_], chunked_rmsf[id_])
+
+
+    def test_can_get_distances_in_every_frame(self):
+        trajectory = Trajectory(self.model, self.frames, chunk_size=2)
+        distances = trajectory.distances([
+         (self.atoms[0], self.atoms[1]), (self.atoms[1], self.atoms[2])
+        ])
+        self.assertEqual(distances.tolist(), [[1, 2], [1, 3], [1, 4]])
+
+
+
+class TrajectoryTopologyTests(TrajectoryTest):
+
+    def setUp(self):
+        TrajectoryTest.setUp(self)
+        self.trajectory = Trajectory(self.model, self.frames)
+        self.model.remove_atom(self.atoms[0])
+        self.model.add_atom(self.atoms[0])
+
+
+    def test_cant_select_frames_once_atoms_change(self):
+        with self.assertRaises(ValueError):
+            self.trajectory.select(1)
+
+
+    def test_cant_measure_frames_once_atoms_change(self):
+        with self.assertRaises(ValueError):
+            self.trajectory.distances([self.atoms[:2]])
+        with self.assertRaises(ValueError):
+            self.trajectory.rmsf()
+
+
+    def test_cant_make_mean_model_once_atoms_change(self):
+        with self.assertRaises(ValueError):
+            self.trajectory.mean_model()
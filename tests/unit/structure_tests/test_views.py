@@ -0,0 +1,91 @@
+from unittest import TestCase
+from atomium.structures.views import SetView
+
+class SetViewTest(TestCase):
+
+    def setUp(self):
+        self.items = {1, 2, 3}
+        self.view = SetView(self.items)
+
+
+
+class SetViewCreationTests(SetViewTest):
+
+    def test_can_create_view(self):
+        self.assertIs(self.view._items, self.items)
+
+
+    def test_view_repr(self):
+        self.assertEqual(repr(self.view), "SetView({1, 2, 3})")
+
+
+
+class SetViewReadingTests(SetViewTest):
+
+    def test_view_container(self):
+        self.assertIn(2, self.view)
+        self.assertNotIn(4, self.view)
+        self.assertEqual(len(self.view), 3)
+        self.assertEqual(sorted(self.view), [1, 2, 3])
+
+
+    def test_view_shows_current_items(self):
+        self.items.add(4)
+        self.assertIn(4, self.view)
+        self.assertEqual(len(self.view), 4)
+
+
+    def test_view_equality(self):
+        self.assertEqual(self.view, {1, 2, 3})
+        self.assertEqual({1, 2, 3}, self.view)
+        self.assertEqual(self.view, frozenset((1, 2, 3)))
+        self.assertEqual(self.view, SetView({1, 2, 3}))
+        self.assertNotEqual(self.view, {1, 2})
+        self.assertNotEqual(self.view, [1, 2, 3])
+
+
+    def test_views_are_not_hashable(self):
+        with self.assertRaises(TypeError):
+            hash(self.view)
+
+
+    def test_view_comparisons(self):
+        self.assertTrue(self.view <= {1, 2, 3, 4})
+        self.assertTrue(self.view > {1})
+        self.assertTrue(self.view.issubset([1, 2, 3, 4]))
+        self.assertTrue(self.view.issuperset([1, 2]))
+        self.assertTrue(self.view.isdisjoint({4, 5}))
+
+
+
+class SetViewOperationTests(SetViewTest):
+
+    def test_operators_give_new_sets(self):
+        for result, expected in (
+         (self.view | {4}, {1, 2, 3, 4}), (self.view & {2, 5}, {2}),
+         (self.view - {1}, {2, 3}), (self.view ^ {3, 4}, {1, 2, 4}),
+         ({1, 5} - self.view, {5})
+        ):
+            self.assertIs(type(result), set)
+            self.assertEqual(result, expected)
+        self.assertEqual(self.items, {1, 2, 3})
+
+
+    def test_methods_give_new_sets(self):
+        self.assertEqual(self.view.union([4], [5]), {1, 2, 3, 4, 5})
+        self.assertEqual(self.view.intersection([1, 2], [2]), {2})
+        self.assertEqual(self.view.difference([1]), {2, 3})
+        self.assertEqual(self.view.symmetric_difference([3, 4]), {1, 2, 4})
+        self.assertEqual(self.items, {1, 2, 3})
+
+
+    def test_views_cant_be_changed(self):
+        for method in ("add", "remove", "discard", "pop", "clear", "update"):
+            self.assertFalse(hasattr(self.view, method))
+
+
+    def test_can_copy_view(self):
+        copy = self.view.copy()
+        self.assertIs(type(copy), set)
+        copy.add(4)
+        self.assertEqual(self.items, {1, 2, 3})